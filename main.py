@@ -27,8 +27,12 @@
 import os
 import gc
 import sys
+import time
+import shutil
 
 from pathlib import Path
+from itertools import chain
+from collections import Counter, deque
 from plyer import notification
 from alive_progress import alive_bar
 
@@ -37,9 +41,19 @@ import src.Timer as Timer
 import src.Config as Config
 import src.Logger as Logger
 import src.License as License
+import src.Walker as Walker
+import src.Watcher as Watcher
+import src.Server as Server
 import src.Library as Library
+import src.Report as Report
+import src.FuzzyIndex as FuzzyIndex
+import src.FingerprintIndex as FingerprintIndex
+import src.TagCache as TagCache
 import src.utils.zapUtils as zapUtils
 import src.utils.tagUtils as tagUtils
+import src.utils.keyUtils as keyUtils
+import src.utils.fingerprintUtils as fingerprintUtils
+import src.utils.hashUtils as hashUtils
 import src.utils.duplicateUtils as duplicateUtils
 
 #try:
@@ -50,97 +64,440 @@ import src.utils.duplicateUtils as duplicateUtils
 
 
 ####################################################################################### scanMusic #############
-def scanMusic(mode, fileList, duplicateFile, difference, songsCount, noPrint, checkThe, soundex, tagType, zapMusic):
-    """  Scan the list fileList, which should contain mp3 files only.
+def scanMusic(mode, fileLists, report, difference, songsCount, noPrint, checkThe, soundex, tagType, zapMusic, tagCache, fuzzyIndex=None,
+              fingerprintCache=None):
+    """  Scan the lists in fileLists [one for each source directory], which should contain mp3 files only.
+         A fileList can also be a generator [Walker.songs()], the songs are then scanned as the walk finds them
+         and songsCount is only an estimate for the progress bar [None if not known].
          The songs are added to the library using the song artist and title as key.
-         If the song already exists in the library, then the two are checked.
+         If the key already exists in the library, the song is checked against every song held at that key.
+         Songs that are not duplicates are added to the library, alongside any others at the same key.
 
-         mode = "scan"  -- the fileList is scanned and duplicates are reported.
-         mode = "build" -- the fileList is scanned and the database is built only, duplicates are not checked.
+         mode = "scan"  -- the fileList is scanned and duplicates are written to report [a Report, to file or screen].
+         mode = "build" -- the fileList is scanned and the database is built only, duplicates are not checked [all songs are added].
+
+         If tagCache is not None, only new or changed songs have their tags read, in both modes.
+         The tags are read by tagUtils.readRoots, each source directory in its own thread [and in a pool of worker
+         processes if set in the config file].
+         The duplicate checking is always done by checkSong, one song at a time and in fileLists order.
+
+         If fuzzyIndex is not None [a FuzzyIndex of the library keys], a song with a new key is checked against the songs
+         at the near keys - keys within a few edits.  Any found are reported has possible near matches, the song is still added.
+
+         If fingerprintCache is not None [a FingerprintCache], the songs with empty or placeholder tags are not matched
+         by their key - they are put to one side and matched by their fingerprint once the tags of every song are read.
 
          Uses tqdm - a very cool progress bar for console windows.
          Now uses alive_bar an even more cool progress bar for console windows.
     """
     count      = 0  # Number of song files to check.
-    duplicates = 0  # Number of duplicate songs.
-    noDups     = 0  # Number of duplicate songs that fall outside of the time difference.
     ignored    = 0  # Number of duplicate songs that have been marked to ignore.
-    falsePos   = 0  # Number of songs that seem to be duplicate, but ain"t.
-    noTrailing = 0  # Number of songs that have a trailing the  i.e.  Shadows, the instead of The Shadows.
-
-    with alive_bar(songsCount, bar="circles", spinner="notes") as bar:
-        for musicFile in fileList:
-
-            try:
-                key, musicDuration, artist, title = tagUtils.scanTags(Config.TAGS, musicFile, soundex, logger)
-            except Exception as e:  # Can"t read tags - flag as error.
-                logger.error(f"Raised exception at calling scanTags :: {e} ")
-                continue
-
-            if songLibrary.hasKey(key):
+    noTags     = [] # Songs without useful tags, to be matched by fingerprint.
 
-                if mode == "scan":                #  Only log result in scan mode, if build - just build the database.
+    #  duplicates - number of duplicate songs.
+    #  noDups     - number of duplicate songs that fall outside of the time difference.
+    #  falsePos   - number of songs that seem to be duplicate, but ain"t.
+    #  noTrailing - number of songs that have a trailing the  i.e.  Shadows, the instead of The Shadows.
+    #  nearMiss   - number of songs that match a song at a near key, i.e. Led Zepelin instead of Led Zeppelin.
+    tally = Counter()
 
-                    songFile, songDuration = songLibrary.getItem(key)
+    songTags = tagUtils.readRoots(fileLists, tagType, soundex, logger, tagCache, Config.SCAN_WORKERS, Config.SCAN_CHUNKSIZE,
+                                  Config.PREFETCH_THREADS, Config.PREFETCH_DEPTH)
 
-                    if abs(musicDuration - songDuration) <= difference:
+    with alive_bar(songsCount, bar="circles", spinner="notes") as bar:
+        for musicFile, tags, stat in songTags:
 
-                        message = " Duplicate Found "
-                        if soundex and not tagUtils.checkTags(musicFile, songFile, logger):
-                            falsePos += 1
-                            if not noPrint:
-                                message = " Possible False Positive "
-                            else:
-                                continue  # Do not print Possible False Positives
-                        duplicateUtils.logTextLine("-" * 70 + message + "-" * 40, duplicateFile)
+            if tags is None:  # Can"t read tags - error has been logged.
+                bar()
+                continue
 
-                        if zapMusic:
-                            duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(songDuration)} ** DELETED **" , duplicateFile)
-                            zapUtils.zapFile(musicFile, True, logger)
-                        else:
-                            duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(songDuration)}" , duplicateFile)
+            musicFile = os.fspath(musicFile)
+            signature = Library.Library.signature(stat) if stat else None     #  From the stat readTags took, the song is not stat'ed again.
 
-                        duplicateUtils.logTextLine(f"{songFile}  {timer.formatSeconds(songDuration)}" , duplicateFile)
+            if fingerprintCache is not None and fingerprintUtils.needsFingerprint(*tags[2:]):
+                noTags.append((musicFile, *tags, signature))
+                bar()
+                continue
 
-                        duplicates += 1
-                    else:  # if abs(musicDuration - songDuration) < difference:
-                        noDups += 1
+            checkSong(mode, musicFile, tags, signature, report, difference, noPrint, checkThe, soundex, zapMusic, fuzzyIndex, tally)
 
-            else:  # if songLibrary.hasKey(key):  Song is a new find, add to database.
+            bar()   #  Update alive_bar.
 
-                if checkThe and duplicateUtils.trailingThe(artist) and mode == "scan":         #  A new artist, check for trailing the.
-                    duplicateUtils.logTextLine("-" * 70 + " Trailing the found " + "-" * 40, duplicateFile)
-                    duplicateUtils.logTextLine(f"{artist} is wrong in {musicFile}.", duplicateFile)
-                    noTrailing +=1
+    if noTags:
+        tally["duplicates"] += scanFingerprints(mode, noTags, report, difference, zapMusic, fingerprintCache, makeFingerprintIndex(mode))
 
-                songLibrary.addItem(key, os.fspath(musicFile), musicDuration)
+    duplicates = tally["duplicates"]
+    noDups     = tally["noDups"]
+    falsePos   = tally["falsePos"]
+    noTrailing = tally["noTrailing"]
+    nearMiss   = tally["nearMiss"]
 
-            bar()   #  Update alive_bar.
+    count = songLibrary.noOfItems + duplicates  # Adjust for duplicates found, the rest are now in the library.
 
-    count = songLibrary.noOfItems + noDups + duplicates  # Adjust for duplicates found.
+    report.flush()
 
-    zapUtils.removeUnwanted(sourceDir, duplicateFile, Config.EMPTY_DIR, zap, Config.ZAP_RECYCLE, logger)
+    for root in walker.walkers:
+        zapUtils.removeUnwanted(root.sourceDir, report, Config.EMPTY_DIR, zap, Config.ZAP_RECYCLE, logger, root)
 
-    duplicateUtils.logTextLine("", duplicateFile)
+    duplicateUtils.logTextLine("", report)
     if mode == "build":
-        duplicateUtils.logTextLine(f"{count} music files found.", duplicateFile)
+        duplicateUtils.logTextLine(f"{count} music files found.", report)
     elif ignored:
-        duplicateUtils.logTextLine(f"{count} music files found with {duplicates} duplicates, with {ignored} songs.", duplicateFile)
+        duplicateUtils.logTextLine(f"{count} music files found with {duplicates} duplicates, with {ignored} songs.", report)
     else:
-        duplicateUtils.logTextLine(f"{count} music files found with {duplicates} duplicates.", duplicateFile)
+        duplicateUtils.logTextLine(f"{count} music files found with {duplicates} duplicates.", report)
 
     if noDups:
-        duplicateUtils.logTextLine(f" Found possible {noDups} duplicates, but with a time difference greater then {difference}.", duplicateFile)
+        duplicateUtils.logTextLine(f" Found possible {noDups} duplicates, but with a time difference greater then {difference}.", report)
 
     if noTrailing:
-        duplicateUtils.logTextLine(f" Found possible {noTrailing} artists with a trailing 'the' in their name.", duplicateFile)
+        duplicateUtils.logTextLine(f" Found possible {noTrailing} artists with a trailing 'the' in their name.", report)
+
+    if noTags:
+        duplicateUtils.logTextLine(f" Checked {len(noTags)} songs without useful tags by their fingerprint.", report)
+
+    if nearMiss:
+        duplicateUtils.logTextLine(f" Found possible {nearMiss} near matches, within {fuzzyIndex.distance} edits of the artist and title.", report)
 
     if falsePos:
         if noPrint:
-            duplicateUtils.logTextLine(f" Found possible {falsePos} false positives [not displayed].", duplicateFile)
+            duplicateUtils.logTextLine(f" Found possible {falsePos} false positives [not displayed].", report)
+        else:
+            duplicateUtils.logTextLine(f" Found possible {falsePos} false positives.", report)
+
+
+####################################################################################### checkSong #############
+def checkSong(mode, musicFile, tags, signature, report, difference, noPrint, checkThe, soundex, zapMusic, fuzzyIndex, tally):
+    """  Checks one song against the library, has scanned by scanMusic - tags is (key, musicDuration, artist, title).
+         signature is the Library.signature of the song has read, or None.
+         In scan mode, any duplicates are written to report [and the song zapped if zapMusic].
+         A song that is not a duplicate is added to the library.
+
+         tally is a Counter of what was found - duplicates, noDups, falsePos, noTrailing and nearMiss.
+         Returns True if the song is a duplicate.
+    """
+    key, musicDuration, artist, title = tags
+    matchType = "soundex" if soundex else "exact"       #  Recorded against each duplicate, in a jsonl or csv report.
+
+    if songLibrary.hasKey(key) and mode == "scan":    #  Only log result in scan mode, if build - just build the database.
+
+        if songLibrary.hasSong(key, musicFile):     #  Already in the library, a song is not a duplicate of itself.
+            songLibrary.addItem(key, musicFile, musicDuration, artist, title, signature=signature)
+            return False
+
+        matches, falseMatches = tagUtils.findDuplicates(songLibrary, musicFile, tags, difference, soundex, logger)
+
+        if falseMatches:
+            tally["falsePos"] += 1
+            if not noPrint:                         #  Do not print Possible False Positives
+                duplicateUtils.logTextLine("-" * 70 + " Possible False Positive " + "-" * 40, report)
+                duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(musicDuration)}" , report)
+                for songFile, songDuration in falseMatches:
+                    duplicateUtils.logTextLine(f"{songFile}  {timer.formatSeconds(songDuration)}" , report)
+                    report.writeDuplicate(key, musicFile, musicDuration, songFile, songDuration, "falsePositive")
+
+        if matches:
+            duplicateUtils.logTextLine("-" * 70 + " Duplicate Found " + "-" * 40, report)
+
+            if zapMusic:
+                duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(musicDuration)} ** DELETED **" , report)
+                if zapUtils.zapFile(musicFile, True, logger):
+                    walker.fileRemoved(musicFile)
+            else:
+                duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(musicDuration)}" , report)
+
+            for songFile, songDuration in matches:
+                duplicateUtils.logTextLine(f"{songFile}  {timer.formatSeconds(songDuration)}" , report)
+                report.writeDuplicate(key, musicFile, musicDuration, songFile, songDuration, matchType, zapMusic)
+
+            tally["duplicates"] += 1
+            return True                             #  A duplicate is not added to the library.
+
+        if not falseMatches:                        #  Every song at key falls outside of the time difference.
+            tally["noDups"] += 1
+
+    elif checkThe and duplicateUtils.trailingThe(artist) and mode == "scan":         #  A new artist, check for trailing the.
+        duplicateUtils.logTextLine("-" * 70 + " Trailing the found " + "-" * 40, report)
+        duplicateUtils.logTextLine(f"{artist} is wrong in {musicFile}.", report)
+        tally["noTrailing"] += 1
+
+    if fuzzyIndex is not None and not songLibrary.hasKey(key):         #  A new key, check the songs at the near keys.
+        if mode == "scan":
+            nearMatches = [(nearKey, distance, match) for nearKey, distance in fuzzyIndex.search(key)
+                           for match in songLibrary.findMatches(nearKey, musicDuration, difference, musicFile)]
+            if nearMatches:
+                tally["nearMiss"] += 1
+                duplicateUtils.logTextLine("-" * 70 + " Possible Near Match " + "-" * 40, report)
+                duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(musicDuration)}" , report)
+                for nearKey, distance, (songFile, songDuration) in nearMatches:
+                    duplicateUtils.logTextLine(f"{songFile}  {timer.formatSeconds(songDuration)}  [{distance} edits]" , report)
+                    report.writeDuplicate(nearKey, musicFile, musicDuration, songFile, songDuration, "fuzzy")
+        fuzzyIndex.add(key)
+
+    #  Song is a new find, add to database - other songs at key are kept.
+    songLibrary.addItem(key, musicFile, musicDuration, artist, title, signature=signature)
+    return False
+
+################################################################################## scanFingerprints ###########
+def scanFingerprints(mode, songs, report, difference, zapMusic, fingerprintCache, fingerprintIndex):
+    """  Matches the songs without useful tags by their fingerprint, songs is a list of (musicFile, key, musicDuration, artist, title, signature).
+         Returns the number of duplicates found.
+
+         The songs are fingerprinted by fingerprintUtils.fingerprintSongs, in a pool of worker processes if set in the
+         config file - only new or changed songs are decoded, the rest come from fingerprintCache.
+         In scan mode each song is checked against fingerprintIndex [see makeFingerprintIndex], a song that matches
+         within the time difference is a duplicate.  The rest are added to the library and the index, with their fingerprint.
+    """
+    duplicates = 0
+
+    prints = fingerprintUtils.fingerprintSongs([song[0] for song in songs], Config.FINGERPRINT_SECONDS, logger,
+                                               fingerprintCache, Config.FINGERPRINT_WORKERS)
+
+    with alive_bar(len(songs), bar="circles", spinner="notes") as bar:
+        for (musicFile, key, musicDuration, artist, title, signature), (_, fingerprint) in zip(songs, prints, strict=True):
+
+            if fingerprint is not None and mode == "scan":
+                matches = [(songFile, songDuration) for (songFile, songDuration), _ in fingerprintIndex.search(fingerprint)
+                           if songFile != musicFile and abs(songDuration - musicDuration) <= difference]
+
+                if matches:
+                    duplicateUtils.logTextLine("-" * 70 + " Duplicate Found [fingerprint] " + "-" * 40, report)
+
+                    if zapMusic:
+                        duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(musicDuration)} ** DELETED **" , report)
+                        if zapUtils.zapFile(musicFile, True, logger):
+                            walker.fileRemoved(musicFile)
+                    else:
+                        duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(musicDuration)}" , report)
+
+                    for songFile, songDuration in matches:
+                        duplicateUtils.logTextLine(f"{songFile}  {timer.formatSeconds(songDuration)}" , report)
+                        report.writeDuplicate(key, musicFile, musicDuration, songFile, songDuration, "fingerprint", zapMusic)
+
+                    duplicates += 1
+                    bar()
+                    continue                                #  A duplicate is not added to the library.
+
+                fingerprintIndex.add((musicFile, musicDuration), fingerprint)
+
+            songLibrary.addItem(key, musicFile, musicDuration, artist, title, fingerprint, signature)
+            bar()
+
+    return duplicates
+
+############################################################################## makeFingerprintIndex ###########
+def makeFingerprintIndex(mode):
+    """  Returns an index of the fingerprints held in the library, items are (songFile, songDuration) - empty in build mode.
+         Built once for a scan or watch, then kept up to date has songs are added, deleted or moved.
+    """
+    fingerprintIndex = FingerprintIndex.FingerprintIndex(Config.FINGERPRINT_THRESHOLD)
+    if mode == "scan":
+        for _, songFile, songDuration, fingerprint in songLibrary.getFingerprints():
+            fingerprintIndex.add((songFile, songDuration), fingerprint)
+    return fingerprintIndex
+
+####################################################################################### scanHashes ############
+def scanHashes(fileList, report, zapMusic, threads):
+    """  Finds the songs in fileList that are byte identical to another song, in fileList or the library.
+         No tags are read, the songs are grouped by size then content hash by hashUtils.findIdentical.
+
+         In each group the first song is kept, a song already in the library is always first.
+         The rest of the group found in fileList are reported has duplicates [and zapped if zapMusic], the library is not changed.
+    """
+    walked    = list(hashUtils.songSizes(fileList))
+    songPaths = {path for path, _ in walked}
+    durations = {}                                          #  The duration of each song in the library.
+    for bucket in songLibrary.library.values():
+        durations.update(bucket)
+
+    library    = [path for path in durations if path not in songPaths]
+    groups     = hashUtils.findIdentical(chain(hashUtils.songSizes(library, threads), walked), threads, logger, durations)
+    duplicates = 0
+
+    for original, *group in groups:
+        for musicFile in [path for path in group if path in songPaths]:
+            duration = durations.get(musicFile, durations.get(original, 0.0))   #  Identical songs, identical durations.
+
+            duplicateUtils.logTextLine("-" * 70 + " Duplicate Found [identical] " + "-" * 40, report)
+            if zapMusic:
+                duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(duration)} ** DELETED **" , report)
+                if zapUtils.zapFile(musicFile, True, logger):
+                    walker.fileRemoved(musicFile)
+            else:
+                duplicateUtils.logTextLine(f"{musicFile}  {timer.formatSeconds(duration)}" , report)
+            duplicateUtils.logTextLine(f"{original}  {timer.formatSeconds(duration)}" , report)
+
+            report.writeDuplicate("", musicFile, duration, original, duration, "identical", zapMusic)
+            duplicates += 1
+
+    report.flush()
+
+    for root in walker.walkers:
+        zapUtils.removeUnwanted(root.sourceDir, report, Config.EMPTY_DIR, zap, Config.ZAP_RECYCLE, logger, root)
+
+    duplicateUtils.logTextLine("", report)
+    duplicateUtils.logTextLine(f"{len(walked)} music files found with {duplicates} identical copies.", report)
+
+####################################################################################### watchMusic ############
+def watchMusic(mode, fileList, watcher, report, difference, noPrint, checkThe, soundex, tagType, zapMusic, tagCache, fuzzyIndex=None,
+               fingerprintCache=None):
+    """  Watches the source directories [a Watcher] and checks each song has it lands, until interrupted [Ctrl-C].
+         The songs in fileList new or changed since the library was last saved are checked first, found by watchSync.
+
+         A new or changed song is checked by watchSong, has in scanMusic - so any duplicates are reported straight away.
+         Deleted and renamed songs are changed in the library, no song is read.
+         The library [and caches] are saved every Config.WATCH_SAVE seconds, if changed - and on exit by main.
+    """
+    songKeys = {}                                       #  {songFile: key} of each song below the source directories in the library.
+    for sourceDir in sourceDirs:
+        songKeys.update(songLibrary.songKeys(sourceDir))
+    prints   = makeFingerprintIndex(mode) if fingerprintCache is not None else None
+    tally    = Counter()
+    events   = deque(watchSync(fileList, songKeys))
+    changed  = False
+    saved    = time.monotonic()
+
+    duplicateUtils.logTextLine(f"Checking {len(events)} songs changed since the last run, then watching using {watcher.backend} [Ctrl-C to stop].", report, logger)
+
+    try:
+        while True:
+            while events:
+                event = events.popleft()
+                logger.debug(f"Watch event :: {event}")
+                changed = True
+
+                match event:
+                    case ("changed", musicFile):
+                        watchSong(mode, musicFile, songKeys, report, difference, noPrint, checkThe, soundex, tagType, zapMusic, tagCache,
+                                  fuzzyIndex, fingerprintCache, prints, tally)
+                    case ("deleted", songFile):
+                        watchDelete(songFile, songKeys, prints)
+                    case ("moved", songFile, newFile) if songFile in songKeys:
+                        watchMove(songFile, newFile, songKeys, prints)
+                    case ("moved", songFile, newFile):          #  Not in the library, i.e. a duplicate - check has new.
+                        watchSong(mode, newFile, songKeys, report, difference, noPrint, checkThe, soundex, tagType, zapMusic, tagCache,
+                                  fuzzyIndex, fingerprintCache, prints, tally)
+                    case ("dirDeleted", directory):
+                        for songFile in [songFile for songFile in songKeys if songFile.startswith(os.path.join(directory, ""))]:
+                            watchDelete(songFile, songKeys, prints)
+                    case ("dirMoved", directory, newDir):
+                        for songFile in [songFile for songFile in songKeys if songFile.startswith(os.path.join(directory, ""))]:
+                            watchMove(songFile, newDir + songFile[len(directory):], songKeys, prints)
+                    case ("rescan", _):                         #  Events have been lost, check the whole tree again.
+                        events.extend(watchSync(Walker.Walkers(sourceDirs).songs(), songKeys))
+
+            report.flush()
+
+            if changed and not noSave and time.monotonic() - saved >= Config.WATCH_SAVE:
+                songLibrary.save()
+                songLibrary.DBOverWrite(True)               #  Only backed up on the first save.
+                if tagCache:
+                    tagCache.save()
+                if fingerprintCache:
+                    fingerprintCache.save()
+                logger.debug(f"Saved database with {songLibrary.noOfItems} songs")
+                changed = False
+                saved   = time.monotonic()
+
+            events.extend(watcher.events(watcher.interval))
+    except KeyboardInterrupt:
+        watcher.close()
+
+    duplicateUtils.logTextLine("", report)
+    duplicateUtils.logTextLine(f"Watch stopped, {songLibrary.noOfItems} songs in the database with {tally['duplicates']} duplicates found.", report)
+    if tally["noDups"]:
+        duplicateUtils.logTextLine(f" Found possible {tally['noDups']} duplicates, but with a time difference greater then {difference}.", report)
+    if tally["nearMiss"]:
+        duplicateUtils.logTextLine(f" Found possible {tally['nearMiss']} near matches, within {fuzzyIndex.distance} edits of the artist and title.", report)
+    if tally["falsePos"]:
+        duplicateUtils.logTextLine(f" Found possible {tally['falsePos']} false positives.", report)
+
+
+####################################################################################### watchSync #############
+def watchSync(fileList, songKeys):
+    """  Returns the events that bring the library up to date with the songs in fileList [the DirEntry's of a walk of the source directories].
+         A song is changed if it is not in the library, or its size or mtime are not the same has when scanned.
+         A song in the library that is no longer found has been deleted, these come first - so a song that has been
+         moved is not reported has a duplicate of itself.
+    """
+    changed = []
+    found   = set()
+
+    for entry in fileList:
+        found.add(entry.path)
+        try:
+            signature = Library.Library.signature(entry.stat())
+        except OSError:
+            continue                                        #  Gone since found.
+        key = songKeys.get(entry.path)
+        if key is None or songLibrary.getSignature(key, entry.path) != signature:
+            changed.append(("changed", entry.path))
+
+    return [("deleted", songFile) for songFile in songKeys if songFile not in found] + changed
+
+
+####################################################################################### watchSong #############
+def watchSong(mode, musicFile, songKeys, report, difference, noPrint, checkThe, soundex, tagType, zapMusic, tagCache,
+              fuzzyIndex, fingerprintCache, fingerprintIndex, tally):
+    """  Checks a new or changed song, in watch mode.
+         A changed song is first taken out of the library [and fingerprintIndex], so it is checked against the other songs has if new.
+    """
+    for songFile, tags, stat in tagUtils.readTags([musicFile], tagType, soundex, logger, tagCache):
+        if tags is None:  # Can"t read tags - error has been logged.
+            continue
+        signature = Library.Library.signature(stat) if stat else None
+
+        if songFile in songKeys:
+            key = songKeys.pop(songFile)
+            watchFingerprint(key, songFile, None, fingerprintIndex)
+            songLibrary.delItem(key, songFile)
+
+        if fingerprintCache is not None and fingerprintUtils.needsFingerprint(*tags[2:]):
+            tally["duplicates"] += scanFingerprints(mode, [(songFile, *tags, signature)], report, difference, zapMusic, fingerprintCache,
+                                                    fingerprintIndex)
         else:
-            duplicateUtils.logTextLine(f" Found possible {falsePos} false positives.", duplicateFile)
+            checkSong(mode, songFile, tags, signature, report, difference, noPrint, checkThe, soundex, zapMusic, fuzzyIndex, tally)
 
+        if songLibrary.hasSong(tags[0], songFile):
+            songKeys[songFile] = tags[0]
+
+
+####################################################################################### watchDelete ###########
+def watchDelete(songFile, songKeys, fingerprintIndex=None):
+    """  Takes a deleted song out of the library [and fingerprintIndex], in watch mode.
+    """
+    key = songKeys.pop(songFile, None)
+    if key is not None:
+        watchFingerprint(key, songFile, None, fingerprintIndex)
+        songLibrary.delItem(key, songFile)
+        logger.info(f"Deleted from database :: {songFile}")
+
+
+####################################################################################### watchMove #############
+def watchMove(songFile, newFile, songKeys, fingerprintIndex=None):
+    """  Changes the path of a renamed song in the library [and fingerprintIndex], in watch mode.
+         A song already in the library at newFile has been replaced.
+    """
+    watchDelete(newFile, songKeys, fingerprintIndex)
+    key = songKeys.pop(songFile)
+    watchFingerprint(key, songFile, newFile, fingerprintIndex)
+    songLibrary.moveItem(key, songFile, newFile)
+    songKeys[newFile] = key
+    logger.info(f"Moved in database :: {songFile} to {newFile}")
+
+################################################################################## watchFingerprint ###########
+def watchFingerprint(key, songFile, newFile, fingerprintIndex):
+    """  Keeps fingerprintIndex in step with the library, in watch mode - call before the song at key is changed in the library.
+         The song is moved to newFile, or taken out if newFile is None.
+    """
+    if fingerprintIndex is None:
+        return
+    for path, songDuration in songLibrary.getItems(key):
+        if path == songFile:
+            if newFile is None:
+                fingerprintIndex.remove((songFile, songDuration))
+            else:
+                fingerprintIndex.rename((songFile, songDuration), (newFile, songDuration))
 
 ############################################################################################### __main__ ######
 
@@ -173,14 +530,32 @@ if __name__ == "__main__":
         LGpath = "data\\" +Config.NAME +".log"                     #  Must be a string for a logger path.
         icon   = "resources\\tea.ico"                              # icon used by notifications
 
-    songLibrary = Library.Library()                                # Create the song library.
+    if Config.DB_SHARDS:
+        songLibrary = Library.ShardedLibrary()                     # Create the song library, a shard for each source directory.
+    else:
+        songLibrary = Library.Library()                            # Create the song library.
     songLibrary.set_DBpath(DBpath)
     songLibrary.set_DBformat(Config.DB_FORMAT)
+    songLibrary.DBOverWrite(Config.DB_OVERWRITE)
+
+    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
+        TCpath = Path(Config.DB_LOCATION + Config.CACHE_NAME)
+        FCpath = Path(Config.DB_LOCATION + Config.FINGERPRINT_CACHE_NAME)
+    else:
+        TCpath = Path("data", Config.DB_LOCATION + Config.CACHE_NAME)
+        FCpath = Path("data", Config.DB_LOCATION + Config.FINGERPRINT_CACHE_NAME)
 
     logger      = Logger.get_logger(LGpath)                        # Create the logger.
     timer       = Timer.Timer()
 
-    sourceDir, duplicateFile, noLoad, noSave, build, difference, noPrint, zap, checkThe, checkDB, zapMusic = args.parseArgs(Config.NAME, Config.VERSION, logger, songLibrary)
+    sourceDirs, duplicateFile, noLoad, noSave, build, difference, noPrint, zap, checkThe, checkDB, zapMusic, hashMode, watch, server = args.parseArgs(Config.NAME, Config.VERSION, logger, songLibrary)
+
+    if Config.DB_SHARDS and sourceDirs:
+        songLibrary.addRoots(sourceDirs)
+
+    report = Report.Report(duplicateFile, Config.REPORT_FORMAT)    # The duplicate report, to file or screen.
+    if report.recordsOnScreen:                                      # Standard output only holds the records, the rest goes to standard error.
+        sys.stdout = sys.stderr
 
     if zapMusic:
         print("** WARNING **")
@@ -190,11 +565,16 @@ if __name__ == "__main__":
         duplicateUtils.checkDatabase(songLibrary, "test", DBpath, logger, Config.NAME, Config.VERSION, icon, timeout, Config.NOTIFICATION)          # Run data integrity check in test mode on library.
     elif checkDB == 2:
         duplicateUtils.checkDatabase(songLibrary, "delete", DBpath, logger, Config.NAME, Config.VERSION, icon, timeout, Config.NOTIFICATION)        # Run data integrity check in delete mode on library.
+    elif checkDB == 3:
+        duplicateUtils.checkDatabase(songLibrary, "refresh", DBpath, logger, Config.NAME, Config.VERSION, icon, timeout, Config.NOTIFICATION,      # Run data integrity check in refresh mode on library.
+                                     lambda songFile: tagUtils.scanTags(Config.TAGS, songFile, Config.SOUNDEX, logger))
 
     timer.Start()
 
     if Config.SOUNDEX:
         mode = f"Using Soundex for {Config.TAGS} matching"
+    elif Config.FUZZY:
+        mode = f"Using Strings for {Config.TAGS} matching, with near matches within {Config.FUZZY_DISTANCE} edits"
     else:
         mode = f"Using Strings for {Config.TAGS} matching"
 
@@ -209,51 +589,134 @@ if __name__ == "__main__":
     logger.info(runningInfo)
     logger.debug(f"Using database at {Config.DB_NAME} in {Config.DB_FORMAT} format")
     logger.debug(f"{mode}")
+    logger.debug(f"Writing the duplicate report in {Config.REPORT_FORMAT} format")
+
 
     flag = (True if duplicateFile else False)  # If no duplicateFile then print to screen.
-    License.printShortLicense(Config.NAME, Config.VERSION, duplicateFile, flag)
+    License.printShortLicense(Config.NAME, Config.VERSION, report, flag)
 
     if noLoad or build:
         logger.debug("Not Loading database")
+        songLibrary.clear()                                         # Starts empty, so the songs are no longer counted from the header.
     else:
         songLibrary.load()
 
+    if server:                                                      # Answer look ups until Ctrl-C, the library is not changed.
+        lookupServer = Server.Server(songLibrary, Config.TAGS, Config.SOUNDEX, difference, logger, Config.SERVER_HOST, Config.SERVER_PORT,
+                                     Config.SERVER_THREADS)
+        host, port   = lookupServer.address
+        duplicateUtils.logTextLine(f"Serving {songLibrary.noOfItems} songs at http://{host}:{port} with a time difference of {difference} seconds.  {mode}", report, logger)
+        duplicateUtils.logTextLine("Ctrl-C to stop.", report)
+        lookupServer.serve()
+
+        message = f"{Config.NAME} Server Stopped :: {timer.Stop}"
+        duplicateUtils.logTextLine(message, report)
+        report.close()
+        logger.info(message)
+        logger.info(f"End of {Config.NAME} {Config.VERSION}")
+        sys.exit(0)
+
+    if Config.TAG_CACHE:
+        tagCache = TagCache.TagCache(TCpath, Config.TAGS)         # Create the tag cache.
+        tagCache.load()
+        logger.debug(f"Using tag cache at {TCpath} with {tagCache.noOfItems} songs")
+    else:
+        tagCache = None
+
+    if Config.FINGERPRINT and shutil.which(fingerprintUtils.FFMPEG) is None:
+        duplicateUtils.logTextLine(f"{fingerprintUtils.FFMPEG} not found, songs without useful tags will not be fingerprinted.", report, logger)
+        fingerprintCache = None
+    elif Config.FINGERPRINT:
+        fingerprintCache = TagCache.FingerprintCache(FCpath, Config.FINGERPRINT_SECONDS)   # Create the fingerprint cache.
+        fingerprintCache.load()
+        logger.debug(f"Using fingerprint cache at {FCpath} with {fingerprintCache.noOfItems} songs")
+    else:
+        fingerprintCache = None
+
+    if Config.FUZZY and not (build or hashMode):
+        fuzzyIndex = FuzzyIndex.FuzzyIndex(songLibrary.keys(), Config.FUZZY_DISTANCE)   # Trigram index of the keys, for near matches.
+        logger.debug(f"Built fuzzy index of {len(fuzzyIndex)} keys")
+    else:
+        fuzzyIndex = None
+
     if zap:
         if Config.ZAP_RECYCLE:
             logger.debug("Will zap [Recycle mode] none music files.")
         else:
             logger.debug("Will zap [Delete mode] none music files.")
 
-    fileList = []
-    songsCount = duplicateUtils.countSongs(sourceDir, fileList, Config.NCOLS)
+    walker  = Walker.Walkers(sourceDirs)                            # The one walk of each sourceDir, also used by removeUnwanted.
+    sources = ", ".join(os.fspath(sourceDir) for sourceDir in sourceDirs)
 
-    if build:
-        duplicateUtils.logTextLine(f"Building Database from {sourceDir} with a time difference of {difference} seconds.  {mode}", duplicateFile, logger)
-        duplicateUtils.logTextLine(f"... with a song count of {songsCount} in {timer.Elapsed} Seconds", duplicateFile, logger)
-        scanMusic("build", fileList, duplicateFile, difference, songsCount, noPrint, checkThe, Config.SOUNDEX, Config.TAGS, zapMusic)
+    if Config.SCAN_STREAM:                                          # Songs are scanned as the walk finds them.
+        fileLists  = [root.songs() for root in walker.walkers]
+        counts     = [tagCache.getCount(sourceDir) if tagCache else None for sourceDir in sourceDirs]
+        songsCount = None if None in counts else sum(counts)        # Song count of the last run, if known.
+        countInfo  = f"... with a song count of {songsCount} on the last run" if songsCount else "... song count not yet known"
     else:
-        duplicateUtils.logTextLine(f"Scanning {sourceDir} with a time difference of {difference} seconds  {mode}", duplicateFile, logger)
-        duplicateUtils.logTextLine(f"... with a song count of {songsCount} in {timer.Elapsed} Seconds", duplicateFile, logger)
-        scanMusic("scan", fileList, duplicateFile, difference, songsCount, noPrint, checkThe, Config.SOUNDEX, Config.TAGS, zapMusic)
-
-    if noSave:
+        fileLists  = [[] for _ in walker.walkers]
+        songsCount = sum(duplicateUtils.countSongs(root, fileList, Config.NCOLS) for root, fileList in zip(walker.walkers, fileLists, strict=True))
+        countInfo  = f"... with a song count of {songsCount} in {timer.Elapsed} Seconds"
+
+    if hashMode:
+        duplicateUtils.logTextLine(f"Hashing {sources} for byte identical songs.", report, logger)
+        duplicateUtils.logTextLine(countInfo, report, logger)
+        scanHashes(chain.from_iterable(fileLists), report, zapMusic, Config.HASH_THREADS)
+    elif watch:
+        watcher = Watcher.Watcher(sourceDirs, Config.WATCH_INTERVAL, Config.WATCH_POLL)
+        duplicateUtils.logTextLine(f"Watching {sources} with a time difference of {difference} seconds.  {mode}", report, logger)
+        watchMusic("build" if build else "scan", chain.from_iterable(fileLists), watcher, report, difference, noPrint, checkThe, Config.SOUNDEX, Config.TAGS, zapMusic,
+                   tagCache, fuzzyIndex, fingerprintCache)
+    elif build:
+        duplicateUtils.logTextLine(f"Building Database from {sources} with a time difference of {difference} seconds.  {mode}", report, logger)
+        duplicateUtils.logTextLine(countInfo, report, logger)
+        scanMusic("build", fileLists, report, difference, songsCount, noPrint, checkThe, Config.SOUNDEX, Config.TAGS, zapMusic, tagCache,
+                  None, fingerprintCache)
+    else:
+        duplicateUtils.logTextLine(f"Scanning {sources} with a time difference of {difference} seconds  {mode}", report, logger)
+        duplicateUtils.logTextLine(countInfo, report, logger)
+        scanMusic("scan", fileLists, report, difference, songsCount, noPrint, checkThe, Config.SOUNDEX, Config.TAGS, zapMusic, tagCache,
+                  fuzzyIndex, fingerprintCache)
+
+    for error in walker.errors:
+        logger.error(f"Can't read directory :: {error}")
+    for root in walker.walkers:
+        logger.debug(f"Walk found {root.count} songs in {root.sourceDir}")
+
+    if tagCache:
+        for root in walker.walkers:
+            tagCache.setCount(root.sourceDir, root.count)
+            if not (hashMode or watch):                             # Not every song is looked up in hash or watch mode.
+                tagCache.prune(root.sourceDir)
+        tagCache.save()
+        logger.debug(f"Tag cache :: {tagCache.hits} hits, {tagCache.misses} songs read")
+
+    if fingerprintCache:
+        if not (hashMode or watch):
+            for sourceDir in sourceDirs:
+                fingerprintCache.prune(sourceDir)
+        fingerprintCache.save()
+        logger.debug(f"Fingerprint cache :: {fingerprintCache.hits} hits, {fingerprintCache.misses} songs decoded")
+
+    if noSave or hashMode:
         logger.debug("Not Saving database")
     else:
         if not Config.DB_OVERWRITE:
             logger.debug(f"Not over writing database {DBpath}")
-        songLibrary.DBOverWrite(Config.DB_OVERWRITE)
         songLibrary.save()
 
     timeStop = timer.Stop
 
     message = f"{Config.NAME} Completed :: {timeStop}"
 
-    duplicateUtils.logTextLine("", duplicateFile)
-    duplicateUtils.logTextLine(message, duplicateFile)
-    duplicateUtils.logTextLine("", duplicateFile)
+    duplicateUtils.logTextLine("", report)
+    duplicateUtils.logTextLine(message, report)
+    duplicateUtils.logTextLine("", report)
+    report.close()
     print(message)
 
-    #logger.info(f"{removeThe.cache_info()}")
+    for line in keyUtils.cacheStats():
+        logger.debug(line)
     logger.info(message)
     logger.info(f"End of {Config.NAME} {Config.VERSION}")
 
@@ -82,12 +82,13 @@ class Config():
     @property
     def TAGS(self):
         """  Returns the module used to scan the mp3 tags.
-             Currently supports three modules tinytag, mutagen or eyed3.
+             Currently supports four modules tinytag, mutagen, eyed3 or fast.
+             fast only reads the artist, title and duration - falling back to tinytag for songs it can't read.
              Will default to tinytag, if module returns other.
         """
         module = self.config["TAGS"]["module"]
 
-        if module == "mutagen" or module == "eyed3":
+        if module in ("mutagen", "eyed3", "fast"):
             return module
         else:
             return "tinytag"
@@ -104,16 +105,32 @@ class Config():
         """  Returns the Soundex marker.
              if true, uses Soundex for tags matching else use normal strings.
         """
-        return self.config["TAGS"]["soundex"]
+        return self.config["TAGS"]["soundex"] and not self.FUZZY
+
+    @property
+    def FUZZY(self):
+        """  Returns the fuzzy marker.
+             if true, uses normal strings for the keys and looks for near matches in a trigram index of the keys.
+             Switches off Soundex.
+        """
+        return self.config["TAGS"]["fuzzy"]
+
+    @property
+    def FUZZY_DISTANCE(self):
+        """  Returns the maximum edit distance [characters inserted, deleted or changed] of a near match.
+        """
+        return self.config["TAGS"]["fuzzyDistance"]
 
     @property
     def DB_FORMAT(self):
-        """  Returns the format of the song library - either pickle or json.
+        """  Returns the format of the song library - either pickle, json, columnar or sqlite.
+             columnar is the most compact and the quickest to load.
+             sqlite only reads the songs it needs and only writes the songs that have changed.
         """
         format = self.config["DATABASE"]["format"]
 
-        if format == "json":
-            return "json"
+        if format in ("json", "columnar", "sqlite"):
+            return format
         else:
             return "pickle"
 
@@ -142,9 +159,165 @@ class Config():
     def DB_OVERWRITE(self):
         """  If set to True the old database file, if exists, will be overwritten.
              If set to False the old database file will be backed up before new one is written.
+             Not used by sqlite, that is updated in place.
         """
         return self.config["DATABASE"]["overwrite"]
 
+    @property
+    def DB_SHARDS(self):
+        """  If set to True the database is saved has a shard for each source directory [-s], i.e. one per disk.
+             A single source directory can then be rebuilt without touching the others.
+        """
+        return self.config["DATABASE"]["shards"]
+
+    @property
+    def SCAN_STREAM(self):
+        """  If set to True the songs are scanned while the directory walk is still going.
+             If set to False the songs are counted first, slower to start but gives an exact progress bar.
+        """
+        return self.config["SCAN"]["stream"]
+
+    @property
+    def SCAN_WORKERS(self):
+        """  Returns the number of worker processes used to read the song tags.
+             If 0, the tags are read one at a time in the main process.
+        """
+        return self.config["SCAN"]["workers"]
+
+    @property
+    def SCAN_CHUNKSIZE(self):
+        """  Returns the number of songs handed to a worker process in one go.
+        """
+        return self.config["SCAN"]["chunkSize"]
+
+    @property
+    def PREFETCH_THREADS(self):
+        """  Returns the number of threads used to read ahead songs, before their tags are read.
+             Helps when the music is on a network drive.  If 0, there is no read ahead.
+             Only used when the tags are read in the main process [workers = 0].
+        """
+        return self.config["SCAN"]["prefetchThreads"]
+
+    @property
+    def PREFETCH_DEPTH(self):
+        """  Returns the maximum number of songs read ahead at any one time, keeps memory bounded.
+        """
+        return self.config["SCAN"]["prefetchDepth"]
+
+    @property
+    def HASH_THREADS(self):
+        """  Returns the number of threads used to hash the songs, in hash mode [-H].
+        """
+        return self.config["SCAN"]["hashThreads"]
+
+    @property
+    def TAG_CACHE(self):
+        """  If set to True the tags of each song are cached, keyed on the song path and stat signature.
+             Only new or changed songs will then have their tags read.
+        """
+        return self.config["CACHE"]["tagCache"]
+
+    @property
+    def CACHE_NAME(self):
+        """  Returns the location and filename of the tag cache.
+             if location is empty will use just filename, so save next to main script.
+        """
+        location = self.config["DATABASE"]["location"]
+        filename = self.config["CACHE"]["filename"]
+
+        if location:
+            return f"{location}\\{filename}.pickle"
+        else:
+            return f"{filename}.pickle"
+
+    @property
+    def FINGERPRINT(self):
+        """  If set to True the songs with empty or placeholder tags [i.e. Unknown Artist] are matched by an audio fingerprint.
+             Needs ffmpeg to decode the songs.
+        """
+        return self.config["FINGERPRINT"]["fingerprint"]
+
+    @property
+    def FINGERPRINT_SECONDS(self):
+        """  Returns the number of seconds from the start of each song that are fingerprinted.
+        """
+        return self.config["FINGERPRINT"]["seconds"]
+
+    @property
+    def FINGERPRINT_THRESHOLD(self):
+        """  Returns the highest bit error rate of two fingerprints that match, two different songs are about 0.5.
+        """
+        return self.config["FINGERPRINT"]["threshold"]
+
+    @property
+    def FINGERPRINT_WORKERS(self):
+        """  Returns the number of worker processes used to fingerprint the songs.
+             If 0, the songs are fingerprinted one at a time in the main process.
+        """
+        return self.config["FINGERPRINT"]["workers"]
+
+    @property
+    def FINGERPRINT_CACHE_NAME(self):
+        """  Returns the location and filename of the fingerprint cache.
+             if location is empty will use just filename, so save next to main script.
+        """
+        location = self.config["DATABASE"]["location"]
+        filename = self.config["FINGERPRINT"]["filename"]
+
+        if location:
+            return f"{location}\\{filename}.pickle"
+        else:
+            return f"{filename}.pickle"
+
+    @property
+    def WATCH_POLL(self):
+        """  If set to True the source directory is always polled in watch mode [-w].
+             If set to False inotify is used on Linux, the source directory is polled elsewhere.
+        """
+        return self.config["WATCH"]["poll"]
+
+    @property
+    def WATCH_INTERVAL(self):
+        """  Returns the number of seconds between polls of the source directory, in watch mode.
+        """
+        return self.config["WATCH"]["interval"]
+
+    @property
+    def WATCH_SAVE(self):
+        """  Returns the number of seconds between saves of the database, in watch mode - if there have been changes.
+        """
+        return self.config["WATCH"]["saveEvery"]
+
+    @property
+    def SERVER_HOST(self):
+        """  Returns the address the look up server [-S] listens on, keep to 127.0.0.1 so only this machine can ask.
+        """
+        return self.config["SERVER"]["host"]
+
+    @property
+    def SERVER_PORT(self):
+        """  Returns the port the look up server listens on.
+        """
+        return self.config["SERVER"]["port"]
+
+    @property
+    def SERVER_THREADS(self):
+        """  Returns the number of threads used to read the songs of a batch look up.
+        """
+        return self.config["SERVER"]["threads"]
+
+    @property
+    def REPORT_FORMAT(self):
+        """  Returns the format of the duplicate report - either text, jsonl or csv.
+             jsonl and csv write one record per duplicate pair, for other programs to read.
+        """
+        format = self.config["REPORT"]["format"]
+
+        if format in ("jsonl", "csv"):
+            return format
+        else:
+            return "text"
+
     @property
     def ZAP_RECYCLE(self):
         """  If set to True the recycle bin will be used for deletes.
@@ -172,14 +345,43 @@ class Config():
 
         config["TQDM"] = {"ncols": 160}
 
-        config["TAGS"] = {"module" : "tinytag",
-                          "ignore" : "**IGNORE**",
-                          "soundex": True}
+        config["TAGS"] = {"module"       : "tinytag",
+                          "ignore"       : "**IGNORE**",
+                          "soundex"      : True,
+                          "fuzzy"        : False,
+                          "fuzzyDistance": 2}
 
         config["DATABASE"] = {"format"   : "pickle",
                               "filename" : "dup",
                               "location" : "",
-                              "overwrite": False}
+                              "overwrite": False,
+                              "shards"   : False}
+
+        config["SCAN"] = {"stream"         : True,
+                          "workers"        : 0,
+                          "chunkSize"      : 64,
+                          "prefetchThreads": 0,
+                          "prefetchDepth"  : 64,
+                          "hashThreads"    : 8}
+
+        config["CACHE"] = {"tagCache": True,
+                           "filename": "tagCache"}
+
+        config["FINGERPRINT"] = {"fingerprint": False,
+                                 "seconds"    : 30,
+                                 "threshold"  : 0.35,
+                                 "workers"    : 2,
+                                 "filename"   : "fingerprintCache"}
+
+        config["WATCH"] = {"poll"     : False,
+                           "interval" : 2.0,
+                           "saveEvery": 300}
+
+        config["SERVER"] = {"host"   : "127.0.0.1",
+                            "port"   : 8484,
+                            "threads": 8}
+
+        config["REPORT"] = {"format": "text"}
 
         config["ZAP"] = {"recycle" : True,
                          "emptyDir": True}
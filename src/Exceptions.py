@@ -46,3 +46,31 @@ class LibraryError(Exception):
             return "LibraryError, {0} ".format(self.message)
         else:
             return "LibraryError has been raised"
+
+
+class FastTagError(Exception):
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return "FastTagError, {0} ".format(self.message)
+        else:
+            return "FastTagError has been raised"
+
+
+class FingerprintError(Exception):
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return "FingerprintError, {0} ".format(self.message)
+        else:
+            return "FingerprintError has been raised"
@@ -0,0 +1,153 @@
+###############################################################################################################
+#    FingerprintIndex.py   Copyright (C) <2025>  <Kevin Scott>                                                #
+#    An index over the fingerprints of songs, used to find the same song whatever its tags.                   #
+#                                                                                                             #
+#    Each 32 bit value of a fingerprint is split into two 16 bit halves, each half lists the songs and frames #
+#    that hold it.  A half survives a re-encode far more often than the whole value, so the songs that share  #
+#    a couple of halves at the same offset are then checked by their bit error rate - the rest of the index   #
+#    is never looked at.                                                                                      #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+from collections import Counter
+
+import src.utils.fingerprintUtils as fingerprintUtils
+
+
+class FingerprintIndex():
+    """  A simple class that holds an index of song fingerprints [from fingerprintUtils.makeFingerprint].
+
+         usage:
+         fingerprintIndex = FingerprintIndex.FingerprintIndex(threshold)
+            threshold = the highest bit error rate of a match, 0.35 is the usual - two different songs are about 0.5.
+
+         fingerprintIndex.add(item, fingerprint) - add a song, item is anything hashable - i.e. (songFile, songDuration).
+         fingerprintIndex.remove(item)           - take a song out, returns True if found.
+         fingerprintIndex.rename(item, newItem)  - change the item of a song, returns True if found.
+         fingerprintIndex.search(fingerprint)    - list of (item, bit error rate) for the songs that match, best first.
+         len(fingerprintIndex)                   - number of songs held.
+
+         A song taken out is only marked has gone, its halves are skipped by search - so the index can be kept up to
+         date has songs change [i.e. watch mode], without building it again.
+    """
+
+    __slots__ = ["threshold", "_items", "_prints", "_halves", "_where"]
+
+    MIN_VOTES   = 2             #  Halves that must agree on an offset, before a song is checked.
+    MIN_OVERLAP = 32            #  Frames that must overlap for a match, about 3 seconds.
+    MAX_OFFSET  = 1 << 16       #  Frames in the longest fingerprint.
+    SKIP        = (0, 0xFFFF)   #  Halves of silence or a constant tone, held by too many songs to help.
+
+    def __init__(self, threshold=0.35):
+        self.threshold = threshold
+        self._items    = []         #  The item of each song.
+        self._prints   = []         #  The fingerprint values of each song.
+        self._halves   = {}         #  The song id and frame of each half, packed into one int.
+        self._where    = {}         #  The song id of each item held, not those taken out.
+
+    def __len__(self):
+        return len(self._where)
+
+    def add(self, item, fingerprint):
+        """  Adds a song to the index, any song already held has item is replaced.
+        """
+        self.remove(item)
+        index  = len(self._items)
+        values = fingerprintUtils.unpack(fingerprint)[:self.MAX_OFFSET]
+        self._where[item] = index
+        self._items.append(item)
+        self._prints.append(values)
+
+        for frame, value in enumerate(values):
+            for half in self._halvesOf(value):
+                self._halves.setdefault(half, []).append(index * self.MAX_OFFSET + frame)
+
+    def remove(self, item):
+        """  Takes a song out of the index, returns True if it was held.
+        """
+        index = self._where.pop(item, None)
+        if index is None:
+            return False
+        self._items[index]  = None
+        self._prints[index] = None
+        return True
+
+    def rename(self, item, newItem):
+        """  Changes the item of a song, i.e. the song has been moved - its fingerprint is kept.
+             Any song already held has newItem is replaced.  Returns True if item was held.
+        """
+        if item not in self._where:
+            return False
+        if newItem != item:
+            self.remove(newItem)
+            index                = self._where.pop(item)
+            self._items[index]   = newItem
+            self._where[newItem] = index
+        return True
+
+    def search(self, fingerprint):
+        """  Returns a list of (item, bit error rate) for every song that matches the fingerprint, best first.
+             The songs are lined up by the offset most halves agree on, so a song that starts a little later still matches.
+        """
+        values = fingerprintUtils.unpack(fingerprint)[:self.MAX_OFFSET]
+        votes  = Counter()
+        for frame, value in enumerate(values):
+            for half in self._halvesOf(value):
+                for packed in self._halves.get(half, ()):
+                    index, songFrame = divmod(packed, self.MAX_OFFSET)
+                    votes[index, songFrame - frame] += 1
+
+        best = {}                                           #  The offset with the most votes, for each song.
+        for (index, offset), count in votes.items():
+            if count >= self.MIN_VOTES and count > best.get(index, (0, 0))[0] and self._prints[index] is not None:
+                best[index] = (count, offset)
+
+        found = []
+        for index, (_, offset) in best.items():
+            errorRate = self.bitErrorRate(values, self._prints[index], offset)
+            if errorRate <= self.threshold:
+                found.append((self._items[index], errorRate))
+
+        found.sort(key=lambda match: match[1])
+        return found
+
+    @classmethod
+    def bitErrorRate(cls, values, others, offset=0):
+        """  Returns the fraction of bits that differ between two fingerprints, others shifted back by offset frames.
+             Returns 1.0 if fewer than MIN_OVERLAP frames overlap.
+        """
+        if offset >= 0:
+            pairs = zip(values, others[offset:], strict=False)
+        else:
+            pairs = zip(values[-offset:], others, strict=False)
+
+        frames = errors = 0
+        for value, other in pairs:
+            errors += (value ^ other).bit_count()
+            frames += 1
+
+        if frames < cls.MIN_OVERLAP:
+            return 1.0
+        return errors / (32 * frames)
+
+    @classmethod
+    def _halvesOf(cls, value):
+        """  Returns the two 16 bit halves of a value, the high half tagged so the two can't clash - any in SKIP are left out.
+        """
+        low  = value & 0xFFFF
+        high = value >> 16
+        return [tagged for half, tagged in ((low, low), (high, high | 0x10000)) if half not in cls.SKIP]
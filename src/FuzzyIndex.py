@@ -0,0 +1,144 @@
+###############################################################################################################
+#    FuzzyIndex.py   Copyright (C) <2020-2025>  <Kevin Scott>                                                 #
+#    A trigram index over the library keys, used to find near miss spellings of an artist and title.          #
+#                                                                                                             #
+#    Each key is broken into its trigrams [runs of three characters], each trigram lists the keys that        #
+#    hold it.  Two keys within an edit distance d share all but at most 3 * d of their trigrams, so only      #
+#    the keys that share enough trigrams are checked with a [bounded] edit distance - the rest of the         #
+#    library is never looked at.                                                                              #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+
+class FuzzyIndex():
+    """  A simple class that holds a trigram index of the library keys.
+         Keys are compared lower case, each spelling is held once.
+
+         usage:
+         fuzzyIndex = FuzzyIndex.FuzzyIndex(keys, distance)
+            keys     = the keys already in the library.
+            distance = maximum edit distance of a near match.
+
+         fuzzyIndex.add(key)             - add a key, adding a key already held does nothing.
+         fuzzyIndex.search(key)          - list of (near key, distance) for the keys within distance, nearest first.
+                                           key itself is left out.
+         len(fuzzyIndex)                 - number of keys held.
+
+         A near key can only miss 3 trigrams for each edit, so the keys looked at are those that share enough trigrams.
+         A very short key [no more trigrams than 3 * distance] may share none, the keys of about the same length are looked at instead.
+    """
+
+    __slots__ = ["distance", "_ids", "_spellings", "_keys", "_grams", "_lengths", "_count"]
+
+    GRAM = 3
+
+    def __init__(self, keys=(), distance=2):
+        self.distance   = distance
+        self._ids       = {}            #  The id of each spelling.
+        self._spellings = []            #  The spelling of each id.
+        self._keys      = []            #  The keys held at each id.
+        self._grams     = {}            #  The ids of the spellings that hold each trigram.
+        self._lengths   = {}            #  The ids of the spellings of each length.
+        self._count     = 0
+
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, key):
+        """  Adds a key to the index.
+        """
+        spelling = key.lower()
+        index    = self._ids.get(spelling)
+        if index is not None:
+            if key not in self._keys[index]:
+                self._keys[index].append(key)
+                self._count += 1
+            return
+
+        index = self._ids[spelling] = len(self._spellings)
+        self._spellings.append(spelling)
+        self._keys.append([key])
+        self._count += 1
+
+        self._lengths.setdefault(len(spelling), []).append(index)
+        for gram in self.trigrams(spelling):
+            self._grams.setdefault(gram, []).append(index)
+
+    def search(self, key):
+        """  Returns a list of (near key, distance) for every key within distance of key, nearest first.
+        """
+        spelling = key.lower()
+        grams    = self.trigrams(spelling)
+        needed   = len(grams) - self.GRAM * self.distance
+
+        candidates = set()
+        if needed > 0:
+            #  A near key misses at most 3 * distance of the trigrams, so it must hold one of any 3 * distance + 1 of them.
+            #  Only the keys holding the rarest of them are looked at.
+            postings = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+            for posting in postings[:len(grams) - needed + 1]:
+                candidates.update(posting)
+        else:
+            for length in range(len(spelling) - self.distance, len(spelling) + self.distance + 1):
+                candidates.update(self._lengths.get(length, ()))
+
+        found = []
+        for index in candidates:
+            candidate = self._spellings[index]
+            if abs(len(candidate) - len(spelling)) > self.distance or len(grams & self.trigrams(candidate)) < needed:
+                continue
+            distance = levenshtein(spelling, candidate, self.distance)
+            if distance <= self.distance:
+                found.extend((nearKey, distance) for nearKey in self._keys[index] if nearKey != key)
+
+        found.sort(key=lambda near: (near[1], near[0]))
+        return found
+
+    @classmethod
+    def trigrams(cls, spelling):
+        """  Returns the set of trigrams of a spelling, padded so the first and last characters count in full.
+        """
+        padded = f"  {spelling} "
+        return {padded[start:start + cls.GRAM] for start in range(len(padded) - cls.GRAM + 1)}
+
+####################################################################################### levenshtein ###########
+def levenshtein(first, second, limit=None):
+    """  Returns the edit distance between two strings, the number of single character inserts,
+         deletes and changes needed to turn one into the other.
+         If limit is given, stops has soon has the distance must be more than limit - and returns limit + 1.
+    """
+    if first == second:
+        return 0
+    if len(first) < len(second):
+        first, second = second, first
+    if not second:
+        return len(first)
+
+    previous = list(range(len(second) + 1))
+    for row, char1 in enumerate(first, 1):
+        current = [row]
+        for column, char2 in enumerate(second, 1):
+            current.append(min(previous[column] + 1,                          #  Delete.
+                               current[column - 1] + 1,                       #  Insert.
+                               previous[column - 1] + (char1 != char2)))      #  Change.
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
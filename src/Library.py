@@ -6,11 +6,17 @@
 #      The key is either made up of {song.artist}:{tag.title}                                                 #
 #        or soundex({song.artist}:{tag.title})                                                                #
 #        or any unique token generated from the song.                                                         #
-#      The data is a list [songFile, songDuration                                            #
+#      The data is a bucket of [songFile, songDuration] entries, one for each song sharing the key.          #
 #                                                                                                             #
-#    Uses pickle or json to load and save the library.                                                        #
+#    Uses pickle, json or a compact columnar format to load and save the library.                             #
+#    Or a SQLite database, where songs are looked up by key has needed and only changes are written.          #
+#                                                                                                             #
+#    Each database carries a small header [number of songs, format version and a content hash],               #
+#    so the number of songs can be found without loading the whole library.                                   #
 #    The format is specified when the library is created.                                                     #
 #                                                                                                             #
+#    ShardedLibrary saves the library has a shard per source directory, so one disk can be rebuilt alone.     #
+#                                                                                                             #
 ###############################################################################################################
 #    Copyright (C) <2020-2022>  <Kevin Scott>                                                                 #
 #                                                                                                             #
@@ -28,42 +34,269 @@
 ###############################################################################################################
 
 import os
+import sys
 import json
 import pickle
+import struct
+import sqlite3
+import hashlib
 import datetime
 import pathlib
 
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from bisect import bisect_left, bisect_right
+
 import src.Timer as Timer
 import src.Exceptions as myExceptions
 
 
+class Bucket():
+    """  A compact holder for all the songs that share a key.
+         The song durations are held sorted in an array of doubles, the song paths in a parallel list.
+         So the songs within +/- difference of a duration are found with two binary searches, O(log n).
+         The artist and title of each song [has read by scanTags] are held in a third parallel list,
+         None for a song added by an older version - these have to be read from the song if needed.
+         The fingerprint of each song [fingerprintUtils.makeFingerprint] is held in a fourth, None if not fingerprinted.
+         The stat signature of each song [size, mtime] when it was scanned is held in a fifth, None if not known.
+         The duration of each song is also held in a dictionary by song path, so a song is found by binary search
+         rather than by looking through every path - a hot key [i.e. Unknown:Track 01] stays fast.
+
+         usage:
+         bucket = Bucket.fromSongs(songs)            - a bucket built in one go, from (songFile, songDuration, tags, fingerprint, signature).
+         bucket.add(songFile, songDuration, tags, fingerprint, signature)
+                                                     - if songFile is already held, its duration is updated.
+                                                       If fingerprint is None, any fingerprint already held is kept
+                                                       - unless the song has changed.
+         bucket.remove(songFile)                     - returns True if found.
+         bucket.matches(duration, difference)        - list of (songFile, songDuration) within +/- difference.
+         bucket.tagsOf(songFile)                     - (artist, title) of the song, or None.
+         bucket.signatureOf(songFile)                - (size, mtime) of the song when scanned, or None.
+         bucket.rename(songFile, newFile)            - returns True if found.
+         bucket.entries()                            - (songFile, songDuration, tags, fingerprint, signature) for each song.
+         songFile in bucket
+    """
+
+    __slots__ = ["paths", "durations", "tags", "prints", "signatures", "known"]
+
+    EPSILON = 1e-6
+
+    def __init__(self):
+        self.paths     = []
+        self.durations = array("d")
+        self.tags      = []
+        self.prints     = []
+        self.signatures = []
+        self.known      = {}                #  {songFile: songDuration} of every song held.
+
+    @classmethod
+    def fromSongs(cls, songs):
+        """  Returns a bucket holding songs, each (songFile, songDuration, tags, fingerprint, signature).
+             The songs are sorted once [quick if they already are, has saved], rather than added one at a time.
+             A song given more than once keeps its last entry.
+        """
+        latest = {}
+        for song in songs:
+            latest[song[0]] = song
+
+        bucket = cls()
+        if latest:
+            songs = sorted(latest.values(), key=lambda song: song[1])
+            bucket.paths, durations, bucket.tags, bucket.prints, bucket.signatures = (list(column) for column in zip(*songs, strict=True))
+            bucket.durations = array("d", durations)
+            bucket.known     = dict(zip(bucket.paths, durations, strict=True))
+        return bucket
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, songFile):
+        return songFile in self.known
+
+    def __iter__(self):
+        return zip(self.paths, self.durations, strict=True)
+
+    def entries(self):
+        return zip(self.paths, self.durations, self.tags, self.prints, self.signatures, strict=True)
+
+    def add(self, songFile, songDuration, tags=None, fingerprint=None, signature=None):
+        """  Adds a song to the bucket, in duration order.  If the song is already held its duration is updated.
+             tags is (artist, title) or None, fingerprint is bytes or None, signature is (size, mtime) or None.
+        """
+        position = self._position(songFile)
+        if position >= 0:
+            if fingerprint is None and (signature is None or signature == self.signatures[position]):
+                fingerprint = self.prints[position]
+            self._delete(position)
+        position = bisect_right(self.durations, songDuration)
+        self.paths.insert(position, songFile)
+        self.durations.insert(position, songDuration)
+        self.tags.insert(position, tags)
+        self.prints.insert(position, fingerprint)
+        self.signatures.insert(position, signature)
+        self.known[songFile] = songDuration
+
+    def remove(self, songFile):
+        """  Removes a song from the bucket, returns True if the song was found.
+        """
+        position = self._position(songFile)
+        if position < 0:
+            return False
+        self._delete(position)
+        return True
+
+    def tagsOf(self, songFile):
+        """  Returns the (artist, title) of the song, or None if not held or added without them.
+        """
+        position = self._position(songFile)
+        return self.tags[position] if position >= 0 else None
+
+    def signatureOf(self, songFile):
+        """  Returns the (size, mtime) of the song when scanned, or None if not held or not known.
+        """
+        position = self._position(songFile)
+        return self.signatures[position] if position >= 0 else None
+
+    def rename(self, songFile, newFile):
+        """  Changes the path of a song, everything else is kept.  Any song already held at newFile is replaced.
+             Returns True if the song was found.
+        """
+        if songFile not in self.known:
+            return False
+        if newFile != songFile:
+            self.remove(newFile)
+            self.paths[self._position(songFile)] = newFile
+            self.known[newFile] = self.known.pop(songFile)
+        return True
+
+    def _position(self, songFile):
+        """  Returns the position of the song in the bucket, or -1 if not held.
+             Only the songs with the same duration are looked through.
+        """
+        duration = self.known.get(songFile)
+        if duration is None:
+            return -1
+        low = bisect_left(self.durations, duration)
+        try:
+            return self.paths.index(songFile, low, bisect_right(self.durations, duration, low))
+        except ValueError:                      #  i.e. a duration of nan, which does not sort.
+            return self.paths.index(songFile)
+
+    def _delete(self, position):
+        del self.known[self.paths[position]]
+        del self.paths[position]
+        del self.durations[position]
+        del self.tags[position]
+        del self.prints[position]
+        del self.signatures[position]
+
+    def matches(self, duration, difference, exclude=None):
+        """  Returns a list of (songFile, songDuration) for every song in the bucket within +/- difference of duration.
+             The song exclude [if given] is left out, a song is not a duplicate of itself.
+
+             The range is found by binary search, widened a touch so floating point rounding at the edges
+             can't lose a song - the songs in range are then checked exactly has before.
+        """
+        low  = bisect_left(self.durations, duration - difference - self.EPSILON)
+        high = bisect_right(self.durations, duration + difference + self.EPSILON, low)
+
+        return [(path, songDuration) for path, songDuration in zip(self.paths[low:high], self.durations[low:high], strict=True)
+                if abs(duration - songDuration) <= difference and path != exclude]
+
+
 class Library():
     """  A simple class that wraps the library dictionary.
+         Each key holds a Bucket of songs, so every song that shares a key is kept.
 
          usage:
          songLibrary = myLibrary.Library(name, format)
             name = name of datebase
-            format = format used to save database = either pickle or json.
+            format = format used to save database = either pickle, json, columnar or sqlite.
 
-         to add an item              - songLibrary.addItem(key, musicFile, musicDuration) - Data specific.
-         to retrieve an item         - songFile, songDuration, songDuplicate = songLibrary.getItem(key) - Data specific.
+         to add an item              - songLibrary.addItem(key, musicFile, musicDuration, artist, title, fingerprint, signature)
+                                       - Data specific, signature = Library.signature(stat), the stat taken by tagUtils.readTags.
+         to retrieve fingerprints    - for key, songFile, songDuration, fingerprint in songLibrary.getFingerprints():
+         to retrieve a songs tags    - artist, title = songLibrary.getTags(key, songFile) - None if not held.
+         to retrieve a songs stat    - size, mtime = songLibrary.getSignature(key, songFile) - None if not held.
+         to retrieve the song keys   - for songFile, key in songLibrary.songKeys(directory).items():
+         to retrieve an item         - songFile, songDuration = songLibrary.getItem(key) - the first song at key.
+         to retrieve all items       - for songFile, songDuration in songLibrary.getItems(key):
+         to find duplicates          - songLibrary.findMatches(key, musicDuration, difference, musicFile)
          to test for key             - if songLibrary.hasKey(key):
-         to return number of items   - l = songLibrary.noOfItems()
+         to test for a song          - if songLibrary.hasSong(key, musicFile):
+         to rename a song            - songLibrary.moveItem(key, musicFile, newFile)
+         to return number of items   - l = songLibrary.noOfItems() - read from the header, if not loaded.
+         to read the header          - header = songLibrary.readHeader() - {version, count, hash, saved} or None.
          to test database integrity  - songLibrary.check("test") - Data specific.
          to prune database           - songLibrary.check("delete")
+         to refresh changed songs    - songLibrary.check("refresh", rescan=rescan) - rescan(songFile) returns the songs new
+                                       (key, duration, artist, title), i.e. tagUtils.scanTags.
          to load items               - songLibrary.load()
          to save items               - songLibrary.save()
 
          TODO - possibly needs error checking [some done, some to go].
     """
 
-    __slots__ = ["library", "timer", "filename", "format", "__overWrite"]
+    __slots__ = ["_library", "_columns", "_db", "_dirty", "_absent", "_complete", "_synced", "_untouched", "timer", "filename", "format", "__overWrite"]
+
+    DB_VERSION       = 5                                   #  Version of the saved format, held in the header.
+    HEADER_KEY       = "__pyMP3duplicate__"                #  Marks the header in pickle and json files.
+    PICKLE_PEEK      = 64                                  #  Bytes at the start of a pickle file that hold the header key.
+
+    CHECK_THREADS    = 16                                  #  Directories listed at once by check, helps on a network drive.
+
+    COLUMNAR_MAGIC   = b"PYMP3COL"
+    COLUMNAR_VERSION = 5
+    COLUMNAR_HEADER  = struct.Struct("<8sIIII16s")         #  magic, version, number of keys, directories, songs and content hash.
 
     def __init__(self):
-        self.library     = {}
+        self._library    = {}
+        self._columns    = None                         #  A columnar file that has been read, but not yet unpacked.
+        self._db         = None                         #  An open SQLite database, songs are read from it when first needed.
+        self._dirty      = set()                        #  Keys changed since the SQLite database was loaded or saved.
+        self._absent     = set()                        #  Keys known not to be in the SQLite database.
+        self._complete   = True                         #  False while there are songs in the SQLite database not yet read.
+        self._synced     = False                        #  True once loaded from or saved to the SQLite database, only changes are then saved.
+        self._untouched  = True                         #  True until loaded, added to or cleared, the header then counts the songs.
         self.timer       = Timer.Timer()                #  A timer class.
         self.__overWrite = True
 
+    @property
+    def library(self):
+        """  The library dictionary, if a columnar file has been read it is only unpacked on first use.
+             For a SQLite database, any songs not yet read are read in now.
+        """
+        if self._columns is not None:
+            self.columnarUnpack()
+        if not self._complete:
+            self.sqliteReadAll()
+        return self._library
+
+    @library.setter
+    def library(self, value):
+        self._columns   = None
+        self._complete  = True
+        self._synced    = False
+        self._untouched = False
+        self._library   = value
+
+    def _bucket(self, key, create=False):
+        """  Returns the bucket at key, or None.  If create then an empty bucket is added if needed.
+             For a SQLite database, the bucket is read from the database by key - the rest of the library is not read.
+        """
+        if self._columns is not None:
+            self.columnarUnpack()
+
+        bucket = self._library.get(key)
+        if bucket is None and not self._complete and key not in self._absent and key not in self._dirty:
+            bucket = self.sqliteRead(key)
+
+        if bucket is None and create:
+            bucket = self._library[key] = Bucket()
+            self._untouched = False
+        return bucket
+
     def set_DBpath(self, value):
         self.filename = pathlib.Path(value)
 
@@ -73,38 +306,130 @@ class Library():
     def hasKey(self, key):
         """  Returns true if the key exist in the library.
         """
-        return key in self.library
+        return self._bucket(key) is not None
+
+    def hasSong(self, key, songFile):
+        """  Returns true if the song is already in the library at key.
+        """
+        bucket = self._bucket(key)
+        return bucket is not None and songFile in bucket
 
-    def addItem(self, key, item1, item2):
-        """  Adds to the library at point key, added is a list of items.
+    def addItem(self, key, item1, item2, artist=None, title=None, fingerprint=None, signature=None):
+        """  Adds to the bucket at point key, the other songs at key are kept.
              item1 is song path.
              item2 is song duration.
+             artist and title are the tags of the song, has read by scanTags - used to check Soundex false positives.
+             fingerprint is the fingerprint of the song, only made for songs without useful tags.
+             signature is the stat signature of the song when scanned, used by check to find songs that have since changed.
+        """
+        tags = None if artist is None and title is None else (artist or "", title or "")
+        self._bucket(key, create=True).add(item1, item2, tags, fingerprint, signature)
+        self._dirty.add(key)
+
+    def keys(self):
+        """  Returns the set of keys in the library.
+             For a SQLite database only the keys are read, the songs are still read when first needed.
+        """
+        if self._complete:
+            return set(self.library)
+
+        keys = {key for key, in self._db.execute("SELECT DISTINCT key FROM songs")}
+        keys.difference_update(self._dirty)                 #  Changed since loaded, the library holds the latest.
+        keys.update(self._library)
+        return keys
+
+    def getFingerprints(self):
+        """  A generator that yields (key, songFile, songDuration, fingerprint) for every song with a fingerprint.
+        """
+        for key, bucket in self.library.items():
+            for path, duration, _, fingerprint, _ in bucket.entries():
+                if fingerprint is not None:
+                    yield key, path, duration, fingerprint
+
+    def getTags(self, key, songFile):
+        """  Returns (artist, title) of the song at key, or None if the song was added without them.
         """
-        self.library[key] = [item1, item2]
+        bucket = self._bucket(key)
+        return bucket.tagsOf(songFile) if bucket is not None else None
+
+    def getSignature(self, key, songFile):
+        """  Returns (size, mtime) of the song at key when scanned, or None if the song was added without it.
+        """
+        bucket = self._bucket(key)
+        return bucket.signatureOf(songFile) if bucket is not None else None
+
+    def songKeys(self, directory=None):
+        """  Returns a dictionary of {songFile: key} for every song in the library.
+             If directory is given, only the songs below directory.
+        """
+        if directory is None:
+            return {path: key for key, bucket in self.library.items() for path in bucket.paths}
+
+        directory = os.fspath(directory)
+        prefix    = os.path.join(directory, "")
+        return {path: key for key, bucket in self.library.items() for path in bucket.paths
+                if path.startswith(prefix) or path == directory}
 
     def getItem(self, key):
-        """  Returns items at position key from the library.
+        """  Returns items [song path, song duration] of the first song at position key from the library.
+        """
+        bucket = self._bucket(key)
+        if bucket is not None:
+            return bucket.paths[0], bucket.durations[0]
+        else:
+            raise myExceptions.LibraryError
+
+    def getItems(self, key):
+        """  Returns a list of items [song path, song duration] of all the songs at position key from the library.
         """
-        if self.hasKey(key):
-            return self.library[key][0:2]
+        bucket = self._bucket(key)
+        if bucket is not None:
+            return list(bucket)
         else:
             raise myExceptions.LibraryError
 
-    def delItem(self, key):
+    def findMatches(self, key, duration, difference, exclude=None):
+        """  Returns a list of (song path, song duration) for the songs at key within +/- difference of duration.
+             The song exclude [if given] is left out, a song is not a duplicate of itself.
+        """
+        bucket = self._bucket(key)
+        return bucket.matches(duration, difference, exclude) if bucket is not None else []
+
+    def delItem(self, key, songFile=None):
         """  Deletes item at position key from the library.
+             If songFile is given only that song is deleted, the key goes when its last song does.
         """
-        try:
-            del self.library[key]
-        except (KeyError):
-            raise myExceptions.LibraryError from None
+        bucket = self._bucket(key)
+        if bucket is None or (songFile is not None and not bucket.remove(songFile)):
+            raise myExceptions.LibraryError
+        if songFile is None or not len(bucket):
+            del self._library[key]
+        self._dirty.add(key)
+
+    def moveItem(self, key, songFile, newFile):
+        """  Changes the path of a song at key, i.e. the song has been renamed or moved.
+             The duration, tags, fingerprint and signature of the song are kept.
+        """
+        bucket = self._bucket(key)
+        if bucket is None or not bucket.rename(songFile, newFile):
+            raise myExceptions.LibraryError
+        self._dirty.add(key)
 
     @property
     def noOfItems(self):
-        """  Return the number of entries in the library
+        """  Return the number of entries [songs] in the library
         """
-        if not self.library:
+        if self._untouched:
+            header = self.readHeader()                  #  Not loaded, the header holds the number of songs.
+            if header:
+                return header["count"]
             self.load()
-        return len(self.library)
+        if self._columns is not None:                   #  No need to unpack, the number of songs is in the header.
+            return self.COLUMNAR_HEADER.unpack_from(self._columns)[4]
+        if not self._complete and not self._dirty:      #  No need to read, the header holds the number of songs.
+            header = self.sqliteHeader()
+            return header["count"] if header else self._db.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+        return sum(len(bucket) for bucket in self.library.values())
 
     def DBOverWrite(self, mode):
         """  If set to True the old database file, if exists, will be overwritten.
@@ -117,6 +442,10 @@ class Library():
         """
         if self.format == "pickle":
             self.pickleSave()
+        elif self.format == "columnar":
+            self.columnarSave()
+        elif self.format == "sqlite":
+            self.sqliteSave()
         else:
             self.jsonSave()
 
@@ -126,6 +455,10 @@ class Library():
         try:
             if self.format == "pickle":
                 self.pickleLoad()
+            elif self.format == "columnar":
+                self.columnarLoad()
+            elif self.format == "sqlite":
+                self.sqliteLoad()
             else:
                 self.jsonLoad()
         except FileNotFoundError:
@@ -134,16 +467,27 @@ class Library():
     def clear(self):
         """  Clears the library.
         """
-        self.library.clear()
+        self.library = {}
+        self._dirty.clear()
+        self._absent.clear()
 
-    def check(self, mode, logger=None):
+    def check(self, mode, logger=None, threads=None, rescan=None):
         """  Runs a database data integrity check.
+             The songs are grouped by directory, each directory is listed once [in a pool of threads] to find the missing songs.
+             A song whose stat signature has changed since it was scanned [re-tagged, re-encoded or replaced] is changed.
+
+             mode = "test"    -- report the missing and changed songs.
+             mode = "delete"  -- delete the missing songs from the library, report the changed songs.
+             mode = "refresh" -- re-read the tags of just the changed songs using rescan, report the missing songs.
 
              If a logger is passed in, then use it - else ignore.
         """
         self.timer.Start()        #  Start timer.
         missing   = 0
         removed   = 0
+        changed   = 0
+        refreshed = 0
+        unsigned  = 0             #  Songs added by an older version, without a stat signature.
 
         if logger:
             logger.info("-" * 100)
@@ -160,31 +504,107 @@ class Library():
         no_songs = self.noOfItems
         self.displayMessage(f"Song Library has {no_songs} songs", logger)
 
-        for song in self.library.copy():  # iterate over a copy, gets around the error dictionary changed size during iteration
-            path, duration = self.getItem(song)
-            if not os.path.isfile(path):
-                if mode == "delete":
-                    self.delItem(song)
-                    print(f"Deleting {path}")
-                    removed += 1
-                else:
-                    missing += 1
-                    print(f"Song does not exist {path}")
+        directories = {}                #  The (key, song, signature) of each song, by directory.
+        for key, bucket in self.library.items():
+            for path, signature in zip(bucket.paths, bucket.signatures, strict=True):
+                directories.setdefault(os.path.dirname(path), []).append((key, path, signature))
+                unsigned += signature is None
+
+        with ThreadPoolExecutor(max_workers=threads or self.CHECK_THREADS) as executor:
+            results = list(executor.map(self._checkDirectory, directories.items()))
+
+        #  The library is not changed until every directory has been listed.
+        for key, path in (song for lost, _ in results for song in lost):
+            if mode == "delete":
+                self.delItem(key, path)
+                print(f"Deleting {path}")
+                removed += 1
+            else:
+                missing += 1
+                print(f"Song does not exist {path}")
+
+        for key, path, signature in (song for _, stale in results for song in stale):
+            if mode == "refresh" and rescan:
+                try:
+                    newKey, duration, artist, title = rescan(path)
+                except Exception as e:
+                    self.displayMessage(f"Can't read tags of {path} :: {e}", logger)
+                    continue
+                self.delItem(key, path)
+                self.addItem(newKey, path, duration, artist, title, None, signature)
+                print(f"Refreshing {path}")
+                refreshed += 1
+            else:
+                changed += 1
+                print(f"Song has changed {path}")
 
         timeStop = self.timer.Stop      #  Stop timer.
 
-        if removed:
+        if removed or refreshed:
             self.displayMessage(f"Saving {self.filename}", logger)
             self.save()
-            self.displayMessage(f"Completed  :: {timeStop} and removed {removed} entries from database.", logger)
+            if removed:
+                self.displayMessage(f"Completed  :: {timeStop} and removed {removed} entries from database.", logger)
+            else:
+                self.displayMessage(f"Completed  :: {timeStop} and refreshed {refreshed} songs that have changed.", logger)
             no_songs = self.noOfItems
             self.displayMessage(f"Song Library has now {no_songs} songs", logger)
         else:
-            if missing:
-                self.displayMessage(f"Completed  :: {timeStop} and found {missing} missing songs.", logger)
+            if missing or changed:
+                self.displayMessage(f"Completed  :: {timeStop} and found {missing} missing songs and {changed} changed songs.", logger)
             else:
                 self.displayMessage(f"Completed  :: {timeStop} and database looks good.", logger)
 
+        if unsigned:
+            self.displayMessage(f"{unsigned} songs were added by an older version, they can't be checked for changes until rescanned.", logger)
+
+    @classmethod
+    def _checkDirectory(cls, directory):
+        """  Returns the missing songs [(key, song)] and changed songs [(key, song, new signature)] of a directory.
+             directory is (path, [(key, song, signature), ...]), the directory is listed once.
+             If the directory can't be listed, each song is looked for on its own.
+        """
+        path, songs = directory
+        try:
+            with os.scandir(path or ".") as entries:
+                found = {os.path.normcase(entry.name): entry for entry in entries if entry.is_file()}
+        except (FileNotFoundError, NotADirectoryError):
+            return [(key, song) for key, song, _ in songs], []
+        except OSError:
+            found = None
+
+        missing = []
+        stale   = []
+        for key, song, signature in songs:
+            try:
+                if found is None:
+                    now = cls.signature(os.stat(song))
+                elif os.path.normcase(os.path.basename(song)) in found:
+                    now = cls.signature(found[os.path.normcase(os.path.basename(song))].stat())
+                else:
+                    raise FileNotFoundError(song)
+            except OSError:
+                missing.append((key, song))
+                continue
+            if signature is not None and now != signature:
+                stale.append((key, song, now))
+        return missing, stale
+
+    @staticmethod
+    def signature(stat):
+        """  Returns the stat signature of a song, (size, mtime) - mtime in nanoseconds.
+        """
+        return stat.st_size, stat.st_mtime_ns
+
+    @classmethod
+    def fileSignature(cls, songFile):
+        """  Returns the stat signature of a song file, or None if it can't be stat'ed.
+        """
+        try:
+            return cls.signature(os.stat(songFile))
+        except OSError:
+            return None
+
     # -------------
     def displayMessage(self, message, logger=None):
         """   Display the message to screen and pass to logger if required.
@@ -194,13 +614,61 @@ class Library():
         if logger:
             logger.info(message)
 
+    # ------------- conversion to and from the saved format. ------------------
+    def toSaved(self):
+        """  Returns the library has a plain dictionary of lists, {key: [[song path, song duration, artist, title], ...]}.
+             Songs added without their tags are saved has [song path, song duration].
+             A song with a fingerprint has it added in hex, [song path, song duration, artist, title, fingerprint].
+             A song with a stat signature has it added last, [song path, song duration, artist, title, fingerprint, size, mtime].
+             Anything not known is saved has None.
+        """
+        return {key: [self._savedSong(*song) for song in bucket.entries()] for key, bucket in self.library.items()}
+
+    @staticmethod
+    def _savedSong(path, duration, tags, fingerprint, signature):
+        """  Returns a song has saved, see toSaved.
+        """
+        if signature is not None:
+            return [path, duration, *(tags or (None, None)), fingerprint.hex() if fingerprint else None, *signature]
+        if fingerprint is not None:
+            return [path, duration, *(tags or (None, None)), fingerprint.hex()]
+        return [path, duration, *tags] if tags else [path, duration]
+
+    def fromSaved(self, saved):
+        """  Builds the library from a plain dictionary of lists.
+             Also reads the old format, where each key held a single [song path, song duration].
+        """
+        self.library = {}
+        for key, songs in saved.items():
+            if songs and isinstance(songs[0], str):
+                songs = [songs]
+            self.library[key] = Bucket.fromSongs(self._fromSavedSong(*song) for song in songs)
+
+    @staticmethod
+    def _fromSavedSong(path, duration, *extra):
+        """  Returns a song has saved [see toSaved] has (path, duration, tags, fingerprint, signature).
+        """
+        tags        = tuple(extra[:2]) if extra and extra[0] is not None else None
+        fingerprint = bytes.fromhex(extra[2]) if len(extra) > 2 and extra[2] is not None else None
+        signature   = tuple(extra[3:5]) if len(extra) > 3 else None
+        return path, duration, tags, fingerprint, signature
+
     # ------------- pickle load and save. ------------------
+    #   The header is pickled first, then the library - so the header can be read on its own.
+    #   Older files without a header hold just the library.
+    #
     def pickleLoad(self):
         """  Load the song library in pickle format.
         """
         try:
             with open(self.filename, "rb") as pickle_file:
-                self.library = pickle.load(pickle_file)
+                saved = pickle.load(pickle_file)
+                if isinstance(saved, dict) and self.HEADER_KEY in saved:
+                    header = saved[self.HEADER_KEY]
+                    body   = pickle_file.read()
+                    self._checkHash(header, body)
+                    saved = pickle.loads(body)
+                self.fromSaved(saved)
         except FileNotFoundError:
             print(f"ERROR :: Cannot find library file. {self.filename}.  Will use an empty library")
             self.library = {}
@@ -208,30 +676,561 @@ class Library():
     def pickleSave(self):
         """  Save the song library in pickle format.
         """
-        if not self.__overWrite:
-            if self.filename.exists():
-                now = datetime.datetime.now()
-                self.filename.rename(str(self.filename) + "." + now.strftime("%Y%m%d%H%M%S"))
+        saved = self.toSaved()
+        body  = pickle.dumps(saved, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._backup()
         with open(self.filename, "wb") as pickle_file:
-            pickle.dump(self.library, pickle_file)
+            pickle.dump({self.HEADER_KEY: self._makeHeader(saved, body)}, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle_file.write(body)
+
+    def pickleHeader(self):
+        """  Returns the header of a pickle file, only the header is read.
+             The header key is near the start of the file, if it is not there this is an older file without a header
+             - None is returned without unpickling the library.
+        """
+        with open(self.filename, "rb") as pickle_file:
+            if self.HEADER_KEY.encode("utf-8") not in pickle_file.read(self.PICKLE_PEEK):
+                return None
+            pickle_file.seek(0)
+            saved = pickle.load(pickle_file)
+        return saved.get(self.HEADER_KEY) if isinstance(saved, dict) else None
 
     # ------------- json load and save. ------------------
+    #   The file is {"header": {...},\n"library": {...}\n} with the header on the first line.
+    #   Older files without a header hold just the library.
+    #
     def jsonLoad(self):
         """  Load the song library in json format.
         """
         try:
-            with open(self.filename, "r") as json_file:
-                self.library = json.load(json_file)
+            with open(self.filename, "r", encoding="utf-8") as json_file:
+                text = json_file.read()
         except FileNotFoundError:
             print(f"ERROR :: Cannot find library file. {self.filename}.  Will use an empty library")
             self.library = {}
+            return
+
+        saved = json.loads(text)
+        if self.HEADER_KEY in saved:
+            start = text.index("\n") + len('"library": ') + 1
+            self._checkHash(saved[self.HEADER_KEY], text[start:-3].encode("utf-8"))
+            saved = saved["library"]
+        self.fromSaved(saved)
 
     def jsonSave(self):
         """  Save the song library in json format.
         """
+        saved = self.toSaved()
+        body  = json.dumps(saved, indent=4)
+
+        self._backup()
+        with open(self.filename, "w", encoding="utf-8") as json_file:
+            json_file.write(f'{{"{self.HEADER_KEY}": {json.dumps(self._makeHeader(saved, body.encode("utf-8")))},\n')
+            json_file.write('"library": ' + body + "\n}\n")
+
+    def jsonHeader(self):
+        """  Returns the header of a json file, only the first line is read.
+        """
+        with open(self.filename, "r", encoding="utf-8") as json_file:
+            line = json_file.readline().rstrip()
+        if not line.startswith(f'{{"{self.HEADER_KEY}": '):
+            return None
+        return json.loads(line.rstrip(",") + "}")[self.HEADER_KEY]
+
+    # ------------- columnar load and save. ------------------
+    #
+    #   A header [magic, version, number of keys, directories, songs and content hash], followed by thirteen columns -
+    #     keys        - the keys, utf-8 run together [a tag could hold a null].
+    #     keyLengths  - the length of each key in characters [unsigned ints].
+    #     directories - the song directories, each held once, utf-8 separated by nulls.
+    #     names       - the song file names, utf-8 separated by nulls.
+    #     counts      - the number of songs at each key [unsigned ints], songs are stored grouped by key.
+    #     dirIndex    - the directory of each song [unsigned ints].
+    #     durations   - the duration of each song [doubles], in order within each key.
+    #     tags        - the artist and title of each song, utf-8 run together.
+    #     tagLengths  - the length of each artist and title in characters [ints], an artist of -1 if not known.
+    #     prints      - the fingerprint of each song, run together.
+    #     printLengths- the length of each fingerprint in bytes [unsigned ints], 0 if not fingerprinted.
+    #     sizes       - the size of each song when scanned [long longs], -1 if not known.
+    #     mtimes      - the modified time of each song when scanned, in nanoseconds [long longs].
+    #   Each column is preceded by its length in bytes.  Numbers are little endian.
+    #   Version 2, 3 and 4 files are still read, they have no tags [the first seven columns], no fingerprints [the first nine]
+    #   or no stat signatures [the first eleven].
+    #
+    def columnarLoad(self):
+        """  Load the song library in columnar format.
+             The file is read in one go, the library dictionary is only built when first needed.
+        """
+        try:
+            with open(self.filename, "rb") as columnar_file:
+                columns = columnar_file.read()
+        except FileNotFoundError:
+            print(f"ERROR :: Cannot find library file. {self.filename}.  Will use an empty library")
+            self.library = {}
+            return
+
+        magic, version, _, _, _, contentHash = self.COLUMNAR_HEADER.unpack_from(columns)
+        if magic != self.COLUMNAR_MAGIC or version not in (2, 3, 4, self.COLUMNAR_VERSION):
+            raise myExceptions.LibraryError(f"{self.filename} is not a columnar library file [version {self.COLUMNAR_VERSION}]")
+        self._checkHash({"hash": contentHash.hex()}, memoryview(columns)[self.COLUMNAR_HEADER.size:])
+
+        self._library   = {}
+        self._columns   = columns
+        self._untouched = False
+
+    def columnarUnpack(self):
+        """  Builds the library dictionary from the columnar file read by columnarLoad.
+        """
+        columns       = memoryview(self._columns)
+        self._columns = None
+
+        version = self.COLUMNAR_HEADER.unpack_from(columns)[1]
+        offset  = self.COLUMNAR_HEADER.size
+        blocks  = []
+        for _ in range({2: 7, 3: 9, 4: 11}.get(version, 13)):
+            (length,) = struct.unpack_from("<Q", columns, offset)
+            blocks.append(columns[offset + 8:offset + 8 + length])
+            offset += 8 + length
+
+        allKeys   = bytes(blocks[0]).decode("utf-8")
+        ends      = list(accumulate(self._unpackArray("I", blocks[1])))
+        keys      = [allKeys[start:end] for start, end in zip([0] + ends, ends, strict=False)]
+        dirs      = bytes(blocks[2]).decode("utf-8").split("\0")
+        names     = bytes(blocks[3]).decode("utf-8").split("\0")
+        counts    = self._unpackArray("I", blocks[4])
+        dirIndex  = self._unpackArray("I", blocks[5])
+        durations = self._unpackArray("d", blocks[6])
+        tags      = self._unpackTags(blocks[7], blocks[8]) if version != 2 else [None] * len(durations)
+        prints    = self._unpackPrints(blocks[9], blocks[10]) if version > 3 else [None] * len(durations)
+        if version > 4:
+            signatures = [None if size < 0 else (size, mtime)
+                          for size, mtime in zip(self._unpackArray("q", blocks[11]), self._unpackArray("q", blocks[12]), strict=True)]
+        else:
+            signatures = [None] * len(durations)
+
+        library = {}
+        start   = 0
+        for key, count in zip(keys, counts, strict=True):
+            end              = start + count
+            bucket            = library[key] = Bucket()
+            bucket.paths      = [dirs[d] + name for d, name in zip(dirIndex[start:end], names[start:end], strict=True)]
+            bucket.durations  = durations[start:end]
+            bucket.tags       = tags[start:end]
+            bucket.prints     = prints[start:end]
+            bucket.signatures = signatures[start:end]
+            bucket.known      = dict(zip(bucket.paths, bucket.durations, strict=True))
+            start             = end
+
+        self._library = library
+
+    def columnarSave(self):
+        """  Save the song library in columnar format.
+             Each song path is split into its directory and file name, each directory is only stored once.
+        """
+        keys      = []
+        dirs      = {}
+        names     = []
+        counts    = array("I")
+        dirIndex  = array("I")
+        durations = array("d")
+        tags      = []
+        lengths   = array("i")
+        prints    = []
+        printSize = array("I")
+        sizes     = array("q")
+        mtimes    = array("q")
+
+        for key, bucket in self.library.items():
+            keys.append(key)
+            counts.append(len(bucket))
+            durations.extend(bucket.durations)
+            for songTags in bucket.tags:
+                if songTags:
+                    tags.extend(songTags)
+                    lengths.extend(map(len, songTags))
+                else:
+                    lengths.extend((-1, 0))
+            for fingerprint in bucket.prints:
+                prints.append(fingerprint or b"")
+                printSize.append(len(fingerprint or b""))
+            for signature in bucket.signatures:
+                size, mtime = signature or (-1, 0)
+                sizes.append(size)
+                mtimes.append(mtime)
+            for path in bucket.paths:
+                name = os.path.basename(path)
+                dirIndex.append(dirs.setdefault(path[:len(path) - len(name)], len(dirs)))
+                names.append(name)
+
+        blocks = ["".join(keys).encode("utf-8"), self._packArray(array("I", map(len, keys))),
+                  "\0".join(dirs).encode("utf-8"), "\0".join(names).encode("utf-8"),
+                  self._packArray(counts), self._packArray(dirIndex), self._packArray(durations),
+                  "".join(tags).encode("utf-8"), self._packArray(lengths),
+                  b"".join(prints), self._packArray(printSize), self._packArray(sizes), self._packArray(mtimes)]
+
+        body = b"".join(struct.pack("<Q", len(block)) + block for block in blocks)
+
+        self._backup()
+        with open(self.filename, "wb") as columnar_file:
+            columnar_file.write(self.COLUMNAR_HEADER.pack(self.COLUMNAR_MAGIC, self.COLUMNAR_VERSION, len(keys), len(dirs), len(names),
+                                                          self._hash(body)))
+            columnar_file.write(body)
+
+    def columnarHeader(self):
+        """  Returns the header of a columnar file, only the header is read.
+        """
+        with open(self.filename, "rb") as columnar_file:
+            header = columnar_file.read(self.COLUMNAR_HEADER.size)
+        magic, version, _, _, count, contentHash = self.COLUMNAR_HEADER.unpack(header)
+        if magic != self.COLUMNAR_MAGIC:
+            return None
+        return {"version": version, "count": count, "hash": contentHash.hex()}
+
+    def _unpackTags(self, tagBlock, lengthBlock):
+        """  Returns a list of (artist, title) from the tags columns, None for a song without.
+        """
+        text    = bytes(tagBlock).decode("utf-8")
+        lengths = self._unpackArray("i", lengthBlock)
+        tags    = []
+        start   = 0
+        for artistLength, titleLength in zip(lengths[::2], lengths[1::2], strict=True):
+            if artistLength < 0:
+                tags.append(None)
+                continue
+            middle = start + artistLength
+            end    = middle + titleLength
+            tags.append((text[start:middle], text[middle:end]))
+            start  = end
+        return tags
+
+    def _unpackPrints(self, printBlock, lengthBlock):
+        """  Returns a list of fingerprints from the prints columns, None for a song without.
+        """
+        prints = []
+        start  = 0
+        for length in self._unpackArray("I", lengthBlock):
+            prints.append(bytes(printBlock[start:start + length]) if length else None)
+            start += length
+        return prints
+
+    @staticmethod
+    def _packArray(values):
+        """  Returns the bytes of an array, little endian.
+        """
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def _unpackArray(typecode, block):
+        """  Returns an array from little endian bytes.
+        """
+        values = array(typecode)
+        values.frombytes(block)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    # ------------- the header. ------------------
+    def readHeader(self):
+        """  Returns the header of the database file {version, count, hash, saved}, without loading the library.
+             Returns None if there is no database file, or it is an older one without a header.
+        """
+        try:
+            if self.format == "pickle":
+                return self.pickleHeader()
+            elif self.format == "columnar":
+                return self.columnarHeader()
+            elif self.format == "sqlite":
+                return self.sqliteHeader()
+            else:
+                return self.jsonHeader()
+        except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError, sqlite3.Error):
+            return None
+
+    def _makeHeader(self, saved, body):
+        """  Returns the header for a saved library.
+        """
+        return {"version": self.DB_VERSION,
+                "count"  : sum(len(songs) for songs in saved.values()),
+                "hash"   : self._hash(body).hex(),
+                "saved"  : datetime.datetime.now().isoformat(timespec="seconds")}
+
+    @staticmethod
+    def _hash(body):
+        """  Returns the content hash of the saved library.
+        """
+        return hashlib.blake2b(body, digest_size=16).digest()
+
+    def _checkHash(self, header, body):
+        """  Warns if the saved library does not match the hash in its header, the file has been damaged.
+        """
+        if header.get("hash") and header["hash"] != self._hash(body).hex():
+            print(f"WARNING :: library file {self.filename} does not match its header, it may be damaged.")
+
+    def _backup(self):
+        """  If not over writing, the old database file is renamed with a time stamp before the new one is written.
+        """
         if not self.__overWrite:
             if self.filename.exists():
                 now = datetime.datetime.now()
                 self.filename.rename(str(self.filename) + "." + now.strftime("%Y%m%d%H%M%S"))
-        with open(self.filename, "w") as json_file:
-            json.dump(self.library, json_file, indent=4)
+
+    # ------------- sqlite load and save. ------------------
+    def sqliteConnect(self):
+        """  Opens the SQLite database, creating the songs table if needed.
+             The primary key [key, path] also acts has the index used to look up songs by key.
+             A database from before the tags, fingerprints or stat signatures were held has the missing columns added.
+        """
+        if self._db is None:
+            self._db = sqlite3.connect(self.filename, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS songs (key TEXT NOT NULL, path TEXT NOT NULL, duration REAL NOT NULL,
+                                                                  artist TEXT, title TEXT, fingerprint BLOB, size INTEGER, mtime INTEGER,
+                                                                  PRIMARY KEY (key, path)) WITHOUT ROWID""")
+            self._db.execute("CREATE TABLE IF NOT EXISTS header (name TEXT PRIMARY KEY, value)")
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(songs)")}
+            for column, columnType in (("artist", "TEXT"), ("title", "TEXT"), ("fingerprint", "BLOB"), ("size", "INTEGER"), ("mtime", "INTEGER")):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE songs ADD COLUMN {column} {columnType}")
+        return self._db
+
+    def sqliteHeader(self):
+        """  Returns the header of a SQLite database, held in the header table.
+             There is no content hash, SQLite looks after its own integrity.
+        """
+        if not self.filename.exists():
+            return None
+        db     = self.sqliteConnect()
+        header = dict(db.execute("SELECT name, value FROM header"))
+        return header if "count" in header else None
+
+    def sqliteLoad(self):
+        """  Load the song library from a SQLite database.
+             Nothing is read here, the songs at a key are read when first asked for - so start up is instant.
+        """
+        self.clear()
+        if not self.filename.exists():
+            print(f"ERROR :: Cannot find library file. {self.filename}.  Will use an empty library")
+            return
+
+        self.sqliteConnect()
+        self._complete = False
+        self._synced   = True
+
+    def sqliteRead(self, key):
+        """  Reads the songs at key from the SQLite database into the library, returns the bucket or None.
+        """
+        rows = self._db.execute("SELECT path, duration, artist, title, fingerprint, size, mtime FROM songs WHERE key = ?", (key,)).fetchall()
+        if not rows:
+            self._absent.add(key)
+            return None
+
+        bucket = self._library[key] = Bucket.fromSongs(self._fromRow(*row) for row in rows)
+        return bucket
+
+    @staticmethod
+    def _fromRow(path, duration, artist, title, fingerprint, size, mtime):
+        """  Returns a song has read from the SQLite database has (path, duration, tags, fingerprint, signature).
+        """
+        return path, duration, None if artist is None else (artist, title), fingerprint, None if size is None else (size, mtime)
+
+    def sqliteReadAll(self):
+        """  Reads every song not yet read from the SQLite database into the library.
+             Keys changed since the database was loaded are left alone, the library holds the latest.
+        """
+        self._complete = True
+        skip           = self._dirty.union(self._library)      #  Already read, or changed.
+
+        songs = {}
+        for key, *row in self._db.execute("SELECT key, path, duration, artist, title, fingerprint, size, mtime FROM songs"):
+            if key not in skip:
+                songs.setdefault(key, []).append(self._fromRow(*row))
+
+        for key, rows in songs.items():
+            self._library[key] = Bucket.fromSongs(rows)
+        self._absent.clear()
+
+    def sqliteSave(self):
+        """  Save the song library to a SQLite database, in one transaction.
+             If the database was loaded, only the keys changed since are written.
+             Else [i.e. building the database] the whole library is written.
+
+             The database is changed in place, so over write = false does not keep a copy of it.
+        """
+        incremental = self._synced
+        db          = self.sqliteConnect()
+        keys        = list(self._dirty) if incremental else list(self.library)
+
+        with db:
+            if incremental:
+                db.executemany("DELETE FROM songs WHERE key = ?", ((key,) for key in keys))
+            else:
+                db.execute("DELETE FROM songs")
+            db.executemany("INSERT INTO songs (key, path, duration, artist, title, fingerprint, size, mtime) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                           ((key, path, duration, *(tags or (None, None)), fingerprint, *(signature or (None, None)))
+                            for key in keys if key in self._library
+                            for path, duration, tags, fingerprint, signature in self._library[key].entries()))
+            header = {"version": self.DB_VERSION,
+                      "count"  : db.execute("SELECT COUNT(*) FROM songs").fetchone()[0],
+                      "saved"  : datetime.datetime.now().isoformat(timespec="seconds")}
+            db.executemany("INSERT OR REPLACE INTO header (name, value) VALUES (?, ?)", header.items())
+
+        self._dirty.clear()
+        self._synced = True
+
+
+class ShardedLibrary(Library):
+    """  A song library that is saved has a shard for each source directory, i.e. one per disk.
+         Every shard is loaded into the one library, so the duplicates between source directories are still found.
+         Only the shards that were loaded, or whose source directory was scanned, are saved - so a single disk can be
+         rebuilt [-b] without touching the shards of the others.
+
+         The shards are listed in an index next to the database [i.e. dup.pickle.shards.json], {sourceDir: shard file}.
+         Each source directory is made absolute [and case normalised, on windows] first - so the same directory given
+         from somewhere else, or has a relative path, finds the same shard.
+         The shard files are named after the database, with a hash of the source directory - i.e. dup-1a2b3c4d5e6f.pickle.
+         A song that is not below any source directory is saved in the database file itself, has is an older database
+         without shards - it is then split into shards when next saved.
+
+         usage:
+         songLibrary = Library.ShardedLibrary()
+         songLibrary.addRoots(sourceDirs)            - the source directories of this run, their songs are saved to their shards.
+         songLibrary.readIndex()                     - {sourceDir: shard file} of the saved shards.
+         everything else has Library.
+    """
+
+    __slots__ = ["_roots", "_loaded", "_shardOverWrite"]
+
+    def __init__(self):
+        super().__init__()
+        self._roots          = []               #  Source directories scanned this run.
+        self._loaded         = []               #  Source directories whose shard has been loaded, "" for the database file.
+        self._shardOverWrite = True
+
+    @property
+    def indexName(self):
+        return self.filename.with_name(f"{self.filename.name}.shards.json")
+
+    def shardName(self, sourceDir):
+        """  Returns the path of the shard of sourceDir, "" is the database file itself.
+        """
+        if not sourceDir:
+            return self.filename
+        digest = hashlib.sha1(os.fsencode(self.normalRoot(sourceDir))).hexdigest()[:12]
+        return self.filename.with_name(f"{self.filename.stem}-{digest}{self.filename.suffix}")
+
+    @staticmethod
+    def normalRoot(sourceDir):
+        """  Returns sourceDir has held in the index, absolute and case normalised.
+        """
+        return os.path.normcase(os.path.abspath(os.fspath(sourceDir)))
+
+    def addRoots(self, sourceDirs):
+        for sourceDir in map(self.normalRoot, sourceDirs):
+            if sourceDir not in self._roots:
+                self._roots.append(sourceDir)
+
+    @classmethod
+    def rootOf(cls, songFile, sourceDirs):
+        """  Returns the source directory that holds songFile [the longest, if they are nested], or "" if none do.
+             sourceDirs are has held in the index, songFile is normalised to match.
+        """
+        songFile = cls.normalRoot(songFile)
+        found    = ""
+        for sourceDir in sourceDirs:
+            if songFile.startswith(os.path.join(sourceDir, "")) and len(sourceDir) > len(found):
+                found = sourceDir
+        return found
+
+    def readIndex(self):
+        """  Returns {sourceDir: shard file} of the saved shards, empty if none have been saved.
+        """
+        try:
+            with open(self.indexName, "r", encoding="utf-8") as indexFile:
+                return json.load(indexFile)
+        except (OSError, ValueError):
+            return {}
+
+    def _shard(self, sourceDir):
+        shard = Library()
+        shard.set_DBpath(self.shardName(sourceDir))
+        shard.set_DBformat(self.format)
+        shard.DBOverWrite(self._shardOverWrite)
+        return shard
+
+    def DBOverWrite(self, mode):
+        super().DBOverWrite(mode)
+        self._shardOverWrite = mode
+
+    def load(self):
+        """  Loads the database file and every shard in the index, into the one library.
+        """
+        library      = {}
+        self._loaded = []
+
+        for sourceDir in ["", *self.readIndex()]:
+            shard = self._shard(sourceDir)
+            if not shard.filename.exists():
+                continue
+            shard.load()
+            for key, bucket in shard.library.items():
+                if key in library:
+                    for entry in bucket.entries():
+                        library[key].add(*entry)
+                else:
+                    library[key] = bucket
+            self._loaded.append(sourceDir)
+
+        if not self._loaded:
+            print(f"ERROR :: Cannot find library file. {self.filename}.  Will use an empty library")
+
+        self.library = library
+        self._dirty.clear()
+
+    def save(self):
+        """  Splits the library by source directory and saves each shard that was loaded or scanned, then the index.
+             The songs not below any source directory are saved in the database file, if it was loaded or there are any.
+        """
+        index      = self.readIndex()
+        sourceDirs = [sourceDir for sourceDir in dict.fromkeys(self._loaded + self._roots) if sourceDir]
+        shards     = {sourceDir: {} for sourceDir in ["", *sourceDirs]}
+
+        for key, bucket in self.library.items():
+            for entry in bucket.entries():
+                shard = shards[self.rootOf(entry[0], sourceDirs)]
+                if key not in shard:
+                    shard[key] = Bucket()
+                shard[key].add(*entry)
+
+        for sourceDir, library in shards.items():
+            if sourceDir or library or "" in self._loaded:
+                shard = self._shard(sourceDir)
+                shard.library = library
+                shard.save()
+                if sourceDir:
+                    index[sourceDir] = shard.filename.name
+
+        with open(self.indexName, "w", encoding="utf-8") as indexFile:
+            json.dump(index, indexFile, indent=4)
+
+        self._dirty.clear()
+
+    def readHeader(self):
+        """  Returns a header for the database file and every shard together, without loading them.
+             Returns None if there are none, or any of them is an older one without a header.
+        """
+        headers = []
+        for sourceDir in ["", *self.readIndex()]:
+            shard = self._shard(sourceDir)
+            if shard.filename.exists():
+                headers.append(shard.readHeader())
+
+        if not headers or None in headers:
+            return None
+
+        return {"version": self.DB_VERSION,
+                "count"  : sum(header["count"] for header in headers),
+                "hash"   : None,
+                "saved"  : max(header.get("saved", "") for header in headers)}
@@ -0,0 +1,153 @@
+###############################################################################################################
+#    Report.py   Copyright (C) <2020-2025>  <Kevin Scott>                                                     #
+#    Writes the duplicate report, either to the duplicate file [-f or -fA] or to the screen.                  #
+#    The file is opened once for the run and written through a large buffer, the buffer is flushed            #
+#    every few seconds [so the report can be followed] and when the report is closed.                         #
+#                                                                                                             #
+#    The duplicates can also be written has records, one per duplicate pair, in jsonl or csv format -         #
+#    for other programs to read while the scan is still running.                                              #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import csv
+import sys
+import json
+import time
+import atexit
+
+
+class Report():
+    """  A simple class that writes the duplicate report.
+
+         usage:
+         report = Report.Report(textFile, format) - if textFile is None or False, the report is printed to the screen.
+                                                    format is text [the default], jsonl or csv.
+
+         report.writeLine(textLine, logger) - write a line of text, if a logger is passed in the line is also logged.
+         report.writeDuplicate(key, musicFile, musicDuration, songFile, songDuration, matchType, deleted)
+                                            - write a duplicate pair has a record, matchType is exact, soundex, fuzzy, fingerprint, identical or falsePositive.
+         report.recordsOnScreen             - True if the records are written to standard output.
+         report.flush()                     - write out the buffer, i.e. at the end of a section of the report.
+         report.close()                     - flush and close the file, also done on exit.
+
+         The file is opened in amend mode, if the file is to start afresh it has already been deleted [args.py].
+
+         In jsonl or csv format only the records are written to the file, the lines of text are printed to the screen.
+         If there is no file the records are written to standard output and the lines of text to standard error,
+         so standard output only holds records - main also sends everything else it prints to standard error.
+         In text format the records are ignored, the duplicates are already written has lines of text.
+    """
+
+    __slots__ = ["textFile", "format", "_file", "_csv", "_out", "_lastFlush"]
+
+    FORMATS = ("text", "jsonl", "csv")
+    FIELDS  = ("matchType", "key", "musicFile", "musicDuration", "songFile", "songDuration", "delta", "deleted")
+
+    BUFFER_SIZE = 1024 * 1024       #  Size of the write buffer.
+    FLUSH_AFTER = 2.0               #  Seconds between flushes of the buffer.
+
+    def __init__(self, textFile=None, format="text"):
+        self.textFile   = textFile
+        self.format     = format if format in self.FORMATS else "text"
+        self._file      = None
+        self._csv       = None
+        self._out       = sys.stdout            #  Held, has main may send sys.stdout elsewhere.
+        self._lastFlush = time.monotonic()
+
+        if textFile:
+            self._file = open(textFile, encoding="utf-8", mode="a", newline="" if self.format == "csv" else None, buffering=self.BUFFER_SIZE)
+            atexit.register(self.close)
+
+        if self.format == "csv":
+            self._csv = csv.writer(self._file or self._out)
+            if not self._file or self._file.tell() == 0:    #  A new file, start with the field names.
+                self._csv.writerow(self.FIELDS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def recordsOnScreen(self):
+        return self.format != "text" and not self.textFile
+
+    def writeLine(self, textLine, logger=None):
+        """  Write the line of text to the report.
+             textLine needs to be a string - NOT a path.
+        """
+        if self.recordsOnScreen:                    #  Standard output only holds records.
+            print(textLine, file=sys.stderr)
+        elif self.format != "text":                 #  The file only holds records.
+            print(textLine)
+        elif self._file:
+            self._file.write(textLine + "\n")
+            self._timedFlush()
+        elif self.textFile:                         #  Closed, fall back to opening the file for the line.
+            with open(self.textFile, encoding="utf-8", mode="a") as f:
+                f.write(textLine + "\n")
+        else:
+            print(textLine)
+
+        if logger:
+            logger.info(textLine)
+
+    def writeDuplicate(self, key, musicFile, musicDuration, songFile, songDuration, matchType, deleted=False):
+        """  Write a duplicate pair has one record, musicFile is the song found by the scan and songFile the one
+             already in the library.  delta is the difference in their durations.
+        """
+        if self.format == "text" or (self.textFile and not self._file):     #  Text only, or closed.
+            return
+
+        record = (matchType, key, musicFile, musicDuration, songFile, songDuration, round(abs(musicDuration - songDuration), 2), deleted)
+
+        if self._csv:
+            self._csv.writerow(record)
+        else:
+            line = json.dumps(dict(zip(self.FIELDS, record, strict=True)), ensure_ascii=False)
+            if self._file:
+                self._file.write(line + "\n")
+            else:
+                print(line, file=self._out)
+
+        if self._file:
+            self._timedFlush()
+
+    def _timedFlush(self):
+        """  Flush the buffer if it has not been flushed for a while, so the report can be followed.
+        """
+        now = time.monotonic()
+        if now - self._lastFlush > self.FLUSH_AFTER:
+            self._file.flush()
+            self._lastFlush = now
+
+    def flush(self):
+        """  Write out the buffer.
+        """
+        if self._file:
+            self._file.flush()
+            self._lastFlush = time.monotonic()
+
+    def close(self):
+        """  Flush and close the file, can be called more than once.
+        """
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._csv  = None
+            atexit.unregister(self.close)
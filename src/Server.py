@@ -0,0 +1,191 @@
+###############################################################################################################
+#    Server.py   Copyright (C) <2025>  <Kevin Scott>                                                          #
+#                                                                                                             #
+#    A small local server that answers "is this song a duplicate?", for other programs on the same machine.   #
+#    The song library is loaded once and held in memory, the answers are json over http on localhost.         #
+#    The same tags and duration difference are used has a scan, but the library is never changed.             #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import json
+
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+import src.utils.tagUtils as tagUtils
+import src.utils.keyUtils as keyUtils
+
+
+class Server():
+    """  A simple class that answers duplicate look ups against the song library, each request in its own thread.
+
+         usage:
+         server = Server.Server(songLibrary, tagType, soundex, difference, logger, host, port, threads)
+            tagType    = the module used to read the song tags, has scanMusic.
+            difference = the time difference between songs, has scanMusic.
+            threads    = number of threads used to read the songs of a batch look up.
+
+         server.address                              - (host, port) being served, port 0 picks a free port.
+         server.check(musicFile)                     - the answer for one song, read from disc.
+         server.checkAll(musicFiles)                 - the answers for a list of songs, read by a pool of threads.
+         server.match(artist, title, duration)       - the answer for a song from its tags, nothing is read.
+         server.serve()                              - answer requests until interrupted [Ctrl-C], then close.
+         server.stop()                               - stop serve, from another thread.
+
+         Requests, the answers are json:
+            GET  /status                             - {"songs", "difference", "soundex"}.
+            GET  /check?path=musicFile               - the answer for one song.
+            POST /check  ["musicFile", ...]          - {"results": [answer, ...]}, in the same order.
+            GET  /match?artist=a&title=t&duration=s  - the answer from the tags.
+
+         An answer is {"musicFile", "key", "musicDuration", "artist", "title", "duplicate", "inLibrary", "matches",
+         "falsePositives"}, each match is {"songFile", "songDuration", "delta"}.
+         If the tags of the song can't be read, the answer is {"musicFile", "error"}.
+    """
+
+    __slots__ = ["songLibrary", "tagType", "soundex", "difference", "logger", "_executor", "_httpd"]
+
+    def __init__(self, songLibrary, tagType, soundex, difference, logger, host="127.0.0.1", port=8484, threads=8):
+        self.songLibrary = songLibrary
+        self.tagType     = tagType
+        self.soundex     = soundex
+        self.difference  = difference
+        self.logger      = logger
+
+        len(songLibrary.library)            #  Every song is read in now, so the look ups only ever read the dictionary.
+
+        self._executor    = ThreadPoolExecutor(max_workers=max(threads, 1))
+        self._httpd       = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.owner = self
+
+    @property
+    def address(self):
+        return self._httpd.server_address[:2]
+
+    def serve(self):
+        """  Answer requests until interrupted [Ctrl-C] or stopped, then close.
+        """
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+            self._executor.shutdown()
+
+    def stop(self):
+        """  Stops serve, must be called from another thread.
+        """
+        self._httpd.shutdown()
+
+    def status(self):
+        return {"songs": self.songLibrary.noOfItems, "difference": self.difference, "soundex": self.soundex}
+
+    def check(self, musicFile):
+        """  Returns the answer for one song, its tags are read from disc has scanTags.
+        """
+        try:
+            tags = tagUtils.scanTags(self.tagType, musicFile, self.soundex, self.logger)
+        except Exception as error:                      #  Can"t read tags - has readTags.
+            self.logger.error(f"Raised exception at calling scanTags :: {error} ")
+            return {"musicFile": musicFile, "error": str(error) or type(error).__name__}
+        return self._answer(musicFile, tags)
+
+    def checkAll(self, musicFiles):
+        """  Returns the answers for a list of songs, in the same order.
+        """
+        return list(self._executor.map(self.check, musicFiles))
+
+    def match(self, artist, title, duration):
+        """  Returns the answer for a song from its tags [has held in the song], no song is read.
+        """
+        artist = keyUtils.normaliseArtist(artist)
+        title  = keyUtils.normaliseTitle(title)
+        return self._answer(None, (tagUtils.makeKey(artist, title, self.soundex), duration, artist, title))
+
+    def _answer(self, musicFile, tags):
+        key, musicDuration, artist, title = tags
+        matches, falseMatches = tagUtils.findDuplicates(self.songLibrary, musicFile, tags, self.difference, self.soundex, self.logger)
+
+        return {"musicFile"     : musicFile,
+                "key"           : key,
+                "musicDuration" : musicDuration,
+                "artist"        : artist,
+                "title"         : title,
+                "duplicate"     : bool(matches),
+                "inLibrary"     : musicFile is not None and self.songLibrary.hasSong(key, musicFile),
+                "matches"       : [self._match(musicDuration, match) for match in matches],
+                "falsePositives": [self._match(musicDuration, match) for match in falseMatches]}
+
+    @staticmethod
+    def _match(musicDuration, match):
+        songFile, songDuration = match
+        return {"songFile": songFile, "songDuration": songDuration, "delta": round(abs(musicDuration - songDuration), 2)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """  Turns each http request into a call on the Server, self.server.owner.
+    """
+
+    def do_GET(self):
+        url    = urlsplit(self.path)
+        query  = parse_qs(url.query)
+        server = self.server.owner
+
+        match url.path:
+            case "/status":
+                self._reply(200, server.status())
+            case "/check" if "path" in query:
+                self._reply(200, server.check(query["path"][0]))
+            case "/match" if "artist" in query and "title" in query and "duration" in query:
+                try:
+                    duration = float(query["duration"][0])
+                except ValueError:
+                    self._reply(400, {"error": "duration is not a number"})
+                    return
+                self._reply(200, server.match(query["artist"][0], query["title"][0], duration))
+            case "/check" | "/match":
+                self._reply(400, {"error": f"missing arguments for {url.path}"})
+            case _:
+                self._reply(404, {"error": f"unknown request {url.path}"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/check":
+            self._reply(404, {"error": f"unknown request {self.path}"})
+            return
+
+        try:
+            musicFiles = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            musicFiles = None
+        if not isinstance(musicFiles, list) or not all(isinstance(musicFile, str) for musicFile in musicFiles):
+            self._reply(400, {"error": "expected a json list of song paths"})
+            return
+
+        self._reply(200, {"results": self.server.owner.checkAll(musicFiles)})
+
+    def _reply(self, status, answer):
+        body = json.dumps(answer, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.server.owner.logger.debug(f"Server :: {self.address_string()} {format % args}")
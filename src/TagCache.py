@@ -0,0 +1,200 @@
+###############################################################################################################
+#    TagCache.py   Copyright (C) <2025>  <Kevin Scott>                                                        #
+#                                                                                                             #
+#    A persistent cache of the tags read from each song file.                                                 #
+#    The cache is keyed on the song path, each entry carries the stat signature                               #
+#    [size, mtime, inode] of the file when the tags were read.                                                #
+#    If the signature still matches, the tags are returned without opening the file.                          #
+#                                                                                                             #
+#    Uses pickle to load and save the cache.                                                                  #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import pickle
+import pathlib
+import threading
+
+import src.Library as Library
+
+
+class TagCache():
+    """  A simple class that wraps the tag cache dictionary.
+
+         usage:
+         tagCache = TagCache.TagCache(filename, module)
+            filename = name of the cache file.
+            module   = the module used to read the tags, the cache is discarded if this changes.
+
+         to look up a song          - duration, artist, title = tagCache.getItem(musicFile, stat) - None if stale.
+         to add a song              - tagCache.addItem(musicFile, stat, duration, artist, title)
+         to drop unseen songs       - tagCache.prune(sourceDir)
+         song count of last run     - tagCache.getCount(sourceDir) / tagCache.setCount(sourceDir, count)
+         to load the cache          - tagCache.load()
+         to save the cache          - tagCache.save()
+
+         stat is the result of os.stat [or DirEntry.stat] on the song file.
+         Songs can be looked up and added from several threads at once [tagUtils.readRoots].
+    """
+
+    __slots__ = ["cache", "counts", "filename", "module", "seen", "hits", "misses", "changed", "lock"]
+
+    VERSION = 1
+
+    def __init__(self, filename, module):
+        self.cache    = {}
+        self.counts   = {}                      #  Number of songs found in each source directory, last run.
+        self.filename = pathlib.Path(filename)
+        self.module   = module
+        self.seen     = set()                   #  Songs looked up on this run.
+        self.hits     = 0
+        self.misses   = 0
+        self.changed  = False
+        self.lock     = threading.Lock()
+
+    @staticmethod
+    def signature(stat):
+        """  Returns the stat signature of a song file, [size, mtime, inode] - has Library.signature, with the inode.
+        """
+        return (*Library.Library.signature(stat), stat.st_ino)
+
+    def getItem(self, musicFile, stat):
+        """  Returns [duration, artist, title] for the song, if the cached entry is still valid.
+             Returns None if the song is not in the cache, or has changed since it was cached.
+
+             An inode of 0 means unknown [DirEntry.stat on windows], so is not compared.
+        """
+        path = os.fspath(musicFile)
+        with self.lock:
+            self.seen.add(path)
+
+            entry = self.cache.get(path)
+            if entry:
+                size, mtime, inode = self.signature(stat)
+                if entry[0] == size and entry[1] == mtime and (entry[2] == inode or not (entry[2] and inode)):
+                    self.hits += 1
+                    return entry[3:]
+
+            self.misses += 1
+            return None
+
+    def addItem(self, musicFile, stat, duration, artist, title):
+        """  Adds the tags of a song to the cache, with the songs current stat signature.
+        """
+        path = os.fspath(musicFile)
+        with self.lock:
+            self.seen.add(path)
+            self.cache[path] = (*self.signature(stat), duration, artist, title)
+            self.changed     = True
+
+    def prune(self, sourceDir):
+        """  Removes any cached songs under sourceDir that were not seen on this run, they have been deleted or moved.
+             Songs outside of sourceDir are left alone, they may belong to a different scan.
+        """
+        root = os.path.join(os.fspath(sourceDir), "")
+
+        for path in [path for path in self.cache if path.startswith(root) and path not in self.seen]:
+            del self.cache[path]
+            self.changed = True
+
+    def getCount(self, sourceDir):
+        """  Returns the number of songs found in sourceDir on the last run, or None if not known.
+        """
+        return self.counts.get(os.fspath(sourceDir))
+
+    def setCount(self, sourceDir, count):
+        """  Records the number of songs found in sourceDir on this run.
+        """
+        if self.counts.get(os.fspath(sourceDir)) != count:
+            self.counts[os.fspath(sourceDir)] = count
+            self.changed = True
+
+    @property
+    def noOfItems(self):
+        """  Return the number of entries in the cache
+        """
+        return len(self.cache)
+
+    # ------------- pickle load and save. ------------------
+    def load(self):
+        """  Load the tag cache in pickle format.
+             A missing, damaged or out of date cache is not an error - just start with an empty one.
+        """
+        try:
+            with open(self.filename, "rb") as pickle_file:
+                data = pickle.load(pickle_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.cache = {}
+            return
+
+        self.counts = data.get("counts", {})
+
+        if data.get("version") == self.VERSION and data.get("module") == self.module:
+            self.cache = data["cache"]
+        else:
+            self.cache   = {}
+            self.changed = True
+
+    def save(self):
+        """  Save the tag cache in pickle format, only if it has changed.
+             Written to a temporary file first, so a crash cannot leave a half written cache.
+        """
+        if not self.changed:
+            return
+
+        data    = {"version": self.VERSION, "module": self.module, "cache": self.cache, "counts": self.counts}
+        tmpFile = self.filename.with_name(self.filename.name + ".tmp")
+
+        with open(tmpFile, "wb") as pickle_file:
+            pickle.dump(data, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpFile, self.filename)
+
+        self.changed = False
+
+
+class FingerprintCache(TagCache):
+    """  A tag cache that holds the fingerprint of each song instead of its tags, keyed on the song path and stat signature.
+         Decoding a song is far slower than reading its tags, so a song is only fingerprinted again if it changes.
+
+         usage:
+         fingerprintCache = TagCache.FingerprintCache(filename, seconds)
+            seconds = the seconds of each song fingerprinted, the cache is discarded if this changes.
+
+         to look up a song          - fingerprint = fingerprintCache.getItem(musicFile, stat) - None if stale.
+         to add a song              - fingerprintCache.addItem(musicFile, stat, fingerprint)
+         the rest has TagCache.
+    """
+
+    __slots__ = []
+
+    def __init__(self, filename, seconds):
+        super().__init__(filename, f"fingerprint {seconds}s")
+
+    def getItem(self, musicFile, stat):
+        """  Returns the fingerprint of the song, if the cached entry is still valid - else None.
+        """
+        entry = super().getItem(musicFile, stat)
+        return entry[0] if entry else None
+
+    def addItem(self, musicFile, stat, fingerprint):
+        """  Adds the fingerprint of a song to the cache, with the songs current stat signature.
+        """
+        path = os.fspath(musicFile)
+        with self.lock:
+            self.seen.add(path)
+            self.cache[path] = (*self.signature(stat), fingerprint)
+            self.changed     = True
@@ -0,0 +1,171 @@
+###############################################################################################################
+#    Walker.py   Copyright (C) <2025>  <Kevin Scott>                                                          #
+#                                                                                                             #
+#    A class that walks a directory tree, yielding the songs [.mp3 files] as they are found.                  #
+#    Uses os.scandir, so the songs can be scanned while the walk is still going,                              #
+#    and the stat results of the directory entries can be reused.                                             #
+#    Walkers walks several directory trees, one Walker each.                                                  #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+
+
+class Walker():
+    """  A simple class that walks the source directory, in one pass it sorts every entry into
+         songs [.mp3 files], non music files and directories.
+
+         usage:
+         walker = Walker.Walker(sourceDir)
+
+         for entry in walker.songs():    - entry is an os.DirEntry, entry.path is the song path.
+         walker.count                    - number of songs found so far.
+         walker.errors                   - directories that could not be read.
+         walker.complete                 - True once the walk has finished.
+         walker.nonMusic                 - non music files found [database files are left out].
+         walker.emptyDirs()              - directories that are empty, has far has the walk knows.
+         walker.fileRemoved(path)        - tell the walker a song or non music file has since been deleted.
+
+         Symbolic links to directories are not followed, so the walk can't loop.
+         The directory entries are only looked at once, so nothing is stat'ed twice.
+    """
+
+    __slots__ = ["sourceDir", "count", "errors", "complete", "nonMusic", "_dirPaths", "_dirIndex", "_parents", "_kept"]
+
+    KEEP = (".pickle", ".json", ".columnar", ".sqlite")     #  Never zap, the database may be stored in the source directory.
+
+    def __init__(self, sourceDir):
+        self.sourceDir = sourceDir
+        self.count     = 0
+        self.errors    = []
+        self.complete  = False
+        self.nonMusic  = []
+        self._dirPaths = []             #  Each directory found, with the index of its parent.
+        self._dirIndex = {}
+        self._parents  = []
+        self._kept     = []             #  Number of entries in each directory, less those since removed.
+
+    @staticmethod
+    def isSong(name):
+        """  Returns True if the file name is a song [.mp3], case insensitive where the file system is.
+        """
+        return os.path.normcase(name).endswith(".mp3")
+
+    def songs(self):
+        """  A generator that yields an os.DirEntry for each song below sourceDir, as soon as it is found.
+             The non music files and directories are recorded on the way.
+        """
+        stack = [self._addDir(os.fspath(self.sourceDir), -1)]
+
+        while stack:
+            index     = stack.pop()
+            directory = self._dirPaths[index]
+            try:
+                with os.scandir(directory) as entries:
+                    subDirs = []
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subDirs.append(self._addDir(entry.path, index))
+                        elif self.isSong(entry.name) and entry.is_file():
+                            self.count += 1
+                            self._kept[index] += 1
+                            yield entry
+                        elif entry.is_file(follow_symlinks=False) and not os.path.normcase(entry.name).endswith(self.KEEP):
+                            self.nonMusic.append(entry.path)
+                            self._kept[index] += 1
+                        else:
+                            self._kept[index] += 1
+            except OSError as error:
+                self.errors.append(f"{directory} :: {error}")
+                self._kept[index] += 1                      #  Don't know what is in there, so don't remove it.
+                continue
+
+            stack.extend(reversed(subDirs))         #  Walk sub directories in the order found.
+
+        self.complete = True
+
+    def fileRemoved(self, path):
+        """  A song or non music file has been deleted since the walk found it, its directory may now become empty.
+             Only call once the file has really gone, i.e. zapUtils.zapFile returned True.
+        """
+        index = self._dirIndex.get(os.path.dirname(os.fspath(path)))
+        if index is not None and self._kept[index]:
+            self._kept[index] -= 1
+
+    def emptyDirs(self):
+        """  Returns the directories that are empty, has far has the walk knows - files may have landed since.
+             Only the top most of a tree of empty directories is returned, removing it removes the rest.
+             The source directory itself is never returned.
+        """
+        kept = self._kept[:]
+
+        for index in range(len(kept) - 1, 0, -1):         #  Children are always found after their parent.
+            if kept[index]:
+                kept[self._parents[index]] += 1
+
+        return [self._dirPaths[index] for index in range(1, len(kept))
+                if not kept[index] and (self._parents[index] == 0 or kept[self._parents[index]])]
+
+    def _addDir(self, path, parent):
+        """  Records a directory, returns its index.
+        """
+        self._dirIndex[path] = len(self._dirPaths)
+        self._dirPaths.append(path)
+        self._parents.append(parent)
+        self._kept.append(0)
+        return len(self._dirPaths) - 1
+
+
+class Walkers():
+    """  A simple class that walks several source directories [i.e. one per disk], with a Walker for each.
+         Used just like a Walker, over every source directory in turn.
+
+         usage:
+         walkers = Walker.Walkers(sourceDirs)
+
+         walkers.walkers                 - the Walker of each source directory, in order - i.e. to read them at the same time.
+         for entry in walkers.songs():   - the songs of every source directory, one source directory after the other.
+         walkers.count                   - number of songs found so far.
+         walkers.errors                  - directories that could not be read.
+         walkers.complete                - True once every walk has finished.
+         walkers.fileRemoved(path)       - tell the walkers a song has since been deleted.
+    """
+
+    __slots__ = ["walkers"]
+
+    def __init__(self, sourceDirs):
+        self.walkers = [Walker(sourceDir) for sourceDir in sourceDirs]
+
+    def songs(self):
+        for walker in self.walkers:
+            yield from walker.songs()
+
+    @property
+    def count(self):
+        return sum(walker.count for walker in self.walkers)
+
+    @property
+    def errors(self):
+        return [error for walker in self.walkers for error in walker.errors]
+
+    @property
+    def complete(self):
+        return all(walker.complete for walker in self.walkers)
+
+    def fileRemoved(self, path):
+        for walker in self.walkers:
+            walker.fileRemoved(path)
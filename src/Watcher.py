@@ -0,0 +1,322 @@
+###############################################################################################################
+#    Watcher.py   Copyright (C) <2025>  <Kevin Scott>                                                         #
+#                                                                                                             #
+#    A class that watches directory trees, and reports the songs [.mp3 files] that are added, changed,        #
+#    deleted or renamed.  Uses inotify on Linux [through ctypes], else polls the tree every few seconds.      #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+import src.Walker as Walker
+
+
+class Watcher():
+    """  A simple class that watches the source directories, and returns what has happened to the songs since last asked.
+
+         usage:
+         watcher = Watcher.Watcher(sourceDirs, interval, poll)
+            interval = seconds between polls of the tree, if polling.
+            poll     = if True always poll, else inotify is used where there is one.
+
+         for event in watcher.events(timeout):  - the events since last asked, waits up to timeout seconds for one.
+         watcher.backend                        - either inotify or poll.
+         watcher.close()                        - stop watching, also done on exit of a with block.
+
+         Each event is a tuple, the paths are built from sourceDirs - so they match the paths found by Walker.
+            ("changed", songFile)               - a new song, or a song that has been written to.
+            ("deleted", songFile)               - a song that has been deleted, or moved out of the source directories.
+            ("moved", songFile, newFile)        - a song that has been renamed, or moved within the source directories.
+            ("dirDeleted", directory)           - a directory that has been deleted, or moved out of the source directories.
+            ("dirMoved", directory, newDir)     - a directory that has been renamed, or moved within the source directories.
+            ("rescan", sourceDirs)              - events have been lost [inotify queue overflow], check every tree.
+
+         With inotify a song is changed once it is closed after writing, a directory that is created or moved in
+         is watched and its songs reported has changed.
+         When polling a song is changed once its size and mtime are the same on two polls, so a song still being
+         copied is not read.  A song that goes with another of the same size and mtime turning up is a rename.
+    """
+
+    __slots__ = ["sourceDirs", "interval", "backend", "_fd", "_libc", "_paths", "_songs", "_pending", "_nextPoll"]
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM  = 0x00000040
+    IN_MOVED_TO    = 0x00000080
+    IN_CREATE      = 0x00000100
+    IN_DELETE      = 0x00000200
+    IN_Q_OVERFLOW  = 0x00004000
+    IN_IGNORED     = 0x00008000
+    IN_ONLYDIR     = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    IN_ISDIR       = 0x40000000
+
+    WATCH_MASK     = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW
+    EVENT          = struct.Struct("iIII")             #  wd, mask, cookie, length of name - the name follows.
+    READ_SIZE      = 65536
+    MOVE_WAIT      = 0.05                              #  Seconds to wait for the other half of a move.
+
+    def __init__(self, sourceDirs, interval=2.0, poll=False):
+        self.sourceDirs = [os.fspath(sourceDir) for sourceDir in sourceDirs]
+        self.interval   = interval
+        self._fd       = None
+        self._paths    = {}                 #  The directory of each inotify watch.
+        self._songs    = {}                 #  When polling, the size and mtime of each song already reported.
+        self._pending  = {}                 #  When polling, the size and mtime of each song changed, but not yet reported.
+        self._nextPoll = 0.0
+
+        self._libc = None if poll else self._loadInotify()
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if self._fd < 0:
+                self._fd = None
+
+        if self._fd is None:
+            self.backend   = "poll"
+            self._songs    = self._snapshot()
+            self._nextPoll = time.monotonic() + self.interval
+        else:
+            self.backend = "inotify"
+            for sourceDir in self.sourceDirs:
+                self._watchTree(sourceDir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _loadInotify():
+        """  Returns libc if it has inotify, else None.
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            return None
+        if not all(hasattr(libc, name) for name in ("inotify_init1", "inotify_add_watch", "inotify_rm_watch")):
+            return None
+        return libc
+
+    def close(self):
+        """  Stop watching.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._paths.clear()
+
+    def events(self, timeout=None):
+        """  Returns a list of the events since last asked, waits up to timeout seconds [None = for ever] for one.
+             Returns an empty list if there were none.
+        """
+        if self.backend == "inotify":
+            return self._inotifyEvents(timeout)
+
+        wait = self._nextPoll - time.monotonic()
+        if wait > 0:
+            if timeout is not None and timeout < wait:
+                time.sleep(timeout)
+                return []
+            time.sleep(wait)
+        self._nextPoll = time.monotonic() + self.interval
+        return self._pollEvents()
+
+    def _watchTree(self, directory):
+        """  Adds a watch to directory and every directory below it, returns the songs found in them.
+             A directory that can't be watched [i.e. deleted while being walked] is skipped.
+        """
+        songs = []
+        stack = [directory]
+
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC:
+                    raise OSError(error, "inotify watch limit reached, raise fs.inotify.max_user_watches", directory)
+                continue
+            self._paths[wd] = directory
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif Walker.Walker.isSong(entry.name):
+                            songs.append(entry.path)
+            except OSError:
+                pass
+        return songs
+
+    def _unwatchTree(self, directory):
+        """  Removes the watches of directory and every directory below it, i.e. moved out of the source directories.
+        """
+        for wd in [wd for wd, path in self._paths.items() if self._below(path, directory)]:
+            self._libc.inotify_rm_watch(self._fd, wd)
+            del self._paths[wd]
+
+    def _moveTree(self, directory, newDir):
+        """  Renames the watches of directory and every directory below it, the watches follow the directory.
+        """
+        for wd, path in self._paths.items():
+            if self._below(path, directory):
+                self._paths[wd] = newDir + path[len(directory):]
+
+    @staticmethod
+    def _below(path, directory):
+        return path == directory or path.startswith(directory + os.sep)
+
+    def _read(self, timeout):
+        """  Returns the raw events waiting, [(wd, mask, cookie, name)] - waits up to timeout seconds for one.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buffer = os.read(self._fd, self.READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        raw    = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, cookie, length = self.EVENT.unpack_from(buffer, offset)
+            offset += self.EVENT.size
+            name    = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            raw.append((wd, mask, cookie, name))
+        return raw
+
+    def _inotifyEvents(self, timeout):
+        """  Turns the raw inotify events into song events.
+             A move is two events, paired by cookie - a move from without a move to has left the source directories.
+        """
+        events = []
+        moves  = {}                         #  cookie : (path, isDir) of each move from, waiting for its move to.
+        raw    = self._read(timeout)
+
+        while raw:
+            for wd, mask, cookie, name in raw:
+                if mask & self.IN_Q_OVERFLOW:
+                    events.append(("rescan", self.sourceDirs))
+                    continue
+                if mask & self.IN_IGNORED:
+                    self._paths.pop(wd, None)
+                    continue
+
+                directory = self._paths.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+
+                if mask & self.IN_ISDIR:
+                    if mask & self.IN_MOVED_FROM:
+                        moves[cookie] = (path, True)
+                    elif mask & self.IN_MOVED_TO and cookie in moves:
+                        oldDir, _ = moves.pop(cookie)
+                        self._moveTree(oldDir, path)
+                        events.append(("dirMoved", oldDir, path))
+                    elif mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        events.extend(("changed", songFile) for songFile in self._watchTree(path))
+                    elif mask & self.IN_DELETE:
+                        events.append(("dirDeleted", path))
+                    continue
+
+                if mask & self.IN_MOVED_FROM:
+                    moves[cookie] = (path, False)
+                elif mask & self.IN_MOVED_TO:
+                    oldFile, _ = moves.pop(cookie, (None, False))
+                    isSong     = Walker.Walker.isSong(path)
+                    if oldFile is not None and Walker.Walker.isSong(oldFile):
+                        events.append(("moved", oldFile, path) if isSong else ("deleted", oldFile))
+                    elif isSong:
+                        events.append(("changed", path))
+                elif Walker.Walker.isSong(name):
+                    if mask & self.IN_CLOSE_WRITE:
+                        events.append(("changed", path))
+                    elif mask & self.IN_DELETE:
+                        events.append(("deleted", path))
+
+            raw = self._read(self.MOVE_WAIT) if moves else []
+
+        for path, isDir in moves.values():                 #  Moved out of the source directories.
+            if isDir:
+                self._unwatchTree(path)
+                events.append(("dirDeleted", path))
+            elif Walker.Walker.isSong(path):
+                events.append(("deleted", path))
+
+        return events
+
+    def _snapshot(self):
+        """  Returns {songFile: (size, mtime)} for every song below the source directories.
+        """
+        songs = {}
+        for entry in Walker.Walkers(self.sourceDirs).songs():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue                    #  Gone since found.
+            songs[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return songs
+
+    def _pollEvents(self):
+        """  Compares a new snapshot of the songs with the songs already reported.
+        """
+        events  = []
+        current = self._snapshot()
+        gone    = {}                        #  (size, mtime) : [songFile] of the songs no longer found.
+
+        for songFile, signature in self._songs.items():
+            if songFile not in current:
+                gone.setdefault(signature, []).append(songFile)
+
+        for songFile, signature in current.items():
+            if self._songs.get(songFile) == signature:
+                self._pending.pop(songFile, None)
+                continue
+
+            if songFile not in self._songs and len(gone.get(signature, ())) == 1:   #  Renamed, nothing to wait for.
+                oldFile = gone.pop(signature)[0]
+                del self._songs[oldFile]
+                self._songs[songFile] = signature
+                events.append(("moved", oldFile, songFile))
+            elif self._pending.get(songFile) == signature:                           #  Same on two polls, safe to read.
+                del self._pending[songFile]
+                self._songs[songFile] = signature
+                events.append(("changed", songFile))
+            else:
+                self._pending[songFile] = signature
+
+        for songFiles in gone.values():
+            for songFile in songFiles:
+                del self._songs[songFile]
+                events.append(("deleted", songFile))
+
+        for songFile in [songFile for songFile in self._pending if songFile not in current]:
+            del self._pending[songFile]
+
+        return events
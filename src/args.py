@@ -5,8 +5,8 @@
 #                                                                                                             #
 #   options:                                                                                                  #
 #     -h, --help            show this help message and exit                                                   #
-#     -s SOURCEDIR, --sourceDir SOURCEDIR                                                                     #
-#                           directory of the music files [mp3].                                               #
+#     -s SOURCEDIR [SOURCEDIR ...], --sourceDir SOURCEDIR [SOURCEDIR ...]                                     #
+#                           directories of the music files [mp3], each is read at the same time.              #
 #     -f DUPFILE, --dupFile DUPFILE                                                                           #
 #                           [Optional] list duplicates to file, start afresh.                                 #
 #     -fA DUPFILEAMEND, --dupFileAmend DUPFILEAMEND                                                           #
@@ -21,10 +21,14 @@
 #     -t, --checkThe        Check for a artist for trailing ',the'.                                           #
 #     -c, --check           Check database integrity.                                                         #
 #     -cD, --checkDelete    Check database integrity and delete unwanted.                                     #
+#     -cR, --checkRefresh   Check database integrity and refresh changed songs.                               #
 #     -xL, --noLoad         Do not load database.                                                             #
 #     -xS, --noSave         Do not save database.                                                             #
 #     -np, --noPrint        Do Not Print Possible False Positives.                                            #
 #     -zD, --zapNoneMusic   Zap [DELETE] none music files.                                                    #
+#     -H, --hash            Find byte identical songs by content hash, tags are not read.                     #
+#     -w, --watch           Watch the source directory, check songs has they are added.                       #
+#     -S, --server          Answer duplicate look ups from other programs, until Ctrl-C.                      #
 #                                                                                                             #
 #                                                                                                             #
 #     For changes see history.txt                                                                             #
@@ -76,7 +80,8 @@ def parseArgs(appName, appVersion, logger, songLibrary):
         The program will scan a given directory and report duplicate MP3 files."""),
         epilog=f" Kevin Scott (C) 2020-2024 :: {appName} {appVersion}")
 
-    parser.add_argument("-s", "--sourceDir", type=Path, action="store", help="directory of the music files [mp3].")
+    parser.add_argument("-s", "--sourceDir", type=Path, action="store", nargs="+",
+                        help="directories of the music files [mp3], each is read at the same time.")
     parser.add_argument("-f", "--dupFile", type=Path, action="store", default=False,
                         help="[Optional] list duplicates to file, start afresh.")
     parser.add_argument("-fA", "--dupFileAmend", type=Path, action="store", default=False,
@@ -91,11 +96,15 @@ def parseArgs(appName, appVersion, logger, songLibrary):
     parser.add_argument("-t", "--checkThe", action="store_true", help="Check for a artist for trailing ',the'.")
     parser.add_argument("-c", "--check", action="store_true", help="Check database integrity.")
     parser.add_argument("-cD", "--checkDelete", action="store_true", help="Check database integrity and delete unwanted.")
+    parser.add_argument("-cR", "--checkRefresh", action="store_true", help="Check database integrity and refresh changed songs.")
     parser.add_argument("-xL", "--noLoad", action="store_true", help="Do not load database.")
     parser.add_argument("-xS", "--noSave", action="store_true", help="Do not save database.")
     parser.add_argument("-np", "--noPrint", action="store_true", help="Do Not Print Possible False Positives.")
     parser.add_argument("-zD", "--zapNoneMusic", action="store_true", help="Zap [DELETE] none music files.")
     parser.add_argument("-ZZ", "--zapMusic",     action="store_true", help="Zap [DELETE] music files from source to recycle bin")
+    parser.add_argument("-H", "--hash",          action="store_true", help="Find byte identical songs by content hash, tags are not read.")
+    parser.add_argument("-w", "--watch",         action="store_true", help="Watch the source directory, check songs has they are added.")
+    parser.add_argument("-S", "--server",        action="store_true", help="Answer duplicate look ups from other programs, until Ctrl-C.")
 
     args = parser.parse_args()
 
@@ -113,14 +122,14 @@ def parseArgs(appName, appVersion, logger, songLibrary):
         print("Goodbye.")
         sys.exit(0)
 
-    if not args.sourceDir and not (args.check or args.checkDelete or args.number or args.explorer or args.zapMusic):
+    if not args.sourceDir and not (args.check or args.checkDelete or args.checkRefresh or args.number or args.explorer or args.zapMusic or args.server):
         logger.error("No Source Directory Supplied.")
         print(f"{colorama.Fore.RED}No Source Directory Supplied. {colorama.Fore.RESET}")
         parser.print_help()
         print("Goodbye.")
         sys.exit(1)
 
-    if args.sourceDir and not args.sourceDir.exists():  # Only check source dir exits if one was entered.
+    if args.sourceDir and not all(sourceDir.exists() for sourceDir in args.sourceDir):  # Only check source dirs exits if entered.
         logger.error("Source Directory Does Not Exist.")
         print(f"{colorama.Fore.RED}Source Directory Does Not Exist. {colorama.Fore.RESET}")
         parser.print_help()
@@ -160,6 +169,8 @@ def parseArgs(appName, appVersion, logger, songLibrary):
         checkDB = 1                    # Run data integrity check in test mode on library.
     elif args.checkDelete:
         checkDB = 2                    # Run data integrity check in delete mode on library.
+    elif args.checkRefresh:
+        checkDB = 3                    # Run data integrity check in refresh mode on library.
 
-    return (args.sourceDir, dfile, args.noLoad, args.noSave, args.build, args.difference, args.noPrint, args.zapNoneMusic, args.checkThe, checkDB, args.zapMusic)
+    return (args.sourceDir, dfile, args.noLoad, args.noSave, args.build, args.difference, args.noPrint, args.zapNoneMusic, args.checkThe, checkDB, args.zapMusic, args.hash, args.watch, args.server)
 
@@ -25,6 +25,7 @@ import colorama
 from tqdm import tqdm
 from plyer import notification
 
+import src.Report as Report
 import src.License as License
 import src.Exceptions as myExceptions
 
@@ -73,13 +74,13 @@ def checkToIgnore(musicDuplicate, songDuplicate, ignore):
 
 
 ####################################################################################### countSongs ############
-def countSongs(sourceDir, fileList, NCOLS):
-    """  Count the number of songs [.mp3 files] in the sourceDir.
-         The filenames are saved in a list fileList, this is then passed to scanMusic.
+def countSongs(walker, fileList, NCOLS):
+    """  Count the number of songs [.mp3 files] found by the walker [a Walker of the sourceDir].
+         The directory entries are saved in a list fileList, this is then passed to scanMusic.
          Takes just over a second at 160000 files approx.
     """
     print("Counting Songs")
-    for musicFile in tqdm(sourceDir.rglob("*.mp3"), unit="songs", ncols=NCOLS, position=1):
+    for musicFile in tqdm(walker.songs(), unit="songs", ncols=NCOLS, position=1):
         fileList.append(musicFile)
 
     print(f"... with a song count of {len(fileList)}")
@@ -89,11 +90,16 @@ def countSongs(sourceDir, fileList, NCOLS):
 ####################################################################################### printDuplicate ########
 def logTextLine(textLine, textFile, logger=None):
     """  if the textFile is set, then write the line of text to that file, else print to screen.
+         textFile can also be a Report, which keeps the file open for the run - the line is passed on to it.
 
          textLine needs to be a string, for f.write - NOT a path.
 
          If a logger is passed in, then use it - else ignore.
     """
+    if isinstance(textFile, Report.Report):
+        textFile.writeLine(textLine, logger)
+        return
+
     if textFile:
         with open(textFile, encoding="utf-8", mode="a") as f:     # Open in amend mode, important.
             f.write(textLine + "\n")
@@ -104,11 +110,12 @@ def logTextLine(textLine, textFile, logger=None):
         logger.info(textLine)
 
 ######################################################################################## checkDatabase() ######
-def checkDatabase(songLibrary, check, dfile, logger, appName, appVersion, icon, timeout, NOTIFICATION):
+def checkDatabase(songLibrary, check, dfile, logger, appName, appVersion, icon, timeout, NOTIFICATION, rescan=None):
     """  Perform a data integrity check on the library.
 
           if check == test then just report errors.
           if check == delete then report errors and delete entries.
+          if check == refresh then report errors and re-read the tags of changed songs, using rescan.
     """
     if NOTIFICATION:
         notification.notify(appName, "Database Check Started", appName, icon, timeout)
@@ -116,7 +123,7 @@ def checkDatabase(songLibrary, check, dfile, logger, appName, appVersion, icon,
     License.printShortLicense(appName, appName, dfile, False)
 
     try:
-        songLibrary.check(check, logger)
+        songLibrary.check(check, logger, rescan=rescan)
     except myExceptions.LibraryError:
         message = f"{colorama.Fore.RED}ERROR : No Database file found. {colorama.Fore.RESET}"
         print(message)
@@ -0,0 +1,234 @@
+###############################################################################################################
+#    fastTagUtils.py   Copyright (C) <2020-2025>  <Kevin Scott>                                               #
+#    A purpose built reader for the three things needed from a mp3 - artist, title and duration.              #
+#    Only the ID3v2 header and the TPE1/TIT2 frames are read, the duration comes from the Xing/Info/VBRI      #
+#    header of the first frame, or for a CBR song the bitrate and file size.  A few small reads per song.     #
+#                                                                                                             #
+#    Anything it can't handle raises FastTagError, scanTags then falls back to tinytag.                       #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import struct
+
+import src.Exceptions as myExceptions
+
+HEAD_SIZE  = 4096           #  First read, the ID3v2 header and usually all the text frames.
+SYNC_RANGE = 65536          #  How far past the tag to look for the first mpeg frame.
+ID3V1_SIZE = 128
+
+WANTED = {"TPE1": "artist", "TIT2": "title", "TP1": "artist", "TT2": "title"}
+
+#  Bitrates in kbps by [mpeg version 1 or not][layer], index 0 is free format [not handled].
+BITRATES = {(True, 1) : (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+            (True, 2) : (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+            (True, 3) : (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+            (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+            (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+            (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)}
+
+#  Sample rates by mpeg version id [0 = 2.5, 2 = 2, 3 = 1].
+SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+ENCODINGS = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+####################################################################################### readFast ##############
+def readFast(musicFile):
+    """  Returns (artist, title, duration) of the mp3, artist and title are None if not found.
+         Raises FastTagError if the song is not one it can handle, FileNotFoundError if not there.
+    """
+    with open(musicFile, "rb") as mp3File:
+        fileSize = os.fstat(mp3File.fileno()).st_size
+        head     = mp3File.read(HEAD_SIZE)
+
+        tags, audioStart = _readID3v2(mp3File, head)
+
+        if "artist" not in tags or "title" not in tags:     #  Try the ID3v1 tag at the end of the song.
+            _readID3v1(mp3File, fileSize, tags)
+
+        duration = _readDuration(mp3File, head, audioStart, fileSize)
+
+    return tags.get("artist"), tags.get("title"), duration
+
+
+def _readID3v2(mp3File, head):
+    """  Returns the wanted frames of the ID3v2 tag has a dictionary, and where the audio starts.
+    """
+    if not head.startswith(b"ID3"):
+        return {}, 0
+
+    major, flags = head[3], head[5]
+    if major not in (2, 3, 4) or flags & 0xC0:              #  Unsynchronised or an extended header.
+        raise myExceptions.FastTagError("ID3v2 tag not handled")
+
+    size       = _syncSafe(head[6:10])
+    audioStart = 10 + size + (10 if flags & 0x10 else 0)    #  v2.4 footer.
+    tag        = head[10:10 + size]
+    if len(tag) < size:                                     #  A big tag, read the rest of it.
+        mp3File.seek(len(head))
+        tag += mp3File.read(size - len(tag))
+
+    headerSize = 6 if major == 2 else 10
+    tags       = {}
+    offset     = 0
+
+    while offset + headerSize <= size and len(tags) < 2:
+        if major == 2:
+            frameId   = tag[offset:offset + 3]
+            frameSize = int.from_bytes(tag[offset + 3:offset + 6], "big")
+            frameFlags = 0
+        else:
+            frameId    = tag[offset:offset + 4]
+            frameSize  = _syncSafe(tag[offset + 4:offset + 8]) if major == 4 else int.from_bytes(tag[offset + 4:offset + 8], "big")
+            frameFlags = int.from_bytes(tag[offset + 8:offset + 10], "big")
+
+        if not frameId.strip(b"\0") or frameSize > size:     #  Padding, or a broken frame - the end of the frames.
+            break
+
+        name = WANTED.get(frameId.decode("latin-1"))
+        if name and name not in tags:
+            if frameFlags & 0x00EF:                         #  Compressed, encrypted, grouped or unsynchronised.
+                raise myExceptions.FastTagError("ID3v2 frame not handled")
+            value = _decodeText(tag[offset + headerSize:offset + headerSize + frameSize])
+            if value:
+                tags[name] = value
+
+        offset += headerSize + frameSize
+
+    return tags, audioStart
+
+
+def _readID3v1(mp3File, fileSize, tags):
+    """  Adds the artist and title from the ID3v1 tag, if there is one - only if not found in the ID3v2 tag.
+    """
+    if fileSize < ID3V1_SIZE:
+        return
+    mp3File.seek(fileSize - ID3V1_SIZE)
+    tag = mp3File.read(ID3V1_SIZE)
+    if not tag.startswith(b"TAG"):
+        return
+
+    for name, field in (("title", tag[3:33]), ("artist", tag[33:63])):
+        value = field.decode("latin-1").strip("\0").partition("\0")[0]
+        if value and name not in tags:
+            tags[name] = value
+
+
+def _readDuration(mp3File, head, audioStart, fileSize):
+    """  Returns the duration of the song in seconds.
+         From the frame count in a Xing, Info or VBRI header if there is one, else the bitrate of the first frame.
+    """
+    if audioStart + 256 <= len(head):                       #  Room for the first frame header and any Xing header.
+        data = head[audioStart:]
+    else:
+        mp3File.seek(audioStart)
+        data = mp3File.read(HEAD_SIZE)
+
+    position = _findFrame(data)
+    if position < 0 and len(data) >= HEAD_SIZE:             #  Not in the first read, look a little further.
+        mp3File.seek(audioStart)
+        data     = mp3File.read(SYNC_RANGE)
+        position = _findFrame(data)
+    if position < 0:
+        raise myExceptions.FastTagError("No mpeg frame found")
+
+    header = data[position:position + 4]
+    mpeg1, layer, bitrate, sampleRate, mono = _frameInfo(header)
+
+    samples = 384 if layer == 1 else (1152 if mpeg1 or layer == 2 else 576)
+
+    frames = _vbrFrames(data, position, mpeg1, mono)
+    if frames:
+        return frames * samples / sampleRate
+
+    end = fileSize
+    if fileSize >= ID3V1_SIZE:                              #  Leave out the ID3v1 tag, if there is one.
+        mp3File.seek(fileSize - ID3V1_SIZE)
+        if mp3File.read(3) == b"TAG":
+            end -= ID3V1_SIZE
+
+    return (end - audioStart - position) * 8 / (bitrate * 1000)
+
+
+def _findFrame(data):
+    """  Returns the position of the first valid mpeg frame header in data, or -1.
+    """
+    position = data.find(b"\xff")
+    while 0 <= position <= len(data) - 4:
+        if _frameInfo(data[position:position + 4]):
+            return position
+        position = data.find(b"\xff", position + 1)
+    return -1
+
+
+def _frameInfo(header):
+    """  Returns (mpeg1, layer, bitrate, sampleRate, mono) of a mpeg frame header, or None if not valid.
+    """
+    if header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+
+    version     = (header[1] >> 3) & 0x03
+    layer       = 4 - ((header[1] >> 1) & 0x03)
+    bitrateId   = header[2] >> 4
+    sampleId    = (header[2] >> 2) & 0x03
+
+    if version == 1 or layer == 4 or bitrateId in (0, 15) or sampleId == 3:
+        return None
+
+    mpeg1 = version == 3
+    return mpeg1, layer, BITRATES[(mpeg1, layer)][bitrateId], SAMPLE_RATES[version][sampleId], header[3] >> 6 == 3
+
+
+def _vbrFrames(data, position, mpeg1, mono):
+    """  Returns the number of frames from a Xing, Info [LAME] or VBRI header in the first frame, or 0 if none.
+    """
+    xing = position + 4 + ((17 if mono else 32) if mpeg1 else (9 if mono else 17))
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        (flags,) = struct.unpack_from(">I", data, xing + 4)
+        if flags & 1 and len(data) >= xing + 12:
+            return struct.unpack_from(">I", data, xing + 8)[0]
+        return 0
+
+    vbri = position + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI" and len(data) >= vbri + 18:
+        return struct.unpack_from(">I", data, vbri + 14)[0]
+
+    return 0
+
+
+def _decodeText(frame):
+    """  Returns the text of a ID3v2 text frame, only the first value if there is more than one.
+    """
+    if not frame:
+        return ""
+    encoding = ENCODINGS.get(frame[0])
+    if encoding is None:
+        raise myExceptions.FastTagError("Unknown text encoding")
+
+    text = frame[1:]
+    if encoding.startswith("utf-16"):
+        if encoding == "utf-16" and text[:2] not in (b"\xff\xfe", b"\xfe\xff"):
+            encoding = "utf-16-le"                          #  No BOM, tinytag assumes little endian.
+        text = text[:len(text) & ~1]
+    value = text.decode(encoding, "replace").lstrip("\ufeff")
+    return value.strip("\0").partition("\0")[0]
+
+
+def _syncSafe(data):
+    """  Returns the value of a four byte sync safe integer, seven bits to each byte.
+    """
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
@@ -0,0 +1,224 @@
+###############################################################################################################
+#    fingerprintUtils.py   Copyright (C) <2025>  <Kevin Scott>                                                #
+#    A compact spectral fingerprint of the start of a song, for songs whose tags can't be trusted.            #
+#    The song is decoded by ffmpeg to mono 5512 Hz samples, each frame is split into 33 bands between         #
+#    300 and 2000 Hz - the sign of the change in energy between bands and frames gives 32 bits per frame.     #
+#                                                                                                             #
+#    Uses numpy for the FFT if installed, else a plain python FFT.                                            #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import re
+import sys
+import math
+import cmath
+import subprocess
+
+from array import array
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+import src.Exceptions as myExceptions
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FFMPEG      = "ffmpeg"      #  The decoder, must be on the path.
+SAMPLE_RATE = 5512          #  Samples per second the song is decoded to, enough for the bands below 2000 Hz.
+FRAME       = 1024          #  Samples in each frame, about 0.19 seconds - must be a power of two.
+HOP         = 512           #  Samples between the start of each frame, the frames overlap by a half.
+BANDS       = 33            #  Energy bands per frame, the differences between neighbours give 32 bits.
+LOW_FREQ    = 300
+HIGH_FREQ   = 2000
+
+#  Tags that say nothing about the song, a song with these [or none] is matched by its fingerprint.
+#  A bare number is only a placeholder when zero padded [07], so titles like 1999 or 7 are kept.
+PLACEHOLDERS = re.compile(r"(|unknown|unknown artist|untitled|no title|track|track\s*\d+|audiotrack\s*\d+|0\d+|"
+                          r"\d+\s*-\s*(|unknown|untitled|no title|track|track\s*\d+))", re.IGNORECASE)
+
+#  The FFT bin at the edge of each band, log spaced.
+EDGES = [round(LOW_FREQ * (HIGH_FREQ / LOW_FREQ) ** (band / BANDS) * FRAME / SAMPLE_RATE) for band in range(BANDS + 1)]
+
+WINDOW   = [0.5 - 0.5 * math.cos(2 * math.pi * n / FRAME) for n in range(FRAME)]      #  Hann window.
+TWIDDLES = [cmath.exp(-2j * math.pi * k / FRAME) for k in range(FRAME // 2)]
+REVERSED = [int(f"{n:0{FRAME.bit_length() - 1}b}"[::-1], 2) for n in range(FRAME)]   #  Bit reversed order of the FFT input.
+
+####################################################################################### needsFingerprint ######
+def needsFingerprint(artist, title):
+    """  Returns True if the artist or title is empty or a placeholder, i.e. Unknown Artist or Track 01.
+         The key of such a song says nothing about it, so it is matched by its fingerprint instead.
+    """
+    return bool(PLACEHOLDERS.fullmatch(artist.strip()) or PLACEHOLDERS.fullmatch(title.strip()))
+
+####################################################################################### makeFingerprint #######
+def makeFingerprint(musicFile, seconds):
+    """  Returns the fingerprint of the first seconds of the song, has bytes.
+         Raises FingerprintError if the song can't be decoded.
+    """
+    return fingerprint(decode(musicFile, seconds))
+
+
+def decode(musicFile, seconds):
+    """  Returns the first seconds of the song has an array of 16 bit mono samples, at SAMPLE_RATE.
+         The song is decoded by ffmpeg, in a separate process.
+    """
+    command = [FFMPEG, "-v", "error", "-nostdin", "-t", str(seconds), "-i", os.fspath(musicFile),
+               "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-"]
+    try:
+        decoded = subprocess.run(command, capture_output=True)
+    except FileNotFoundError as error:
+        raise myExceptions.FingerprintError(f"{FFMPEG} not found, is it installed?") from error
+
+    if decoded.returncode:
+        raise myExceptions.FingerprintError(f"Can't decode {musicFile} :: {decoded.stderr.decode(errors='replace').strip()}")
+
+    samples = array("h")
+    samples.frombytes(decoded.stdout[:len(decoded.stdout) // 2 * 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def fingerprint(samples):
+    """  Returns the fingerprint of the samples, 32 bits for each frame after the first - little endian bytes.
+         Bit b of a frame is set if the energy of band b less band b + 1 went up from the frame before.
+         Raises FingerprintError if there are too few samples for two frames.
+    """
+    if len(samples) < FRAME + HOP:
+        raise myExceptions.FingerprintError(f"Too short to fingerprint, {len(samples) / SAMPLE_RATE:.1f} seconds")
+
+    energies = _numpyEnergies(samples) if numpy else [_energies(samples, start) for start in range(0, len(samples) - FRAME + 1, HOP)]
+
+    values   = array("I")
+    previous = [energies[0][band] - energies[0][band + 1] for band in range(BANDS - 1)]
+    for frame in energies[1:]:
+        current = [frame[band] - frame[band + 1] for band in range(BANDS - 1)]
+        value   = 0
+        for bit, (now, before) in enumerate(zip(current, previous, strict=True)):
+            if now > before:
+                value |= 1 << bit
+        values.append(value)
+        previous = current
+
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack(fingerprint):
+    """  Returns the fingerprint has an array of 32 bit values, one per frame.
+    """
+    values = array("I")
+    values.frombytes(fingerprint)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _energies(samples, start):
+    """  Returns the energy in each band of the frame at start, using a plain python FFT.
+    """
+    data = [samples[start + n] * WINDOW[n] for n in REVERSED]
+
+    size = 2
+    while size <= FRAME:                                    #  Iterative radix 2, the input is already bit reversed.
+        half = size // 2
+        step = FRAME // size
+        for first in range(0, FRAME, size):
+            for k in range(half):
+                even = data[first + k]
+                odd  = data[first + k + half] * TWIDDLES[k * step]
+                data[first + k]        = even + odd
+                data[first + k + half] = even - odd
+        size *= 2
+
+    power = [abs(value) ** 2 for value in data[EDGES[0]:EDGES[-1]]]
+    base  = EDGES[0]
+    return [sum(power[low - base:high - base]) for low, high in zip(EDGES, EDGES[1:], strict=False)]
+
+
+def _numpyEnergies(samples):
+    """  Returns the energy in each band of every frame, using numpy.
+    """
+    signal = numpy.asarray(samples, dtype=numpy.float64)
+    frames = numpy.lib.stride_tricks.sliding_window_view(signal, FRAME)[::HOP] * numpy.asarray(WINDOW)
+    power  = numpy.abs(numpy.fft.rfft(frames, axis=1)[:, EDGES[0]:EDGES[-1]]) ** 2
+    return numpy.add.reduceat(power, numpy.asarray(EDGES[:-1]) - EDGES[0], axis=1).tolist()
+
+####################################################################################### fingerprintSongs ######
+def fingerprintSongs(songs, seconds, logger, cache=None, workers=0):
+    """  A generator that yields (musicFile, fingerprint) for each song in songs, in order.
+         fingerprint is None if the song can't be fingerprinted [error is logged].
+
+         If cache is not None [a FingerprintCache], only new or changed songs are decoded.
+         If workers is 0 the songs are fingerprinted one at a time in this process, else by a pool of worker processes.
+    """
+    songs  = [os.fspath(musicFile) for musicFile in songs]
+    stats  = []
+    prints = []
+
+    for musicFile in songs:
+        stat = hit = None
+        if cache is not None:
+            try:
+                stat = os.stat(musicFile)
+                hit  = cache.getItem(musicFile, stat)
+            except OSError:
+                pass                    # Let the decode report the error.
+        stats.append(stat)
+        prints.append(hit)
+
+    misses = [musicFile for musicFile, hit in zip(songs, prints, strict=True) if hit is None]
+
+    if workers < 1 or not misses:
+        yield from _collect(songs, stats, prints, map(_fingerprintWorker, misses, repeat(seconds)), logger, cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _collect(songs, stats, prints, executor.map(_fingerprintWorker, misses, repeat(seconds)), logger, cache)
+
+
+def _collect(songs, stats, prints, results, logger, cache):
+    """  Yields (musicFile, fingerprint) for each song, merging the cache hits and the new fingerprints.
+    """
+    for musicFile, stat, hit in zip(songs, stats, prints, strict=True):
+        if hit is not None:
+            yield musicFile, hit
+            continue
+
+        songPrint, error = next(results)
+        if error:
+            logger.error(f"Can't fingerprint {musicFile} :: {error}")
+            yield musicFile, None
+            continue
+
+        if cache is not None and stat is not None:
+            cache.addItem(musicFile, stat, songPrint)
+        yield musicFile, songPrint
+
+
+def _fingerprintWorker(musicFile, seconds):
+    """  Runs makeFingerprint, maybe in a worker process.
+         Exceptions are returned has a string, the caller does the logging.
+    """
+    try:
+        return makeFingerprint(musicFile, seconds), None
+    except Exception as e:
+        return None, str(e)
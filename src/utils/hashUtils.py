@@ -0,0 +1,125 @@
+###############################################################################################################
+#    hashUtils.py   Copyright (C) <2025>  <Kevin Scott>                                                       #
+#    Finds byte identical songs by content hash, in three stages - each only for the songs still in the       #
+#    running.  Songs are grouped by size, then by a hash of their first and last 64 KB, then by a hash of     #
+#    the whole file.  Most songs have a size no other song has, so are never opened.                          #
+#                                                                                                             #
+#    The hashing is done in a pool of threads, hashlib and file reads release the GIL - so the disk is the limit.#
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import hashlib
+
+from concurrent.futures import ThreadPoolExecutor
+
+PARTIAL_SIZE = 65536        #  Bytes hashed from each end of a song, in the partial stage.
+BLOCK_SIZE   = 1 << 20      #  Bytes read at a time, in the full stage.
+DIGEST_SIZE  = 16
+
+####################################################################################### findIdentical #########
+def findIdentical(songs, threads, logger, kept=()):
+    """  Returns a list of the groups of byte identical songs, each group a list of paths in the order given.
+         songs is an iterable of (path, size), i.e. from songSizes.
+         The songs in kept [i.e. the library] are moved to the front of their group, so the first song is one to keep.
+
+         A song that can't be read is logged and left out.
+    """
+    bySize = {}
+    for path, size in songs:
+        bySize.setdefault(size, []).append(path)
+
+    groups = [(size, paths) for size, paths in bySize.items() if len(paths) > 1 and size]
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        groups = _regroup(executor, groups, partialHash, logger)
+
+        #  A song no bigger than the two ends has already been hashed in full.
+        small  = [(size, paths) for size, paths in groups if size <= 2 * PARTIAL_SIZE]
+        large  = [(size, paths) for size, paths in groups if size > 2 * PARTIAL_SIZE]
+        groups = small + _regroup(executor, large, fullHash, logger)
+
+    return [sorted(paths, key=lambda path: path not in kept) for _, paths in groups]
+
+
+def _regroup(executor, groups, hasher, logger):
+    """  Splits each group of (size, paths) by the hash of its songs, returns the groups still holding more than one song.
+    """
+    paths   = [(size, path) for size, group in groups for path in group]
+    digests = executor.map(lambda song: _hashSong(hasher, *song), paths)
+
+    regrouped = {}
+    for (size, path), (digest, error) in zip(paths, digests, strict=True):
+        if error:
+            logger.error(f"Can't hash {path} :: {error}")
+            continue
+        regrouped.setdefault((size, digest), []).append(path)
+
+    return [(size, group) for (size, _), group in regrouped.items() if len(group) > 1]
+
+
+def _hashSong(hasher, size, path):
+    """  Returns (digest, None), or (None, error) if the song can't be read.
+    """
+    try:
+        return hasher(path, size), None
+    except OSError as error:
+        return None, str(error)
+
+####################################################################################### partialHash ###########
+def partialHash(path, size):
+    """  Returns the hash of the first and last PARTIAL_SIZE bytes of the song, the whole song if it is smaller.
+         The ID3v2 tag is at the front and ID3v1 at the back, so a retagged copy will nearly always differ here.
+    """
+    with open(path, "rb", buffering=0) as songFile:
+        digest = hashlib.blake2b(songFile.read(PARTIAL_SIZE), digest_size=DIGEST_SIZE)
+        if size > 2 * PARTIAL_SIZE:
+            songFile.seek(-PARTIAL_SIZE, os.SEEK_END)
+        digest.update(songFile.read(PARTIAL_SIZE))
+    return digest.digest()
+
+
+def fullHash(path, size=None):
+    """  Returns the hash of the whole song, read a block at a time into one buffer.
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    buffer = bytearray(BLOCK_SIZE)
+    view   = memoryview(buffer)
+
+    with open(path, "rb", buffering=0) as songFile:
+        while count := songFile.readinto(buffer):
+            digest.update(view[:count])
+    return digest.digest()
+
+####################################################################################### songSizes #############
+def songSizes(fileList, threads=0):
+    """  A generator that yields (path, size) for each song in fileList.
+         The stat of an os.DirEntry [from Walker] is reused, else each song is stat'ed - in a pool of threads if set.
+         A song that can't be stat'ed [i.e. since deleted] is left out.
+    """
+    def stat(musicFile):
+        try:
+            size = musicFile.stat().st_size if isinstance(musicFile, os.DirEntry) else os.stat(musicFile).st_size
+        except OSError:
+            return None
+        return os.fspath(musicFile), size
+
+    if threads:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            yield from filter(None, executor.map(stat, fileList))
+    else:
+        yield from filter(None, map(stat, fileList))
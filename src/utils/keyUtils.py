@@ -0,0 +1,187 @@
+###############################################################################################################
+#    keyUtils.py   Copyright (C) <2020-2025>  <Kevin Scott>                                                   #
+#    Builds the library key of a song from its artist and title, either {artist}:{title} or its Soundex.      #
+#                                                                                                             #
+#    Artist names repeat thousands of times across a library, so the normalising [removeThe] and the          #
+#    Soundex codes of the artist and title are each held in a bounded cache - a repeated artist costs         #
+#    one dictionary look up.  The Soundex is built to give exactly the same code has libindic.                #
+#                                                                                                             #
+#    A batch of keys can also be built in one go, the codes are then found with a translate table and         #
+#    a regular expression over the whole batch - not a character at a time.                                   #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import re
+
+from functools import lru_cache
+
+from libindic.soundex import Soundex
+from libindic.utils.charmap import get_language
+
+import src.utils.duplicateUtils as duplicateUtils
+
+CACHE_SIZE = 65536          #  Maximum number of artists, and titles, held in each cache.
+KEY_LENGTH = 8              #  libindic pads or truncates a non English Soundex to this length.
+
+phonetic = Soundex()
+
+####################################################################################### normalise #############
+@lru_cache(maxsize=CACHE_SIZE)
+def normaliseArtist(artist):
+    """  Returns the artist has used in the key, i.e. without a leading 'the'.
+    """
+    return duplicateUtils.removeThe(artist)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normaliseTitle(title):
+    """  Returns the title has used in the key, i.e. without a leading 'the'.
+    """
+    return duplicateUtils.removeThe(title)
+
+####################################################################################### makeKey ###############
+def makeKey(artist, title, soundex):
+    """  Returns the library key for a song, either {artist}:{title} or the soundex of it.
+         artist and title should already be normalised.
+    """
+    return soundexKey(artist, title) if soundex else f"{artist}:{title}"
+
+
+def soundexKey(artist, title):
+    """  Returns the same has phonetic.soundex(f"{artist}:{title}"), built from the cached codes of the artist and title.
+
+         libindic keeps the first character, then the codes of the rest run together [zeros dropped and
+         repeated codes only once] - so the codes of the artist and title can be worked out apart and joined.
+    """
+    if artist:
+        first, codes = _artistCodes(artist)
+    else:
+        first, codes = ":", ""          #  The first character is the separator.
+
+    titleCodes = _titleCodes(title)
+    if codes and titleCodes and codes[-1] == titleCodes[0]:
+        titleCodes = titleCodes[1:]     #  A repeated code across the join only counts once.
+
+    key = first + codes + titleCodes
+    if _isEnglish(first):               #  English is not padded.
+        return key
+    return key[:KEY_LENGTH].ljust(KEY_LENGTH, "0")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _artistCodes(artist):
+    """  Returns the first character of the artist and the Soundex codes of the rest of it.
+    """
+    return artist[0], _codes(artist[1:])
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _titleCodes(title):
+    """  Returns the Soundex codes of the title.
+    """
+    return _codes(title)
+
+
+def _codes(text):
+    """  Returns the Soundex codes of text, zeros dropped and repeated codes only once.
+    """
+    codes = []
+    for char in text.lower():
+        code = _charCode(char)
+        if code != "0" and (not codes or code != codes[-1]):
+            codes.append(code)
+    return "".join(codes)
+
+
+@lru_cache(maxsize=None)
+def _charCode(char):
+    """  Returns the Soundex code of a character, has libindic - there are only so many characters.
+    """
+    return str(phonetic.soundexCode(char))
+
+
+@lru_cache(maxsize=None)
+def _isEnglish(char):
+    return get_language(char) == "en_US"
+
+####################################################################################### makeKeys ##############
+def makeKeys(songs, soundex):
+    """  Returns a list of the library keys for a list of (artist, title), has makeKey.
+    """
+    if not soundex:
+        return [f"{artist}:{title}" for artist, title in songs]
+    return soundexBatch([f"{artist}:{title}" for artist, title in songs])
+
+
+def soundexBatch(names):
+    """  Returns a list of the Soundex of each name ["artist:title"], the same has phonetic.soundex(name).
+
+         The names [less their first character] are run together a line each, lower cased and translated in one
+         go - each character to its code, zero codes dropped.  Repeated codes are then dropped by a regular
+         expression, which can't run past the end of a line.  A name holding a new line is done on its own.
+    """
+    keys  = [None] * len(names)
+    batch = []
+    for index, name in enumerate(names):
+        if "\n" in name:
+            keys[index] = _soundexName(name)
+        else:
+            batch.append(index)
+
+    text  = "\n".join(names[index][1:] for index in batch).lower().translate(_codeTable)
+    codes = _repeats.sub(r"\1", text).split("\n") if batch else []
+
+    for index, code in zip(batch, codes, strict=True):
+        first       = names[index][0]
+        key         = first + code
+        keys[index] = key if _isEnglish(first) else key[:KEY_LENGTH].ljust(KEY_LENGTH, "0")
+    return keys
+
+
+def _soundexName(name):
+    """  Returns the Soundex of a single name, has phonetic.soundex(name).
+    """
+    key = name[0] + _codes(name[1:])
+    return key if _isEnglish(name[0]) else key[:KEY_LENGTH].ljust(KEY_LENGTH, "0")
+
+
+class _CodeTable(dict):
+    """  A translate table of character to Soundex code, filled in has characters are first seen.
+         A zero code maps to None, so the character is dropped.  The new line between names is kept.
+    """
+    def __missing__(self, ordinal):
+        code  = _charCode(chr(ordinal))
+        value = self[ordinal] = None if code == "0" else code
+        return value
+
+
+_codeTable = _CodeTable({ord("\n"): "\n"})
+_repeats   = re.compile(r"(.)\1+")             #  A run of the same code, not across a new line.
+
+####################################################################################### cacheStats ############
+def cacheStats():
+    """  Returns a line for each cache, with its hits and misses - for the log at the end of a run.
+         The caches are per process, these are for the main process.
+    """
+    caches = {"Artist normalise": normaliseArtist, "Title normalise": normaliseTitle,
+              "Artist soundex"  : _artistCodes,    "Title soundex"  : _titleCodes}
+
+    lines = []
+    for name, cache in caches.items():
+        info = cache.cache_info()
+        lines.append(f"{name} cache :: {info.hits} hits, {info.misses} misses, holding {info.currsize} of {info.maxsize}")
+    return lines
@@ -0,0 +1,82 @@
+###############################################################################################################
+#    prefetchUtils.py   Copyright (C) <2025>  <Kevin Scott>                                                   #
+#                                                                                                             #
+#    Read ahead of the tag scanning, for music on network drives [SMB/NFS].                                   #
+#    A small pool of threads reads the ID3 header and the first / last few KB                                 #
+#    of each song, so the songs are in the file cache by the time their tags are read.                        #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+HEAD_SIZE = 16 * 1024           #  Read after the ID3 tag, covers the first mpeg frame and any Xing/VBRI header.
+TAIL_SIZE = 8 * 1024            #  Read from the end of the song, covers ID3v1 and APE tags.
+MAX_TAG   = 1024 * 1024         #  Don't read more then this of a large ID3 tag [cover art], keeps memory bounded.
+
+############################################################################################## prefetch ######
+def prefetch(items, threads, depth, key=None):
+    """  A generator that yields items in the same order, but only after the song has been read ahead by a thread.
+         Up to depth songs are in flight at any time, so memory is bounded however many songs there are.
+
+         key, if given, returns the song path for an item - or None if the item does not need reading ahead.
+    """
+    window = deque()
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="prefetch") as executor:
+        for item in items:
+            musicFile = key(item) if key else item
+            future    = executor.submit(readAhead, musicFile) if musicFile is not None else None
+            window.append((item, future))
+
+            if len(window) >= depth:
+                yield _waitFor(*window.popleft())
+
+        while window:
+            yield _waitFor(*window.popleft())
+
+
+def _waitFor(item, future):
+    """  Waits for the read ahead of an item to finish, returns the item.
+    """
+    if future is not None:
+        future.result()
+    return item
+
+############################################################################################## readAhead ######
+def readAhead(musicFile):
+    """  Reads the ID3 header and the first and last few KB of the song, the data is thrown away.
+         Errors are ignored, they will be reported when the tags are read.
+    """
+    try:
+        with open(musicFile, "rb", buffering=0) as f:
+            header = f.read(10)
+            size   = HEAD_SIZE
+
+            if len(header) == 10 and header[:3] == b"ID3":          # ID3v2 tag size is a 28 bit syncsafe integer.
+                size += min(((header[6] & 0x7F) << 21) | ((header[7] & 0x7F) << 14) | ((header[8] & 0x7F) << 7) | (header[9] & 0x7F), MAX_TAG)
+
+            f.read(size)
+
+            end = f.seek(0, os.SEEK_END)
+            if end > size + 10 + TAIL_SIZE:
+                f.seek(end - TAIL_SIZE)
+                f.read(TAIL_SIZE)
+    except OSError:
+        pass
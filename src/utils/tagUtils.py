@@ -18,50 +18,92 @@
 #                                                                                                             #
 ###############################################################################################################
 
+import os
+import struct
+import logging
+import threading
 import colorama
 import eyed3
 
-from mutagen.id3 import ID3
+from queue import Queue, Full
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from mutagen.id3 import ID3NoHeaderError
 from mutagen.mp3 import MP3
 from tinytag import TinyTag
-from libindic.soundex import Soundex
 
-import src.utils.duplicateUtils as duplicateUtils
+import src.utils.prefetchUtils as prefetchUtils
+import src.utils.fastTagUtils as fastTagUtils
+import src.utils.keyUtils as keyUtils
 import src.Exceptions as myExceptions
 
-phonetic = Soundex()
+workerLogger = logging.getLogger("pyMP3duplicate.worker")  # Worker processes pass errors back, so don't log here.
+workerLogger.addHandler(logging.NullHandler())
+workerLogger.propagate = False
 
 ####################################################################################### checktags #############
-def checkTags(musicFile, songFile, logger):
+def checkTags(musicFile, songFile, logger, musicTags=None, songTags=None):
     """  Used to check if the Soundex algorithm has returned a false positive.
          Returns True if the artist and title of the two songs are the same.
          Returns False if there is an error.
+
+         musicTags and songTags are the (artist, title) of the songs if already known [from scanTags and the library],
+         the tags are then compared in memory.  Only a song without known tags is opened and its tags read.
     """
-    try:  # Tries to read tags from the music file.
-        tags = TinyTag.get(musicFile)
-    except FileNotFoundError:  # Can't read tags - log as error.
-        logger.error(f"ERROR : Can't read tags : {musicFile}")
+    if musicTags is None:
+        musicTags = _readTags(musicFile, logger)
+    if songTags is None:
+        songTags = _readTags(songFile, logger)
+
+    if musicTags is None or songTags is None:
         return False
-    artist1 = duplicateUtils.removeThe(tags.artist)
-    title1 = duplicateUtils.removeThe(tags.title)
 
+    return musicTags == songTags
+
+####################################################################################### findDuplicates ########
+def findDuplicates(songLibrary, musicFile, tags, difference, soundex, logger):
+    """  Returns (matches, falseMatches) of a song against the library, tags is (key, musicDuration, artist, title) from scanTags.
+         matches are the (songFile, songDuration) at key within +/- difference of the song, the song itself is left out.
+         If soundex, the songs where only the Soundex matched are split out into falseMatches.
+    """
+    key, musicDuration, artist, title = tags
+    matches = songLibrary.findMatches(key, musicDuration, difference, musicFile)
+
+    if not soundex:
+        return matches, []
+
+    falseMatches = [match for match in matches
+                    if not checkTags(musicFile, match[0], logger, (artist, title), songLibrary.getTags(key, match[0]))]
+    return [match for match in matches if match not in falseMatches], falseMatches
+
+
+def _readTags(musicFile, logger):
+    """  Returns the (artist, title) of the music file, read using tinytag - or None if the tags can't be read.
+    """
     try:  # Tries to read tags from the music file.
-        tags = TinyTag.get(songFile)
+        tags = TinyTag.get(musicFile)
     except FileNotFoundError:  # Can't read tags - log as error.
-        logger.error(f"ERROR : Can't read tags : {songFile}")
-        return False
-    artist2 = duplicateUtils.removeThe(tags.artist)
-    title2  = duplicateUtils.removeThe(tags.title)
-
-    return True if (artist1 == artist2) and (title1 == title2) else False
+        logger.error(f"ERROR : Can't read tags : {musicFile}")
+        return None
+    return keyUtils.normaliseArtist(tags.artist), keyUtils.normaliseTitle(tags.title)
 
 ####################################################################################### scanTags ##############
 def scanTags(tag, musicFile, soundex, logger):
     """  Scans the musicfile for the required tags.
          Will use the method indicated in the user configure.
+         Returns (key, musicDuration, artist, title).
 
          If there is a problem reading the tags, raise an exception.
     """
+    musicDuration, artist, title = readSongTags(tag, musicFile, logger)
+    return makeKey(artist, title, soundex), musicDuration, artist, title
+
+
+def readSongTags(tag, musicFile, logger):
+    """  Has scanTags, but returns (musicDuration, artist, title) - the key is not built.
+         So the keys of many songs can be built together, by keyUtils.makeKeys.
+    """
     match tag:
         case "tinytag":
             try:  # Tries to read tags from the music file.
@@ -69,8 +111,8 @@ def scanTags(tag, musicFile, soundex, logger):
             except FileNotFoundError as error:  # Can't read tags - flag as error.
                 logger.error(f"Tinytag error reading tags :: {musicFile}")
                 raise myExceptions.TagReadError(f"Tinytag error reading tags {musicFile}  : File Not Found") from error
-            artist    = duplicateUtils.removeThe(tags.artist)
-            title     = duplicateUtils.removeThe(tags.title)
+            artist    = keyUtils.normaliseArtist(tags.artist)
+            title     = keyUtils.normaliseTitle(tags.title)
             duration  = tags.duration
 
         case "eyed3":
@@ -79,21 +121,37 @@ def scanTags(tag, musicFile, soundex, logger):
             except FileNotFoundError as error:
                 logger.error(f"Eyed3 error reading tags :: {musicFile}")
                 raise myExceptions.TagReadError(f"Eyed3 error reading tags {musicFile}  : File Not Found") from error
-            artist    = duplicateUtils.removeThe(tags.tag.artist)
-            title     = duplicateUtils.removeThe(tags.tag.title)
+            artist    = keyUtils.normaliseArtist(tags.tag.artist)
+            title     = keyUtils.normaliseTitle(tags.tag.title)
             duration  = tags.info.time_secs
 
         case "mutagen":
-            try:
-                tags  = ID3(musicFile)
+            try:                # One parse of the file gives both the ID3 tags and the stream info.
                 audio = MP3(musicFile)
             except FileNotFoundError as error:
                 logger.error(f"Nutagen error reading tags :: {musicFile}")
                 raise myExceptions.TagReadError(f"Mutagen error reading tags {musicFile} : File Not Found") from error
-            artist   = duplicateUtils.removeThe(tags["TPE1"][0])
-            title    = duplicateUtils.removeThe(tags["TIT2"][0])
+            tags = audio.tags
+            if tags is None:    # Has ID3(musicFile) would.
+                raise ID3NoHeaderError(f"{musicFile!r} doesn't start with an ID3 tag")
+            artist   = keyUtils.normaliseArtist(tags["TPE1"][0])
+            title    = keyUtils.normaliseTitle(tags["TIT2"][0])
             duration = audio.info.length
 
+        case "fast":
+            try:
+                artist, title, duration = fastTagUtils.readFast(musicFile)
+            except FileNotFoundError as error:
+                logger.error(f"Fast error reading tags :: {musicFile}")
+                raise myExceptions.TagReadError(f"Fast error reading tags {musicFile}  : File Not Found") from error
+            except (myExceptions.FastTagError, IndexError, struct.error):    # Not a song it can handle, use tinytag.
+                tags     = TinyTag.get(musicFile)
+                artist   = tags.artist
+                title    = tags.title
+                duration = tags.duration
+            artist = keyUtils.normaliseArtist(artist)
+            title  = keyUtils.normaliseTitle(title)
+
         case _:
             # Should not happen, tinytag should be returned by default.
             logger.error("Unknown user option for Tags Module.")
@@ -105,5 +163,224 @@ def scanTags(tag, musicFile, soundex, logger):
     else:
         musicDuration = round(duration, 2)
 
-    key = phonetic.soundex(f"{artist}:{title}") if soundex else f"{artist}:{title}"
-    return key, musicDuration, artist, title
+    return musicDuration, artist, title
+
+####################################################################################### makeKey ###############
+def makeKey(artist, title, soundex):
+    """  Returns the library key for a song, either {artist}:{title} or the soundex of it.
+         The artist and title codes are cached in keyUtils, so a repeated artist is only worked out once.
+    """
+    return keyUtils.makeKey(artist, title, soundex)
+
+####################################################################################### readTags ##############
+def readTags(fileList, tag, soundex, logger, tagCache=None, workers=0, chunkSize=64, prefetchThreads=0, prefetchDepth=64):
+    """  A generator that reads the tags of every song in fileList, yields (musicFile, tags, stat) in fileList order.
+         tags is (key, musicDuration, artist, title), or None if the tags could not be read [error is logged].
+         stat is the os.stat of the song before it was read [from the DirEntry, if given one], or None if it can't be stat'ed
+         - so the caller need not stat the song again, i.e. for Library.signature.
+
+         If workers is 0, the tags are read one at a time in this process.
+           If prefetchThreads is set, up to prefetchDepth songs not in the tag cache are read ahead by a pool of
+           threads - so on a network drive the waiting on the network overlaps with the reading of the tags.
+         Else the songs not found in the tag cache are handed in batches to a pool of worker processes,
+         the results stream back in chunks of chunkSize.  The next batch is queued before the current one
+         is yielded, so the workers are kept busy while the caller checks for duplicates.
+
+         Either way the keys are built chunkSize songs at a time, in one call to keyUtils.makeKeys.
+    """
+    if workers < 1:
+        songs = _readSongs(fileList, tag, logger, tagCache, prefetchThreads, prefetchDepth)
+    else:
+        songs = _readSongsPool(fileList, tag, logger, tagCache, workers, chunkSize)
+
+    for chunk in _batches(songs, chunkSize):
+        found = [songTags for _, songTags, _ in chunk if songTags is not None]
+        keys  = iter(keyUtils.makeKeys([songTags[1:] for songTags in found], soundex))
+        for musicFile, songTags, stat in chunk:
+            yield musicFile, None if songTags is None else (next(keys), *songTags), stat
+
+
+def _readSongs(fileList, tag, logger, tagCache, prefetchThreads, prefetchDepth):
+    """  Yields (musicFile, (musicDuration, artist, title), stat) for each song of fileList, read in this process - for readTags.
+         The tags are None if they could not be read [error is logged].
+    """
+    lookups = _lookupCache(fileList, tagCache)
+
+    if prefetchThreads:
+        lookups = prefetchUtils.prefetch(lookups, prefetchThreads, max(prefetchDepth, prefetchThreads),
+                                         key=lambda lookup: None if lookup[2] else lookup[0])
+
+    for musicFile, stat, hit in lookups:
+        if hit:
+            yield musicFile, tuple(hit), stat
+            continue
+        try:
+            songTags = readSongTags(tag, musicFile, logger)
+        except Exception as e:  # Can"t read tags - flag as error.
+            logger.error(f"Raised exception at calling scanTags :: {e} ")
+            yield musicFile, None, stat
+            continue
+        if tagCache is not None and stat is not None:
+            tagCache.addItem(musicFile, stat, *songTags)
+        yield musicFile, songTags, stat
+
+
+def _readSongsPool(fileList, tag, logger, tagCache, workers, chunkSize):
+    """  Has _readSongs, but the songs not in the tag cache are read by a pool of worker processes - for readTags.
+    """
+    batchSize = chunkSize * workers * 4
+    pending   = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in _batches(fileList, batchSize):
+            pending.append(_submitBatch(executor, batch, tag, chunkSize, tagCache))
+            if len(pending) > 1:
+                yield from _collectBatch(*pending.popleft(), logger, tagCache)
+
+        while pending:
+            yield from _collectBatch(*pending.popleft(), logger, tagCache)
+
+
+####################################################################################### readRoots #############
+def readRoots(fileLists, tag, soundex, logger, tagCache=None, workers=0, chunkSize=64, prefetchThreads=0, prefetchDepth=64,
+              rootDepth=1024):
+    """  Has readTags, but for a list of fileLists - one for each source directory [i.e. one per disk].
+         Each fileList is read by readTags in its own thread, so the disks are all read at the same time.
+         If workers is set, each source directory has its own pool of worker processes.
+
+         The results are still yielded in order - all of the first fileList, then all of the second and so on.
+         So the duplicates found do not depend on which disk is quickest, the results of the later source directories
+         are held until they are needed - at most rootDepth for each, then that thread waits.
+         If the results are not all used [i.e. an error], the threads are stopped.  The tag cache is shared by the
+         threads, TagCache takes a lock.
+    """
+    if len(fileLists) == 1:
+        yield from readTags(fileLists[0], tag, soundex, logger, tagCache, workers, chunkSize, prefetchThreads, prefetchDepth)
+        return
+
+    stop   = threading.Event()
+    queues = [Queue(maxsize=rootDepth) for _ in fileLists]
+    for fileList, results in zip(fileLists, queues, strict=True):
+        threading.Thread(target=_readRoot, daemon=True,
+                         args=(results, stop, fileList, tag, soundex, logger, tagCache, workers, chunkSize, prefetchThreads, prefetchDepth)).start()
+
+    try:
+        for results in queues:
+            while (result := results.get()) is not None:
+                if isinstance(result, BaseException):
+                    raise result
+                yield result
+    finally:
+        stop.set()
+
+
+def _readRoot(results, stop, fileList, *args):
+    """  Runs readTags in a thread for readRoots, each result is put on the queue results - then None once done.
+         An exception is put on the queue, to be raised by readRoots.  Returns early once stop is set.
+    """
+    songTags = readTags(fileList, *args)
+    try:
+        for result in songTags:
+            if not _putResult(results, result, stop):
+                return
+    except BaseException as error:
+        _putResult(results, error, stop)
+        return
+    finally:
+        songTags.close()
+    _putResult(results, None, stop)
+
+
+def _putResult(results, result, stop):
+    """  Puts result on the queue results, waiting while it is full - returns False if stop is set first.
+    """
+    while not stop.is_set():
+        try:
+            results.put(result, timeout=0.1)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def _lookupCache(fileList, tagCache):
+    """  Yields (musicFile, stat, hit) for each song, hit is the cached tags - or None if the tags need reading.
+         fileList can hold paths or os.DirEntry's [from Walker], the stat of a DirEntry is reused.
+         Each song is stat'ed once, here - stat is None if it can't be.
+    """
+    for musicFile in fileList:
+        stat = None
+        hit  = None
+        try:
+            stat = musicFile.stat() if isinstance(musicFile, os.DirEntry) else os.stat(musicFile)
+            if tagCache is not None:
+                hit = tagCache.getItem(musicFile, stat)
+        except OSError:
+            pass                        # Let scanTags report the error.
+        if isinstance(musicFile, os.DirEntry):
+            musicFile = musicFile.path
+        yield musicFile, stat, hit
+
+
+def _batches(fileList, batchSize):
+    """  Splits fileList [can be any iterable, i.e. Walker.songs()] into lists of batchSize songs.
+    """
+    batch = []
+    for musicFile in fileList:
+        batch.append(musicFile)
+        if len(batch) == batchSize:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _submitBatch(executor, batch, tag, chunkSize, tagCache):
+    """  Looks up each song of the batch in the tag cache, the rest are submitted to the worker processes.
+         Returns the batch, the cache results [None for a miss], stat results and an iterator over the workers results.
+    """
+    cached = []
+    stats  = []
+    misses = []
+
+    paths  = []
+
+    for musicFile, stat, hit in _lookupCache(batch, tagCache):
+        if hit is None:
+            misses.append(musicFile)
+        paths.append(musicFile)
+        cached.append(hit)
+        stats.append(stat)
+
+    results = executor.map(_scanWorker, misses, [tag] * len(misses), chunksize=chunkSize)
+    return paths, cached, stats, results
+
+
+def _collectBatch(batch, cached, stats, results, logger, tagCache):
+    """  Yields (musicFile, (musicDuration, artist, title), stat) for each song of the batch, in order, merging the cache hits
+         and the workers results.
+    """
+    for musicFile, hit, stat in zip(batch, cached, stats, strict=True):
+        if hit is not None:
+            yield musicFile, tuple(hit), stat
+            continue
+
+        songTags, error = next(results)
+        if error:
+            logger.error(f"Raised exception at calling scanTags :: {error} ")
+            yield musicFile, None, stat
+            continue
+
+        if tagCache is not None and stat is not None:
+            tagCache.addItem(musicFile, stat, *songTags)
+        yield musicFile, songTags, stat
+
+
+def _scanWorker(musicFile, tag):
+    """  Runs readSongTags in a worker process, the key is built by the main process.
+         Exceptions are returned has a string, the main process does the logging.
+    """
+    try:
+        return readSongTags(tag, musicFile, workerLogger), None
+    except Exception as e:
+        return None, str(e)
@@ -19,24 +19,29 @@
 ###############################################################################################################
 
 import os
-import shutil
 
 from send2trash import send2trash
 
 import src.Timer as myTimer
+import src.Walker as Walker
 import src.utils.duplicateUtils as duplicateUtils
 
 timer = myTimer.Timer()
 
 ############################################################################################## removeEmptyDir( #######
-def removeUnwanted(sourceDir, duplicateFile, emptyDir, zap, recycle, logger):
+def removeUnwanted(sourceDir, duplicateFile, emptyDir, zap, recycle, logger, walker=None):
     """ Scan and delete empty directories and zap Non Music files.
         Will remove empty dirs if emptyDir is true, set in config file.
         Will remove non music files if zap is true, set at command line.
         will use rec bin if recycle is true.
+        duplicateFile can be the path of the duplicate file or the Report of the run.
 
-        NB : Cannot use fileList, need to look at dirs and all files not just .mp3 files.
-             Therefore need to scan file system again.
+        walker is the Walker that found the songs, it has already sorted every entry in the file system
+        into songs, non music files and directories - so there is no need to scan the file system again.
+        If walker is None [or has not finished], the file system is walked here.
+
+        Directories that are empty once the non music files are zapped are also removed.  A non music file only
+        counts has removed once its zap has worked, and each directory is checked again has it is removed.
     """
 
     timeDir = myTimer.Timer()
@@ -49,24 +54,27 @@ def removeUnwanted(sourceDir, duplicateFile, emptyDir, zap, recycle, logger):
     print("\nRunning Empty Directory Check and zap Non Music files.\n")
     logger.info("Running Empty Directory Check and zap Non Music files.")
 
-    for musicFile in sourceDir.glob("**/*"):
-        if emptyDir and musicFile.is_dir():
-            if not len(os.listdir(musicFile)):
-                noOfDirs += 1
-                duplicateUtils.logTextLine("-" * 70 + "Empty Directory Deleted" + "-" * 40, duplicateFile)
-                duplicateUtils.logTextLine(f"{musicFile}", duplicateFile)
-                zapEmptyDir(musicFile, recycle, logger)
-
-        if zap and musicFile.is_file():
-            if musicFile.suffix != ".mp3":                  # A non music file found.
-                if musicFile.suffix == ".pickle":
-                    continue  # Ignore database if stored in target directory.
-                if musicFile.suffix == ".json"  :
-                    continue  # Ignore database if stored in target directory.
-                duplicateUtils.logTextLine("-" * 80 + "Non Music File Found" + "-" * 40, duplicateFile)
+    if walker is None or not walker.complete:
+        walker = Walker.Walker(sourceDir)
+        for _ in walker.songs():
+            pass
+
+    if zap:
+        for musicFile in walker.nonMusic:           # A non music file found.
+            duplicateUtils.logTextLine("-" * 80 + "Non Music File Found" + "-" * 40, duplicateFile)
+            if zapFile(musicFile, recycle, logger):
                 duplicateUtils.logTextLine(f"{musicFile} is not a music file and has been deleted.", duplicateFile)
-                zapFile(musicFile, recycle, logger)
+                walker.fileRemoved(musicFile)
                 nonMusic += 1
+            else:
+                duplicateUtils.logTextLine(f"{musicFile} is not a music file, but could not be deleted.", duplicateFile)
+
+    if emptyDir:
+        for musicDir in walker.emptyDirs():
+            if zapEmptyDir(musicDir, recycle, logger):
+                noOfDirs += 1
+                duplicateUtils.logTextLine("-" * 70 + "Empty Directory Deleted" + "-" * 40, duplicateFile)
+                duplicateUtils.logTextLine(f"{musicDir}", duplicateFile)
 
     if nonMusic != 0:
         message += f" Removed {nonMusic} non music files."
@@ -81,20 +89,33 @@ def removeUnwanted(sourceDir, duplicateFile, emptyDir, zap, recycle, logger):
         logger.info(message)
 
 ################################################################################################## zapEmptyDir ######
-def zapEmptyDir(musicFile, recycle, logger):
-    """ Zap [delete] any empty dir."""
+def zapEmptyDir(musicDir, recycle, logger):
+    """ Zap [delete] an empty dir, and the empty dirs below it.
+        The walk may have been some time ago, so the dir is checked again has it is removed - if a file has
+        landed since, it is left alone.
+        Returns True if the dir has been removed.
+    """
 
     try:
         if recycle:
-            send2trash(str(musicFile))  # Move to recycle bin.
+            if any(files for _, _, files in os.walk(musicDir)):
+                logger.warning(f"Directory is no longer empty, not deleted : {musicDir}")
+                return False
+            send2trash(str(musicDir))  # Move to recycle bin.
         else:
-            shutil.rmtree(musicFile, ignore_errors=True, onerror=None)  # Permanently remove directory
+            for directory, _, _ in os.walk(musicDir, topdown=False):
+                os.rmdir(directory)     # Permanently remove directory, refuses if it is not empty.
     except OSError:
-        logger.error(f"ERROR : Can't delete Directory : {musicFile}")
+        logger.error(f"ERROR : Can't delete Directory : {musicDir}")
+        return False
+
+    return True
 
 ############################################################################################## zapNoneMusicFile ######
 def zapFile(musicFile, recycle, logger):
-    """ Zap [delete] any none music file."""
+    """ Zap [delete] any none music file.
+        Returns True if the file has been removed.
+    """
 
     try:
         if recycle:
@@ -103,3 +124,6 @@ def zapFile(musicFile, recycle, logger):
             os.remove(musicFile)
     except OSError:
         logger.error(f"ERROR : Can't delete file : {musicFile}")
+        return False
+
+    return True
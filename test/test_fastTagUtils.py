@@ -0,0 +1,123 @@
+###############################################################################################################
+#    test_fastTagUtils.py   Copyright (C) <2025>  <Kevin Scott>                                               #
+#                                                                                                             #
+#    test for functions in fastTagUtils.py                                                                    #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import struct
+
+import pytest
+from tinytag import TinyTag
+
+import src.Exceptions as myExceptions
+import src.utils.fastTagUtils as fastTagUtils
+
+#  A small corpus of synthetic songs, each read by fastTagUtils and checked against tinytag.
+#  tinytag starts looking for the first frame 10 bytes before the end of the tag, so a utf-16 BOM there
+#  looks like a frame to it - the utf-16 songs are padded to keep clear of that.
+
+MPEG1 = b"\xff\xfb\x90\x64"             #  MPEG1 layer 3, 128kbps, 44.1kHz, joint stereo - 417 bytes a frame.
+MONO  = b"\xff\xfb\x90\xc4"             #  The same in mono.
+MPEG2 = b"\xff\xf3\x80\x64"             #  MPEG2 layer 3, 64kbps, 22.05kHz - 208 bytes a frame.
+
+
+def syncSafe(size):
+    return bytes((size >> shift) & 0x7f for shift in (21, 14, 7, 0))
+
+def textFrame(major, frameId, value, encoding=0):
+    codec = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}[encoding]
+    data  = bytes([encoding]) + value.encode(codec)
+    if major == 2:
+        return frameId.encode() + len(data).to_bytes(3, "big") + data
+    size = syncSafe(len(data)) if major == 4 else struct.pack(">I", len(data))
+    return frameId.encode() + size + b"\0\0" + data
+
+def id3v2(major, frames, padding=0, flags=0):
+    body = b"".join(frames) + b"\0" * padding
+    return b"ID3" + bytes([major, 0, flags]) + syncSafe(len(body)) + body
+
+def id3v1(artist, title):
+    return b"TAG" + title.encode("latin-1").ljust(30, b"\0") + artist.encode("latin-1").ljust(30, b"\0") + b"\0" * 65
+
+def frames(header, count, length):
+    return (header + b"\0" * (length - 4)) * count
+
+def xingFrame(header, length, count, offset=32):
+    frame = header + b"\0" * offset + b"Xing" + struct.pack(">III", 3, count, count * length)
+    return frame + b"\0" * (length - len(frame))
+
+def vbriFrame(header, length, count):
+    frame = header + b"\0" * 32 + b"VBRI" + struct.pack(">HHHII", 1, 0, 0, count * length, count)
+    return frame + b"\0" * (length - len(frame))
+
+def apic(size):
+    data = b"\0image/jpeg\0\3\0" + b"\xff" * size
+    return b"APIC" + struct.pack(">I", len(data)) + b"\0\0" + data
+
+
+CORPUS = {
+    "v23_latin1"  : lambda: id3v2(3, [textFrame(3, "TPE1", "The Shadows"), textFrame(3, "TIT2", "Apache")], 100) + frames(MPEG1, 1000, 417),
+    "v24_utf8"    : lambda: id3v2(4, [textFrame(4, "TIT2", "Café del Mar", 3), textFrame(4, "TPE1", "Energy 52", 3)]) + frames(MPEG1, 500, 417),
+    "v23_utf16"   : lambda: id3v2(3, [textFrame(3, "TPE1", "Björk", 1), textFrame(3, "TIT2", "Jóga", 1)], 20) + frames(MPEG1, 300, 417),
+    "v24_utf16be" : lambda: id3v2(4, [textFrame(4, "TPE1", "Sigur Rós", 2), textFrame(4, "TIT2", "Hoppípolla", 2)]) + frames(MPEG1, 300, 417),
+    "v22"         : lambda: id3v2(2, [textFrame(2, "TP1", "Sweet"), textFrame(2, "TT2", "Blockbuster")]) + frames(MPEG1, 800, 417),
+    "two_values"  : lambda: id3v2(3, [textFrame(3, "TPE1", "Simon\0Garfunkel"), textFrame(3, "TIT2", "The Boxer")]) + frames(MPEG1, 200, 417),
+    "id3v1_only"  : lambda: frames(MPEG1, 600, 417) + id3v1("Led Zeppelin", "Rock and Roll"),
+    "v1_and_v2"   : lambda: id3v2(3, [textFrame(3, "TIT2", "Apache")]) + frames(MPEG1, 600, 417) + id3v1("Shadows", "Old Title"),
+    "no_tags"     : lambda: frames(MPEG1, 400, 417),
+    "big_picture" : lambda: id3v2(3, [textFrame(3, "TPE1", "Queen"), apic(20000), textFrame(3, "TIT2", "Innuendo")]) + frames(MPEG1, 400, 417),
+    "mono"        : lambda: id3v2(3, [textFrame(3, "TPE1", "Elvis"), textFrame(3, "TIT2", "Hound Dog")]) + frames(MONO, 700, 417),
+    "xing"        : lambda: id3v2(3, [textFrame(3, "TPE1", "Moby"), textFrame(3, "TIT2", "Porcelain")]) + xingFrame(MPEG1, 417, 2000),
+    "xing_mono"   : lambda: id3v2(3, [textFrame(3, "TPE1", "Moby"), textFrame(3, "TIT2", "Natural")]) + xingFrame(MONO, 417, 900, 17),
+    "mpeg2_xing"  : lambda: id3v2(3, [textFrame(3, "TPE1", "Air"), textFrame(3, "TIT2", "Sexy Boy")]) + xingFrame(MPEG2, 208, 3000, 17),
+    "mpeg2_cbr"   : lambda: id3v2(3, [textFrame(3, "TPE1", "Air"), textFrame(3, "TIT2", "Kelly")]) + frames(MPEG2, 1500, 208),
+    "garbage"     : lambda: id3v2(3, [textFrame(3, "TPE1", "Blur"), textFrame(3, "TIT2", "Song 2")]) + b"\0\xff\0" * 50 + frames(MPEG1, 300, 417),
+}
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_readFast_matches_tinytag(name, tmp_path):
+    song = tmp_path / f"{name}.mp3"
+    song.write_bytes(CORPUS[name]())
+
+    artist, title, duration = fastTagUtils.readFast(str(song))
+    tags = TinyTag.get(str(song))
+
+    assert (artist, title) == (tags.artist, tags.title)
+    assert duration == pytest.approx(tags.duration, rel=0.005)
+
+def test_readFast_vbri(tmp_path):
+    #  tinytag does not read VBRI headers, it counts the frames - so they are written to agree.
+    song = tmp_path / "vbri.mp3"
+    song.write_bytes(id3v2(3, [textFrame(3, "TPE1", "Fraunhofer")]) + vbriFrame(MPEG1, 417, 1000) + frames(MPEG1, 999, 417))
+    assert fastTagUtils.readFast(str(song))[2] == pytest.approx(1000 * 1152 / 44100)
+    assert fastTagUtils.readFast(str(song))[2] == pytest.approx(TinyTag.get(str(song)).duration, rel=0.005)
+
+def test_readFast_not_handled(tmp_path):
+    song = tmp_path / "unsync.mp3"
+    song.write_bytes(id3v2(3, [textFrame(3, "TPE1", "Shadows")], flags=0x80) + frames(MPEG1, 100, 417))
+    with pytest.raises(myExceptions.FastTagError):
+        fastTagUtils.readFast(str(song))
+
+    song.write_bytes(b"\0" * 100000)
+    with pytest.raises(myExceptions.FastTagError):
+        fastTagUtils.readFast(str(song))
+
+def test_readFast_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        fastTagUtils.readFast(str(tmp_path / "missing.mp3"))
@@ -0,0 +1,88 @@
+###############################################################################################################
+#    test_fingerprintIndex.py Copyright (C) <2025>  <Kevin Scott>                                             #
+#                                                                                                             #
+#    test for the class in FingerprintIndex.py                                                                #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import random
+from array import array
+
+import src.FingerprintIndex as FingerprintIndex
+
+
+def makePrint(values):
+    return array("I", values).tobytes()
+
+
+def randomValues(seed, frames=200):
+    rnd = random.Random(seed)
+    return [rnd.getrandbits(32) for _ in range(frames)]
+
+
+def flipBits(values, rate, seed):
+    """  Returns values with about rate of the bits flipped, has a re-encode would.  """
+    rnd = random.Random(seed)
+    return [value ^ sum(1 << bit for bit in range(32) if rnd.random() < rate) for value in values]
+
+
+def test_search():
+    index = FingerprintIndex.FingerprintIndex(0.35)
+    for seed in range(20):
+        index.add(f"song{seed}", makePrint(randomValues(seed)))
+
+    assert len(index) == 20
+    assert index.search(makePrint(randomValues(7))) == [("song7", 0.0)]
+    assert index.search(makePrint(randomValues(99))) == []
+
+    noisy = index.search(makePrint(flipBits(randomValues(3), 0.1, 1)))
+    assert [item for item, _ in noisy] == ["song3"]
+    assert 0.05 < noisy[0][1] < 0.15
+
+
+def test_search_offset():
+    index = FingerprintIndex.FingerprintIndex(0.35)
+    index.add("song", makePrint(randomValues(1)))
+
+    assert index.search(makePrint(randomValues(1)[10:])) == [("song", 0.0)]     #  Starts ten frames later.
+    assert index.search(makePrint([0] * 10 + randomValues(1))) == [("song", 0.0)]
+
+
+def test_remove_rename():
+    index = FingerprintIndex.FingerprintIndex(0.35)
+    for seed in range(3):
+        index.add(f"song{seed}", makePrint(randomValues(seed)))
+
+    assert index.remove("song1") is True
+    assert index.remove("song1") is False
+    assert index.search(makePrint(randomValues(1))) == []
+    assert len(index) == 2
+
+    assert index.rename("song2", "moved2") is True
+    assert index.search(makePrint(randomValues(2))) == [("moved2", 0.0)]
+
+    index.add("song0", makePrint(randomValues(5)))                              #  Changed, the old fingerprint is gone.
+    assert index.search(makePrint(randomValues(0))) == []
+    assert index.search(makePrint(randomValues(5))) == [("song0", 0.0)]
+    assert len(index) == 2
+
+
+def test_bitErrorRate():
+    values = randomValues(1)
+    assert FingerprintIndex.FingerprintIndex.bitErrorRate(values, values) == 0.0
+    assert FingerprintIndex.FingerprintIndex.bitErrorRate(values, [value ^ 0xFFFFFFFF for value in values]) == 1.0
+    assert FingerprintIndex.FingerprintIndex.bitErrorRate(values[:10], values[:10]) == 1.0      #  Too short to tell.
@@ -0,0 +1,119 @@
+###############################################################################################################
+#    test_fingerprintUtils.py Copyright (C) <2025>  <Kevin Scott>                                             #
+#                                                                                                             #
+#    test for functions in fingerprintUtils.py                                                                #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import math
+import logging
+import random
+from array import array
+
+import pytest
+
+import src.TagCache as TagCache
+import src.Exceptions as myExceptions
+import src.utils.fingerprintUtils as fingerprintUtils
+import src.FingerprintIndex as FingerprintIndex
+
+
+def makeSignal(seed, seconds=10, noise=0.0, gain=1.0):
+    """  Returns the samples of a made up song, a dozen tones each with its own slowly changing loudness.  """
+    rnd       = random.Random(seed)
+    noiseRnd  = random.Random(seed + 1000)
+    freqs     = [320 * (2000 / 320) ** (tone / 12) for tone in range(12)]
+    steps     = seconds * 10 + 2
+    envelopes = [[rnd.random() for _ in range(steps)] for _ in freqs]
+    samples   = array("h")
+    for n in range(seconds * fingerprintUtils.SAMPLE_RATE):
+        t     = n / fingerprintUtils.SAMPLE_RATE
+        step  = int(t * 10)
+        part  = t * 10 - step
+        value = sum(2500 * (envelope[step] * (1 - part) + envelope[step + 1] * part) * math.sin(2 * math.pi * freq * t)
+                    for freq, envelope in zip(freqs, envelopes, strict=True))
+        samples.append(int(max(-32767, min(32767, gain * value + noiseRnd.gauss(0, noise)))))
+    return samples
+
+
+def errorRate(first, second):
+    return FingerprintIndex.FingerprintIndex.bitErrorRate(fingerprintUtils.unpack(first), fingerprintUtils.unpack(second))
+
+
+@pytest.mark.parametrize("artist, title, needed", [("", "", True), ("Shadows", "", True), ("", "Apache", True),
+                                                   ("Unknown Artist", "Apache", True), ("Shadows", "Track 01", True),
+                                                   ("Shadows", "07", True), ("Shadows", "Apache", False),
+                                                   ("Unknown Pleasures", "Track Of Time", False),
+                                                   ("Shadows", "03 - Track 3", True), ("Prince", "1999", False),
+                                                   ("Shadows", "7", False), ("Blur", "13", False)])
+def test_needsFingerprint(artist, title, needed):
+    assert fingerprintUtils.needsFingerprint(artist, title) == needed
+
+
+def test_fingerprint():
+    song = fingerprintUtils.fingerprint(makeSignal(1))
+
+    assert len(song) % 4 == 0
+    assert fingerprintUtils.fingerprint(makeSignal(1)) == song
+    assert errorRate(song, fingerprintUtils.fingerprint(makeSignal(1, noise=1500, gain=0.7))) < 0.25     #  Same song, louder noise.
+    assert errorRate(song, fingerprintUtils.fingerprint(makeSignal(2))) > 0.4                            #  A different song.
+
+
+def test_fingerprint_short():
+    with pytest.raises(myExceptions.FingerprintError):
+        fingerprintUtils.fingerprint(array("h", [0] * fingerprintUtils.FRAME))
+
+
+@pytest.mark.skipif(fingerprintUtils.numpy is None, reason="numpy not installed")
+def test_fingerprint_numpy(monkeypatch):
+    samples = makeSignal(3)
+    song    = fingerprintUtils.fingerprint(samples)
+    monkeypatch.setattr(fingerprintUtils, "numpy", None)
+    assert errorRate(song, fingerprintUtils.fingerprint(samples)) < 0.01
+
+
+def test_decode_no_ffmpeg(monkeypatch, tmp_path):
+    monkeypatch.setattr(fingerprintUtils, "FFMPEG", "no-such-ffmpeg")
+    with pytest.raises(myExceptions.FingerprintError):
+        fingerprintUtils.decode(tmp_path / "song.mp3", 10)
+
+
+def test_fingerprintSongs_cache(monkeypatch, tmp_path, caplog):
+    decoded = []
+
+    def fakeFingerprint(musicFile, seconds):
+        decoded.append(musicFile)
+        if musicFile.endswith("bad.mp3"):
+            raise myExceptions.FingerprintError("can't decode")
+        return musicFile.encode()
+
+    monkeypatch.setattr(fingerprintUtils, "makeFingerprint", fakeFingerprint)
+    songs = []
+    for name in ("one.mp3", "bad.mp3", "two.mp3"):
+        (tmp_path / name).write_bytes(b"mp3")
+        songs.append(str(tmp_path / name))
+
+    cache  = TagCache.FingerprintCache(tmp_path / "cache.pickle", 10)
+    logger = logging.getLogger("test")
+    assert list(fingerprintUtils.fingerprintSongs(songs, 10, logger, cache)) == [(songs[0], songs[0].encode()), (songs[1], None),
+                                                                                (songs[2], songs[2].encode())]
+    assert "Can't fingerprint" in caplog.text
+
+    decoded.clear()
+    assert list(fingerprintUtils.fingerprintSongs(songs, 10, logger, cache)) == [(songs[0], songs[0].encode()), (songs[1], None),
+                                                                                (songs[2], songs[2].encode())]
+    assert decoded == [songs[1]]                        #  Only the song that failed is decoded again.
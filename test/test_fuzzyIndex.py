@@ -0,0 +1,70 @@
+###############################################################################################################
+#    test_fuzzyIndex.pyCopyright (C) <2025>  <Kevin Scott>                                                     #
+#                                                                                                             #
+#    test for the class in FuzzyIndex.py                                                                      #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import random
+
+import pytest
+
+import src.FuzzyIndex as FuzzyIndex
+
+
+@pytest.mark.parametrize("first, second, distance", [("", "", 0), ("abc", "", 3), ("", "abc", 3), ("sweet", "sweet", 0),
+                                                     ("zeppelin", "zepelin", 1), ("kitten", "sitting", 3), ("abc", "cab", 2)])
+def test_levenshtein(first, second, distance):
+    assert FuzzyIndex.levenshtein(first, second) == distance
+    assert FuzzyIndex.levenshtein(second, first) == distance
+
+
+def test_levenshtein_limit():
+    assert FuzzyIndex.levenshtein("kitten", "sitting", 1) == 2
+    assert FuzzyIndex.levenshtein("kitten", "sitting", 3) == 3
+
+
+def test_search():
+    index = FuzzyIndex.FuzzyIndex(["Led Zeppelin:Whole Lotta Love", "Sweet:Ballroom Blitz", "Slade:Cum On Feel The Noize"], 2)
+
+    assert len(index) == 3
+    assert index.search("led zepelin:whole lotta love") == [("Led Zeppelin:Whole Lotta Love", 1)]
+    assert index.search("Led Zeppelin:Whole Lotta Love") == []          #  A key is not near itself.
+    assert index.search("Sweet:Fox On The Run") == []
+
+
+def test_add():
+    index = FuzzyIndex.FuzzyIndex(distance=1)
+    index.add("Sweet:Ballroom Blitz")
+    index.add("Sweet:Ballroom Blitz")
+    index.add("sweet:ballroom blitz")
+
+    assert len(index) == 2
+    assert index.search("Sweet:Ballroom Blits") == [("Sweet:Ballroom Blitz", 1), ("sweet:ballroom blitz", 1)]
+
+
+def test_search_brute_force():
+    rnd     = random.Random(18)
+    letters = "abcdef :"
+    keys    = ["".join(rnd.choice(letters) for _ in range(rnd.randint(1, 12))) for _ in range(400)]
+    index   = FuzzyIndex.FuzzyIndex(keys, 2)
+
+    for _ in range(200):
+        key      = "".join(rnd.choice(letters) for _ in range(rnd.randint(1, 12)))
+        expected = sorted((other, FuzzyIndex.levenshtein(key, other)) for other in set(keys)
+                          if other != key and FuzzyIndex.levenshtein(key, other) <= 2)
+        assert sorted(index.search(key)) == expected
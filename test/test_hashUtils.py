@@ -0,0 +1,96 @@
+###############################################################################################################
+#    test_hashUtils.py Copyright (C) <2025>  <Kevin Scott>                                                    #
+#                                                                                                             #
+#    test for functions in hashUtils.py                                                                       #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import logging
+
+import src.utils.hashUtils as hashUtils
+
+logger = logging.getLogger("test")
+
+BIG = 3 * hashUtils.PARTIAL_SIZE
+
+
+def makeSong(path, size, change=None):
+    """  Writes a song of size bytes, the byte at change [if given] is altered.  """
+    data = bytearray(i % 251 for i in range(size))
+    if change is not None:
+        data[change] ^= 0xFF
+    path.write_bytes(data)
+    return str(path)
+
+
+def sizes(*paths):
+    return [(path, os.path.getsize(path)) for path in paths]
+
+
+def test_findIdentical(tmp_path):
+    one    = makeSong(tmp_path / "one.mp3", BIG)
+    copy   = makeSong(tmp_path / "copy.mp3", BIG)
+    middle = makeSong(tmp_path / "middle.mp3", BIG, BIG // 2)          #  Only the full hash tells these apart.
+    end    = makeSong(tmp_path / "end.mp3", BIG, BIG - 1)
+    other  = makeSong(tmp_path / "other.mp3", BIG + 1)
+
+    assert hashUtils.findIdentical(sizes(one, middle, copy, end, other), 4, logger) == [[one, copy]]
+
+
+def test_findIdentical_small(tmp_path):
+    one  = makeSong(tmp_path / "one.mp3", 1000)
+    copy = makeSong(tmp_path / "copy.mp3", 1000)
+    diff = makeSong(tmp_path / "diff.mp3", 1000, 500)
+    none = [makeSong(tmp_path / f"empty{n}.mp3", 0) for n in range(2)]   #  Empty files are not songs.
+
+    assert hashUtils.findIdentical(sizes(one, copy, diff, *none), 2, logger) == [[one, copy]]
+
+
+def test_findIdentical_missing(tmp_path, caplog):
+    one  = makeSong(tmp_path / "one.mp3", 1000)
+    copy = makeSong(tmp_path / "copy.mp3", 1000)
+    gone = str(tmp_path / "gone.mp3")
+
+    assert hashUtils.findIdentical(sizes(one, copy) + [(gone, 1000)], 2, logger) == [[one, copy]]
+    assert "Can't hash" in caplog.text
+
+
+def test_findIdentical_kept(tmp_path):
+    one  = makeSong(tmp_path / "one.mp3", 1000)
+    copy = makeSong(tmp_path / "copy.mp3", 1000)
+    kept = makeSong(tmp_path / "kept.mp3", 1000)                        #  The library's copy, never the one zapped.
+
+    assert hashUtils.findIdentical(sizes(one, copy, kept), 2, logger, {kept}) == [[kept, one, copy]]
+
+
+def test_partialHash(tmp_path):
+    one    = makeSong(tmp_path / "one.mp3", BIG)
+    middle = makeSong(tmp_path / "middle.mp3", BIG, BIG // 2)
+
+    assert hashUtils.partialHash(one, BIG) == hashUtils.partialHash(middle, BIG)
+    assert hashUtils.fullHash(one) != hashUtils.fullHash(middle)
+
+
+def test_songSizes(tmp_path):
+    one  = makeSong(tmp_path / "one.mp3", 10)
+    gone = str(tmp_path / "gone.mp3")
+    with os.scandir(tmp_path) as entries:
+        entries = list(entries)
+
+    assert list(hashUtils.songSizes(entries)) == [(one, 10)]
+    assert list(hashUtils.songSizes([one, gone], 2)) == [(one, 10)]
@@ -0,0 +1,73 @@
+###############################################################################################################
+#    test_keyUtils.py Copyright (C) <2025>  <Kevin Scott>                                                     #
+#                                                                                                             #
+#    test for functions in keyUtils.py                                                                        #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import random
+
+import pytest
+from libindic.soundex import Soundex
+
+import src.utils.keyUtils as keyUtils
+
+phonetic = Soundex()
+
+NAMES = [("Shadows", "Apache"), ("", "Apache"), ("Sweet", ""), ("", ""), ("Led Zeppelin", "Rock and Roll"),
+         ("ABBA", "Bbq"), ("Ab", "bc"), ("Björk", "Jóga"), ("मेरा", "गीत"), ("1", "2"), ("Bob", "Bob"), ("Shadows", "FBI")]
+
+def randomNames(count, seed=1):
+    rnd      = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCXYZ :'-1éमेराগীতਗਾണ"
+
+    def word():
+        return "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 8)))
+
+    return [(word(), word()) for _ in range(count)]
+
+
+@pytest.mark.parametrize("artist, title", NAMES)
+def test_soundexKey_matches_libindic(artist, title):
+    assert keyUtils.soundexKey(artist, title) == phonetic.soundex(f"{artist}:{title}")
+
+def test_soundexKey_random():
+    for artist, title in randomNames(5000):
+        assert keyUtils.soundexKey(artist, title) == phonetic.soundex(f"{artist}:{title}"), (artist, title)
+
+def test_makeKey():
+    assert keyUtils.makeKey("Shadows", "Apache", False) == "Shadows:Apache"
+    assert keyUtils.makeKey("Shadows", "Apache", True) == phonetic.soundex("Shadows:Apache")
+
+def test_normalise_cached():
+    keyUtils.normaliseArtist.cache_clear()
+    for _ in range(3):
+        assert keyUtils.normaliseArtist("The Shadows") == "Shadows"
+    assert keyUtils.normaliseArtist.cache_info().hits == 2
+    assert any(line.startswith("Artist normalise cache :: 2 hits") for line in keyUtils.cacheStats())
+
+def test_soundexBatch_matches_libindic():
+    names = [f"{artist}:{title}" for artist, title in NAMES + randomNames(5000, seed=2)]
+    names.append("Line\nFeed:Title")
+    assert keyUtils.soundexBatch(names) == [phonetic.soundex(name) for name in names]
+    assert keyUtils.soundexBatch(["Line\nFeed:Title"]) == [phonetic.soundex("Line\nFeed:Title")]     #  Nothing left to batch.
+    assert keyUtils.soundexBatch([]) == []
+
+def test_makeKeys():
+    assert keyUtils.makeKeys(NAMES, True) == [keyUtils.makeKey(artist, title, True) for artist, title in NAMES]
+    assert keyUtils.makeKeys(NAMES, False) == [f"{artist}:{title}" for artist, title in NAMES]
+    assert keyUtils.makeKeys([], True) == []
@@ -18,6 +18,7 @@
 #                                                                                                             #
 ###############################################################################################################
 
+import pickle
 import pytest
 import src.Library as Library
 import src.Exceptions as Exceptions
@@ -26,103 +27,194 @@ import src.Exceptions as Exceptions
 @pytest.fixture
 def db_library(tmp_path):
     """  Set up the pickle database.  """
-    db = tmp_path / "testLibrary.pickle"
-    return Library.Library(db, "pickle")
+    db = Library.Library()
+    db.set_DBpath(tmp_path / "testLibrary.pickle")
+    db.set_DBformat("pickle")
+    return db
 
 @pytest.fixture
 def ja_library(tmp_path):
     """  Set up the jason database.  """
-    db = tmp_path / "testLibrary.jason"
-    return Library.Library(db, "jason")
+    db = Library.Library()
+    db.set_DBpath(tmp_path / "testLibrary.json")
+    db.set_DBformat("json")
+    return db
+
+@pytest.fixture
+def sq_library(tmp_path):
+    """  Set up the sqlite database.  """
+    db = Library.Library()
+    db.set_DBpath(tmp_path / "testLibrary.sqlite")
+    db.set_DBformat("sqlite")
+    return db
+
+def reopen(library):
+    """  Returns a new library, loaded from the same database.  """
+    db = Library.Library()
+    db.set_DBpath(library.filename)
+    db.set_DBformat(library.format)
+    db.load()
+    return db
 
 #-----------------------------------------------------------------  test add to library ------------------------
 def test_library_pickle_add(db_library):
-    db_library.addItem("one", "data1", "data2", "date3")
+    db_library.addItem("one", "data1", 2.0)
     assert db_library.noOfItems == 1
 
 def test_library_jason_add(ja_library):
-    ja_library.addItem("one", "data1", "data2", "date3")
+    ja_library.addItem("one", "data1", 2.0)
     assert ja_library.noOfItems == 1
 
 #---------------------------------------------------------------  test library get --------------------------
 def test_library_pickle_get(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
-    r1, r2, r3 = db_library.getItem("one")
+    db_library.addItem("one", "data1", 2.0)
+    r1, r2 = db_library.getItem("one")
     assert r1 == "data1"
-    assert r2 == "data2"
-    assert r3 == "data3"
+    assert r2 == 2.0
 
 def test_library_pickle_get_fail(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
     with pytest.raises(Exceptions.LibraryError) as execInfo:
-        r1, r2, r3 = db_library.getItem("two")
+        r1, r2 = db_library.getItem("two")
     assert str(execInfo.value) == "LibraryError has been raised"
 
 def test_library_jason_get(ja_library):
-    ja_library.addItem("one", "data1", "data2", "data3")
-    r1, r2, r3 = ja_library.getItem("one")
+    ja_library.addItem("one", "data1", 2.0)
+    r1, r2 = ja_library.getItem("one")
     assert r1 == "data1"
-    assert r2 == "data2"
-    assert r3 == "data3"
+    assert r2 == 2.0
 
 def test_library_jason_get_fail(ja_library):
-    ja_library.addItem("one", "data1", "data2", "data3")
+    ja_library.addItem("one", "data1", 2.0)
     with pytest.raises(Exceptions.LibraryError) as execInfo:
-        r1, r2, r3 = ja_library.getItem("two")
+        r1, r2 = ja_library.getItem("two")
     assert str(execInfo.value) == "LibraryError has been raised"
 
 #-----------------------------------------------------------------  test library has --------------------------
 def test_library_pickle_has(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
     assert db_library.hasKey("one") is True
 
 def test_library_pickle_has_fail(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
     assert db_library.hasKey("two") is False
 
 def test_library_jason_has(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
     assert db_library.hasKey("one") is True
 
 def test_library_jason_has_fail(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
     assert db_library.hasKey("two") is False
 
 #-----------------------------------------------------------------  test delete from library -------------------
 
 def test_library_pickle_del(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
-    db_library.addItem("two", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
+    db_library.addItem("two", "data1", 2.0)
     assert db_library.noOfItems == 2
     db_library.delItem("one")
     assert db_library.noOfItems == 1
 
 def test_library_pickle_del_fail(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
     with pytest.raises(Exceptions.LibraryError) as execInfo:
         db_library.delItem("two")
     assert str(execInfo.value) == "LibraryError has been raised"
 
 def test_library_jason_del(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
-    db_library.addItem("two", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
+    db_library.addItem("two", "data1", 2.0)
     assert db_library.noOfItems == 2
     db_library.delItem("one")
     assert db_library.noOfItems == 1
 
 def test_library_jason_del_fail(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
     with pytest.raises(Exceptions.LibraryError) as execInfo:
         db_library.delItem("two")
     assert str(execInfo.value) == "LibraryError has been raised"
 
+#-----------------------------------------------------------------  test buckets ------------------------------
+def test_library_bucket_keeps_all(db_library):
+    db_library.addItem("one", "song1", 100.0)
+    db_library.addItem("one", "song2", 200.0)
+    db_library.addItem("one", "song1", 101.0)
+    assert db_library.noOfItems == 2
+    assert db_library.getItems("one") == [("song1", 101.0), ("song2", 200.0)]
+
+def test_library_bucket_matches(db_library):
+    db_library.addItem("one", "song1", 100.0)
+    db_library.addItem("one", "song2", 200.0)
+    db_library.addItem("one", "song3", 200.4)
+    assert db_library.findMatches("one", 200.2, 0.5) == [("song2", 200.0), ("song3", 200.4)]
+    assert db_library.findMatches("one", 200.2, 0.5, "song2") == [("song3", 200.4)]
+    assert db_library.findMatches("one", 150.0, 0.5) == []
+    assert db_library.findMatches("two", 150.0, 0.5) == []
+
+def test_library_bucket_sorted(db_library):
+    for n, duration in enumerate([300.0, 100.0, 200.0, 100.5, 250.0]):
+        db_library.addItem("one", f"song{n}", duration)
+    assert [duration for path, duration in db_library.getItems("one")] == [100.0, 100.5, 200.0, 250.0, 300.0]
+    assert db_library.findMatches("one", 100.25, 0.25) == [("song1", 100.0), ("song3", 100.5)]
+    assert db_library.findMatches("one", 99.7, 0.3) == [("song1", 100.0)]
+
+def test_library_bucket_matches_edge(db_library):
+    db_library.addItem("one", "song1", 199.7)
+    db_library.addItem("one", "song2", 200.7)
+    assert db_library.findMatches("one", 200.2, 0.5) == [(p, d) for p, d in [("song1", 199.7), ("song2", 200.7)] if abs(200.2 - d) <= 0.5]
+
+def test_library_bucket_has_song(db_library):
+    db_library.addItem("one", "song1", 100.0)
+    assert db_library.hasSong("one", "song1") is True
+    assert db_library.hasSong("one", "song2") is False
+    assert db_library.hasSong("two", "song1") is False
+
+def test_library_bucket_del(db_library):
+    db_library.addItem("one", "song1", 100.0)
+    db_library.addItem("one", "song2", 200.0)
+    db_library.delItem("one", "song1")
+    assert db_library.getItems("one") == [("song2", 200.0)]
+    db_library.delItem("one", "song2")
+    assert db_library.hasKey("one") is False
+
+def test_library_bucket_same_duration(db_library):
+    for n in range(5):
+        db_library.addItem(":", f"song{n}", 100.0)              #  A hot key, i.e. songs without tags.
+    db_library.addItem(":", "song2", 150.0)
+    db_library.moveItem(":", "song3", "song9")
+    db_library.delItem(":", "song0")
+    assert db_library.getItems(":") == [("song1", 100.0), ("song9", 100.0), ("song4", 100.0), ("song2", 150.0)]
+    assert db_library.hasSong(":", "song3") is False
+
+def test_library_bucket_fromSongs():
+    bucket = Library.Bucket.fromSongs([("song1", 200.0, None, None, None), ("song2", 100.0, ("a", "t"), None, None),
+                                       ("song1", 50.0, None, None, (1, 2))])
+    assert list(bucket) == [("song1", 50.0), ("song2", 100.0)]
+    assert bucket.signatureOf("song1") == (1, 2)
+    assert bucket.tagsOf("song2") == ("a", "t")
+    assert "song3" not in bucket
+
+def test_library_old_format(db_library):
+    db_library.fromSaved({"one": ["song1", 100.0], "two": [["song2", 200.0], ["song3", 300.0]]})
+    assert db_library.getItems("one") == [("song1", 100.0)]
+    assert db_library.getItems("two") == [("song2", 200.0), ("song3", 300.0)]
+
+@pytest.fixture
+def co_library(tmp_path):
+    """  Set up the columnar database.  """
+    db = Library.Library()
+    db.set_DBpath(tmp_path / "testLibrary.columnar")
+    db.set_DBformat("columnar")
+    return db
+
 #-----------------------------------------------------------------  test save/load of a pickle library ---------
 def test_library_pickle(db_library):
-    db_library.addItem("one", "data1", "data2", "data3")
-    db_library.addItem("two", "data1", "data2", "data3")
-    db_library.addItem("three", "data1", "data2", "data3")
-    db_library.addItem("four", "data1", "data2", "data3")
-    db_library.addItem("five", "data1", "data2", "data3")
+    db_library.addItem("one", "data1", 2.0)
+    db_library.addItem("two", "data1", 2.0)
+    db_library.addItem("three", "data1", 2.0)
+    db_library.addItem("four", "data1", 2.0)
+    db_library.addItem("five", "data1", 2.0)
 
     db_library.save()
     db_library.clear()
@@ -130,19 +222,18 @@ def test_library_pickle(db_library):
 
     assert db_library.noOfItems == 5
 
-    r1, r2, r3 = db_library.getItem("one")
+    r1, r2 = db_library.getItem("one")
     assert r1 == "data1"
-    assert r2 == "data2"
-    assert r3 == "data3"
+    assert r2 == 2.0
 
 
 #-----------------------------------------------------------------  test save/load of a jason library ---------
 def test_library_jason(ja_library):
-    ja_library.addItem("one", "data1", "data2", "data3")
-    ja_library.addItem("two", "data1", "data2", "data3")
-    ja_library.addItem("three", "data1", "data2", "data3")
-    ja_library.addItem("four", "data1", "data2", "data3")
-    ja_library.addItem("five", "data1", "data2", "data3")
+    ja_library.addItem("one", "data1", 2.0)
+    ja_library.addItem("two", "data1", 2.0)
+    ja_library.addItem("three", "data1", 2.0)
+    ja_library.addItem("four", "data1", 2.0)
+    ja_library.addItem("five", "data1", 2.0)
 
     ja_library.save()
     ja_library.clear()
@@ -150,7 +241,360 @@ def test_library_jason(ja_library):
 
     assert ja_library.noOfItems == 5
 
-    r1, r2, r3 = ja_library.getItem("one")
+    r1, r2 = ja_library.getItem("one")
     assert r1 == "data1"
-    assert r2 == "data2"
-    assert r3 == "data3"
+    assert r2 == 2.0
+
+
+#-----------------------------------------------------------------  test save/load of a columnar library ------
+def test_library_columnar(co_library):
+    co_library.addItem("one", "c:\\music\\one.mp3", 100.25)
+    co_library.addItem("one", "c:\\music\\two.mp3", 99.5)
+    co_library.addItem("two", "/music/ünïcode/three.mp3", 200.0)
+    co_library.addItem("nu\0ll", "/music/four.mp3", 300.0)
+
+    co_library.save()
+    co_library.clear()
+    co_library.load()
+
+    assert co_library.noOfItems == 4
+    assert co_library.getItems("one") == [("c:\\music\\two.mp3", 99.5), ("c:\\music\\one.mp3", 100.25)]
+    assert co_library.getItems("two") == [("/music/ünïcode/three.mp3", 200.0)]
+    assert co_library.getItems("nu\0ll") == [("/music/four.mp3", 300.0)]
+
+def test_library_columnar_lazy(co_library):
+    co_library.addItem("one", "one.mp3", 100.0)
+    co_library.addItem("two", "two.mp3", 200.0)
+    co_library.save()
+
+    newLibrary = Library.Library()
+    newLibrary.set_DBpath(co_library.filename)
+    newLibrary.set_DBformat("columnar")
+    newLibrary.load()
+    assert newLibrary._columns is not None
+    assert newLibrary.noOfItems == 2
+    assert newLibrary._columns is not None          #  Count is read from the header, nothing unpacked.
+    assert newLibrary.hasKey("one") is True
+    assert newLibrary._columns is None
+
+def test_library_columnar_empty(co_library):
+    co_library.save()
+    co_library.load()
+    assert co_library.hasKey("one") is False
+
+
+#-----------------------------------------------------------------  test save/load of a sqlite library --------
+def test_library_sqlite(sq_library):
+    sq_library.addItem("one", "one.mp3", 100.0)
+    sq_library.addItem("one", "two.mp3", 200.0)
+    sq_library.addItem("two", "three.mp3", 300.0)
+    sq_library.save()
+
+    newLibrary = reopen(sq_library)
+    assert newLibrary.noOfItems == 3
+    assert newLibrary.getItems("one") == [("one.mp3", 100.0), ("two.mp3", 200.0)]
+    assert newLibrary.hasKey("three") is False
+
+def test_library_sqlite_incremental(sq_library):
+    sq_library.addItem("one", "one.mp3", 100.0)
+    sq_library.addItem("two", "two.mp3", 200.0)
+    sq_library.save()
+
+    newLibrary = reopen(sq_library)
+    newLibrary.addItem("one", "four.mp3", 400.0)
+    newLibrary.delItem("two", "two.mp3")
+    newLibrary.addItem("three", "three.mp3", 300.0)
+    assert sorted(newLibrary.library) == ["one", "three"]
+    newLibrary.save()
+
+    newLibrary = reopen(sq_library)
+    assert newLibrary.noOfItems == 3
+    assert newLibrary.getItems("one") == [("one.mp3", 100.0), ("four.mp3", 400.0)]
+    assert newLibrary.hasKey("two") is False
+
+def test_library_sqlite_rebuild(sq_library):
+    sq_library.addItem("one", "one.mp3", 100.0)
+    sq_library.save()
+
+    newLibrary = Library.Library()              #  Not loaded, i.e. build mode - the database is replaced.
+    newLibrary.set_DBpath(sq_library.filename)
+    newLibrary.set_DBformat("sqlite")
+    newLibrary.addItem("two", "two.mp3", 200.0)
+    newLibrary.save()
+
+    assert reopen(sq_library).getItems("two") == [("two.mp3", 200.0)]
+    assert reopen(sq_library).noOfItems == 1
+
+def test_library_sqlite_rebuild_after_header(sq_library):
+    sq_library.addItem("one", "one.mp3", 100.0)
+    sq_library.save()
+
+    newLibrary = unloaded(sq_library)
+    assert newLibrary.readHeader()["count"] == 1    #  Opens the database, but does not load it.
+    newLibrary.addItem("two", "two.mp3", 200.0)
+    newLibrary.save()
+
+    assert reopen(sq_library).hasKey("one") is False
+    assert reopen(sq_library).noOfItems == 1
+
+def test_library_sqlite_missing(sq_library, capsys):
+    sq_library.load()
+    assert "Cannot find library file" in capsys.readouterr().out
+    assert sq_library.noOfItems == 0
+    assert not sq_library.filename.exists()
+
+def unloaded(library):
+    newLibrary = Library.Library()
+    newLibrary.set_DBpath(library.filename)
+    newLibrary.set_DBformat(library.format)
+    return newLibrary
+
+@pytest.mark.parametrize("fixture", ["db_library", "ja_library", "co_library", "sq_library"])
+def test_library_header(fixture, request):
+    library = request.getfixturevalue(fixture)
+    library.addItem("one", "one.mp3", 100.0)
+    library.addItem("one", "two.mp3", 200.0)
+    library.addItem("two", "three.mp3", 300.0)
+    library.save()
+
+    newLibrary = unloaded(library)
+    header     = newLibrary.readHeader()
+    assert header["count"] == 3
+    assert newLibrary.noOfItems == 3
+    assert not newLibrary._library                  #  Counted from the header, nothing loaded.
+    assert reopen(library).getItems("one") == [("one.mp3", 100.0), ("two.mp3", 200.0)]
+
+@pytest.mark.parametrize("fixture", ["db_library", "ja_library", "co_library", "sq_library"])
+def test_library_header_stale(fixture, request):
+    library = request.getfixturevalue(fixture)
+    library.addItem("one", "one.mp3", 100.0)
+    library.save()
+
+    newLibrary = unloaded(library)
+    newLibrary.clear()                              #  i.e. not loaded [-xL] or rebuilt [-b], the header no longer counts.
+    assert newLibrary.noOfItems == 0
+
+    newLibrary = unloaded(library)
+    newLibrary.addItem("two", "two.mp3", 200.0)
+    newLibrary.delItem("two", "two.mp3")
+    assert newLibrary.noOfItems == 0
+
+def test_library_header_old_format(db_library):
+    with open(db_library.filename, "wb") as pickle_file:
+        pickle.dump({"one": ["one.mp3", 100.0]}, pickle_file)
+
+    newLibrary = unloaded(db_library)
+    assert newLibrary.readHeader() is None
+    assert newLibrary.noOfItems == 1
+
+def test_library_header_old_format_read_once(db_library, monkeypatch):
+    with open(db_library.filename, "wb") as pickle_file:
+        pickle.dump({f"key{n}": [[f"{n}.mp3", 100.0]] for n in range(100)}, pickle_file)
+
+    loads = []
+    realLoad = pickle.load
+    monkeypatch.setattr(pickle, "load", lambda *args: loads.append(1) or realLoad(*args))
+    assert unloaded(db_library).noOfItems == 100
+    assert len(loads) == 1                                      #  The header is not looked for by unpickling the library.
+
+def test_library_header_damaged(ja_library, capsys):
+    ja_library.addItem("one", "one.mp3", 100.0)
+    ja_library.save()
+    text = ja_library.filename.read_text().replace("100.0", "101.0")
+    ja_library.filename.write_text(text)
+
+    assert reopen(ja_library).getItems("one") == [("one.mp3", 101.0)]
+    assert "does not match its header" in capsys.readouterr().out
+
+@pytest.mark.parametrize("fixture", ["db_library", "ja_library", "co_library", "sq_library"])
+def test_library_tags(fixture, request):
+    library = request.getfixturevalue(fixture)
+    library.addItem("one", "one.mp3", 100.0, "Shadows", "Apache")
+    library.addItem("one", "two.mp3", 200.0)                       #  Added without its tags.
+    library.addItem("two", "three.mp3", 300.0, "Sweet", "")
+    library.save()
+
+    newLibrary = reopen(library)
+    assert newLibrary.getTags("one", "one.mp3") == ("Shadows", "Apache")
+    assert newLibrary.getTags("one", "two.mp3") is None
+    assert newLibrary.getTags("two", "three.mp3") == ("Sweet", "")
+    assert newLibrary.getTags("three", "four.mp3") is None
+
+def test_library_bucket_tags(db_library):
+    db_library.addItem("one", "song1", 200.0, "Shadows", "Apache")
+    db_library.addItem("one", "song2", 100.0, "Shadows", "FBI")
+    db_library.delItem("one", "song2")
+    assert db_library.getTags("one", "song1") == ("Shadows", "Apache")
+    assert db_library.getTags("one", "song2") is None
+
+@pytest.mark.parametrize("fixture", ["db_library", "ja_library", "co_library", "sq_library"])
+def test_library_fingerprints(fixture, request):
+    library = request.getfixturevalue(fixture)
+    library.addItem(":", "one.mp3", 100.0, "", "", b"\x01\x02\x03\x04")
+    library.addItem(":", "two.mp3", 200.0, None, None, b"\x05\x06\x07\x08")    #  Fingerprinted, without its tags.
+    library.addItem("one", "three.mp3", 300.0, "Shadows", "Apache")
+    library.save()
+
+    newLibrary = reopen(library)
+    assert sorted(newLibrary.getFingerprints()) == [(":", "one.mp3", 100.0, b"\x01\x02\x03\x04"),
+                                                    (":", "two.mp3", 200.0, b"\x05\x06\x07\x08")]
+    assert newLibrary.getTags(":", "one.mp3") == ("", "")
+    assert newLibrary.getTags(":", "two.mp3") is None
+    assert newLibrary.getTags("one", "three.mp3") == ("Shadows", "Apache")
+
+def test_library_bucket_keeps_fingerprint(db_library):
+    db_library.addItem(":", "song1", 200.0, "", "", b"\x01\x02\x03\x04")
+    db_library.addItem(":", "song1", 201.0, "", "")                             #  Added again, without its fingerprint.
+    assert list(db_library.getFingerprints()) == [(":", "song1", 201.0, b"\x01\x02\x03\x04")]
+
+#-----------------------------------------------------------------  test the integrity check ---------------------
+def test_library_check(db_library, tmp_path, capsys):
+    (tmp_path / "music").mkdir()
+    (tmp_path / "music" / "one.mp3").write_bytes(b"mp3")
+    (tmp_path / "music" / "two.mp3").write_bytes(b"mp3")
+    db_library.addItem("one", str(tmp_path / "music" / "one.mp3"), 100.0)
+    db_library.addItem("one", str(tmp_path / "music" / "gone.mp3"), 101.0)
+    db_library.addItem("two", str(tmp_path / "music" / "two.mp3"), 200.0)
+    db_library.addItem("three", str(tmp_path / "lost" / "three.mp3"), 300.0)   #  Whole directory gone.
+    db_library.save()
+
+    db_library.check("test")
+    out = capsys.readouterr().out
+    assert "found 2 missing songs" in out
+    assert db_library.noOfItems == 4
+
+    db_library.check("delete", threads=2)
+    assert "removed 2 entries" in capsys.readouterr().out
+    newLibrary = reopen(db_library)
+    assert newLibrary.noOfItems == 2
+    assert newLibrary.getItems("one") == [(str(tmp_path / "music" / "one.mp3"), 100.0)]
+    assert not newLibrary.hasKey("three")
+
+@pytest.mark.parametrize("fixture", ["db_library", "ja_library", "co_library", "sq_library"])
+def test_library_signatures(fixture, request):
+    library = request.getfixturevalue(fixture)
+    library.addItem("one", "one.mp3", 100.0, "Shadows", "Apache", None, (1234, 5678))
+    library.addItem("one", "two.mp3", 200.0, signature=(99, 1))                  #  Without its tags.
+    library.addItem("two", "three.mp3", 300.0, "Sweet", "")                      #  Without a signature.
+    library.save()
+
+    entries = {path: (tags, signature) for bucket in reopen(library).library.values() for path, _, tags, _, signature in bucket.entries()}
+    assert entries == {"one.mp3"  : (("Shadows", "Apache"), (1234, 5678)),
+                       "two.mp3"  : (None, (99, 1)),
+                       "three.mp3": (("Sweet", ""), None)}
+
+def test_library_check_changed(db_library, tmp_path, capsys):
+    songs = []
+    for name in ("one.mp3", "two.mp3", "old.mp3"):
+        (tmp_path / name).write_bytes(b"mp3")
+        songs.append(str(tmp_path / name))
+    db_library.addItem("one", songs[0], 100.0, "Shadows", "Apache", signature=Library.Library.fileSignature(songs[0]))
+    db_library.addItem("two", songs[1], 200.0, "Sweet", "Fox", signature=Library.Library.fileSignature(songs[1]))
+    db_library.addItem("old", songs[2], 300.0)                                     #  Added by an older version.
+    db_library.save()
+
+    (tmp_path / "two.mp3").write_bytes(b"re-tagged mp3")                          #  Changed in place.
+
+    db_library.check("test")
+    out = capsys.readouterr().out
+    assert f"Song has changed {songs[1]}" in out
+    assert "found 0 missing songs and 1 changed songs" in out
+    assert "1 songs were added by an older version" in out
+
+    rescanned = []
+    def rescan(songFile):
+        rescanned.append(songFile)
+        return "sweet:fox on the run", 210.0, "Sweet", "Fox On The Run"
+
+    db_library.check("refresh", rescan=rescan)
+    assert rescanned == [songs[1]]                                                 #  Only the changed song is read.
+    newLibrary = reopen(db_library)
+    assert not newLibrary.hasKey("two")
+    assert newLibrary.getItems("sweet:fox on the run") == [(songs[1], 210.0)]
+
+    newLibrary.check("test")
+    assert "database looks good" in capsys.readouterr().out
+
+@pytest.mark.parametrize("fixture", ["db_library", "sq_library"])
+def test_library_moveItem(fixture, request, tmp_path):
+    library = request.getfixturevalue(fixture)
+    music   = str(tmp_path / "music")
+    library.addItem("one", f"{music}/a/one.mp3", 100.0, "Shadows", "Apache", b"\x01\x02", (3, 4))
+    library.addItem("one", f"{music}/b/one.mp3", 101.0)
+    library.addItem("two", f"{tmp_path}/other/two.mp3", 200.0)
+    assert library.songKeys(music) == {f"{music}/a/one.mp3": "one", f"{music}/b/one.mp3": "one"}
+    assert len(library.songKeys()) == 3
+
+    library.moveItem("one", f"{music}/a/one.mp3", f"{music}/c/one.mp3")            #  Everything but the path is kept.
+    library.save()
+    newLibrary = reopen(library)
+    assert newLibrary.getItems("one") == [(f"{music}/c/one.mp3", 100.0), (f"{music}/b/one.mp3", 101.0)]
+    assert newLibrary.getTags("one", f"{music}/c/one.mp3") == ("Shadows", "Apache")
+    assert newLibrary.getSignature("one", f"{music}/c/one.mp3") == (3, 4)
+    assert list(newLibrary.getFingerprints()) == [("one", f"{music}/c/one.mp3", 100.0, b"\x01\x02")]
+
+    newLibrary.moveItem("one", f"{music}/b/one.mp3", f"{music}/c/one.mp3")         #  Renamed over another song.
+    assert newLibrary.getItems("one") == [(f"{music}/c/one.mp3", 101.0)]
+
+    with pytest.raises(Exceptions.LibraryError):
+        newLibrary.moveItem("one", f"{music}/a/one.mp3", f"{music}/d/one.mp3")
+
+def sharded(tmp_path, dbFormat, sourceDirs=()):
+    db = Library.ShardedLibrary()
+    db.set_DBpath(tmp_path / f"testLibrary.{dbFormat}")
+    db.set_DBformat(dbFormat)
+    db.addRoots(sourceDirs)
+    return db
+
+@pytest.mark.parametrize("dbFormat", ["pickle", "json", "columnar", "sqlite"])
+def test_library_shards(dbFormat, tmp_path):
+    library = sharded(tmp_path, dbFormat, ["/music", "/new"])
+    library.addItem("one", "/music/one.mp3", 100.0)
+    library.addItem("one", "/new/one.mp3", 100.0)
+    library.addItem("two", "/new/two.mp3", 200.0)
+    library.save()
+
+    assert sorted(library.readIndex()) == ["/music", "/new"]
+    assert sharded(tmp_path, dbFormat).readHeader()["count"] == 3
+
+    newLibrary = sharded(tmp_path, dbFormat)
+    newLibrary.load()
+    assert newLibrary.noOfItems == 3
+    assert sorted(newLibrary.getItems("one")) == [("/music/one.mp3", 100.0), ("/new/one.mp3", 100.0)]
+
+    newLibrary = sharded(tmp_path, dbFormat, ["/new"])      #  Not loaded, i.e. build mode - only /new is replaced.
+    newLibrary.addItem("three", "/new/three.mp3", 300.0)
+    newLibrary.save()
+
+    newLibrary = sharded(tmp_path, dbFormat)
+    newLibrary.load()
+    assert sorted(newLibrary.library) == ["one", "three"]
+    assert newLibrary.getItems("one") == [("/music/one.mp3", 100.0)]
+
+def test_library_shards_split(db_library, tmp_path):
+    db_library.addItem("one", "/music/one.mp3", 100.0)      #  An older database, without shards.
+    db_library.addItem("two", "/other/two.mp3", 200.0)
+    db_library.save()
+
+    library = sharded(tmp_path, "pickle", ["/music"])
+    library.load()
+    library.save()
+
+    assert reopen(db_library).getItems("two") == [("/other/two.mp3", 200.0)]
+    assert reopen(db_library).hasKey("one") is False
+    assert library.shardName("/music").exists()
+
+def test_library_shards_relative(tmp_path, monkeypatch):
+    (tmp_path / "music").mkdir()
+    monkeypatch.chdir(tmp_path)
+    library = sharded(tmp_path, "pickle", ["music"])
+    library.addItem("one", "music/one.mp3", 100.0)
+    library.save()
+
+    monkeypatch.chdir(tmp_path / "music")
+    library = sharded(tmp_path, "pickle", ["."])                #  The same directory, given from somewhere else.
+    library.addItem("two", str(tmp_path / "music" / "two.mp3"), 200.0)
+    library.save()
+
+    assert library.readIndex() == {Library.ShardedLibrary.normalRoot(tmp_path / "music"): library.shardName(".").name}
+    assert not library.filename.exists()
@@ -0,0 +1,38 @@
+###############################################################################################################
+#    test_prefetchUtils.py   Copyright (C) <2025>  <Kevin Scott>                                              #
+#                                                                                                             #
+#    test for functions in prefetchUtils.py                                                                   #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import src.utils.prefetchUtils as prefetchUtils
+
+
+def test_prefetch_order(tmp_path):
+    songs = []
+    for n in range(20):
+        song = tmp_path / f"{n}.mp3"
+        song.write_bytes(b"ID3" + bytes(100))
+        songs.append(song)
+    assert list(prefetchUtils.prefetch(songs, 4, 3)) == songs
+
+def test_prefetch_skip(tmp_path):
+    items = [("missing.mp3", False), (tmp_path / "none.mp3", True)]
+    assert list(prefetchUtils.prefetch(items, 2, 8, key=lambda item: None if item[1] else item[0])) == items
+
+def test_readAhead_missing(tmp_path):
+    assert prefetchUtils.readAhead(tmp_path / "missing.mp3") is None
@@ -0,0 +1,98 @@
+###############################################################################################################
+#    test_report.py   Copyright (C) <2025>  <Kevin Scott>                                                     #
+#                                                                                                             #
+#    test for functions in Report.py                                                                          #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import csv
+import json
+
+import src.Report as Report
+import src.utils.duplicateUtils as duplicateUtils
+
+def test_report_file(tmp_path):
+    textFile = tmp_path / "duplicates.txt"
+    textFile.write_text("old line\n", encoding="utf-8")
+
+    with Report.Report(textFile) as report:
+        duplicateUtils.logTextLine("one", report)
+        report.writeLine("two")
+        report.flush()
+        assert textFile.read_text(encoding="utf-8") == "old line\none\ntwo\n"
+        report.writeLine("three")
+
+    assert textFile.read_text(encoding="utf-8") == "old line\none\ntwo\nthree\n"
+
+def test_report_after_close(tmp_path):
+    textFile = tmp_path / "duplicates.txt"
+    report   = Report.Report(textFile)
+    report.close()
+    report.close()
+    report.writeLine("one")
+    assert textFile.read_text(encoding="utf-8") == "one\n"
+
+def test_report_screen(capsys):
+    report = Report.Report(False)
+    duplicateUtils.logTextLine("one", report)
+    report.close()
+    assert capsys.readouterr().out == "one\n"
+
+def test_report_jsonl(tmp_path, capsys):
+    textFile = tmp_path / "duplicates.jsonl"
+
+    with Report.Report(textFile, "jsonl") as report:
+        report.writeLine("a line of text")
+        report.writeDuplicate("A:B", "new.mp3", 100.25, "old.mp3", 100.0, "soundex")
+        report.writeDuplicate("A:B", "new.mp3", 100.25, "false.mp3", 100.5, "falsePositive")
+
+    records = [json.loads(line) for line in textFile.read_text(encoding="utf-8").splitlines()]
+    assert [record["songFile"] for record in records] == ["old.mp3", "false.mp3"]
+    assert records[0] == {"matchType": "soundex", "key": "A:B", "musicFile": "new.mp3", "musicDuration": 100.25,
+                          "songFile": "old.mp3", "songDuration": 100.0, "delta": 0.25, "deleted": False}
+    assert capsys.readouterr().out == "a line of text\n"
+
+def test_report_jsonl_screen(capsys):
+    report = Report.Report(None, "jsonl")
+    report.writeLine("a line of text")
+    report.writeDuplicate("A:B", "new.mp3", 100.25, "old.mp3", 100.0, "exact")
+
+    captured = capsys.readouterr()
+    assert report.recordsOnScreen is True
+    assert json.loads(captured.out)["songFile"] == "old.mp3"        #  Standard output only holds the records.
+    assert captured.err == "a line of text\n"
+
+def test_report_csv(tmp_path):
+    textFile = tmp_path / "duplicates.csv"
+
+    for _ in range(2):                          #  Amended, the field names are only written once.
+        with Report.Report(textFile, "csv") as report:
+            report.writeDuplicate("A:B", "new, one.mp3", 100.0, "old.mp3", 100.0, "exact", True)
+
+    with open(textFile, newline="", encoding="utf-8") as csvFile:
+        rows = list(csv.reader(csvFile))
+    assert rows[0] == list(Report.Report.FIELDS)
+    assert rows[1] == ["exact", "A:B", "new, one.mp3", "100.0", "old.mp3", "100.0", "0.0", "True"]
+    assert len(rows) == 3
+
+def test_report_text_ignores_records(tmp_path):
+    textFile = tmp_path / "duplicates.txt"
+
+    with Report.Report(textFile) as report:
+        report.writeDuplicate("A:B", "new.mp3", 100.0, "old.mp3", 100.0, "exact")
+
+    assert textFile.read_text(encoding="utf-8") == ""
@@ -0,0 +1,93 @@
+###############################################################################################################
+#    test_server.py Copyright (C) <2025>  <Kevin Scott>                                                       #
+#                                                                                                             #
+#    test for Server.py                                                                                       #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import json
+import logging
+import threading
+import urllib.request
+import urllib.error
+
+import pytest
+
+import src.Server as Server
+import src.Library as Library
+import src.utils.tagUtils as tagUtils
+from test.test_tagUtils import makeSong
+
+logger = logging.getLogger("test")
+
+
+@pytest.fixture
+def server(tmp_path):
+    """  Set up a server on a free port, holding one song.  """
+    song = makeSong(tmp_path / "song.mp3", "The Shadows", "Apache")
+    key, duration, artist, title = tagUtils.scanTags("tinytag", str(song), False, logger)
+
+    library = Library.Library()
+    library.addItem(key, str(song), duration, artist, title)
+
+    server = Server.Server(library, "tinytag", False, 0.5, logger, "127.0.0.1", 0, 2)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    yield server
+    server.stop()
+    thread.join()
+
+def request(server, path, data=None):
+    host, port = server.address
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", data) as reply:
+            return reply.status, json.loads(reply.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+def test_server_status(server):
+    assert request(server, "/status") == (200, {"songs": 1, "difference": 0.5, "soundex": False})
+
+def test_server_check(server, tmp_path):
+    copy = makeSong(tmp_path / "copy.mp3", "Shadows", "Apache")
+    status, answer = request(server, f"/check?path={copy}")
+    assert status == 200
+    assert answer["duplicate"] and not answer["inLibrary"]
+    assert [match["songFile"] for match in answer["matches"]] == [str(tmp_path / "song.mp3")]
+
+    status, answer = request(server, f"/check?path={tmp_path / 'song.mp3'}")      #  Not a duplicate of itself.
+    assert answer["inLibrary"] and not answer["duplicate"]
+
+def test_server_check_batch(server, tmp_path):
+    other = makeSong(tmp_path / "other.mp3", "Shadows", "FBI")
+    songs = [str(tmp_path / "song.mp3"), str(other), str(tmp_path / "missing.mp3")]
+    status, answer = request(server, "/check", json.dumps(songs).encode())
+    assert status == 200
+    assert [result["musicFile"] for result in answer["results"]] == songs
+    assert [result.get("duplicate") for result in answer["results"]] == [False, False, None]
+    assert "error" in answer["results"][2]
+
+    assert request(server, "/check", b"{not json")[0] == 400
+
+def test_server_match(server):
+    duration = server.songLibrary.getItem("Shadows:Apache")[1]
+    status, answer = request(server, f"/match?artist=The%20Shadows&title=Apache&duration={duration + 0.2}")
+    assert answer["duplicate"] and answer["key"] == "Shadows:Apache"
+
+    assert not request(server, f"/match?artist=Shadows&title=Apache&duration={duration + 2}")[1]["duplicate"]
+    assert request(server, "/match?artist=Shadows&title=Apache&duration=long")[0] == 400
+    assert request(server, "/unknown")[0] == 404
@@ -0,0 +1,77 @@
+###############################################################################################################
+#    test_tagCache.py   Copyright (C) <2025>  <Kevin Scott>                                                   #
+#                                                                                                             #
+#    test for functions in TagCache.py                                                                        #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import pytest
+import src.TagCache as TagCache
+
+
+@pytest.fixture
+def song(tmp_path):
+    """  Set up a dummy song file.  """
+    songFile = tmp_path / "song.mp3"
+    songFile.write_bytes(b"ID3")
+    return songFile
+
+@pytest.fixture
+def tag_cache(tmp_path):
+    """  Set up the tag cache.  """
+    return TagCache.TagCache(tmp_path / "tagCache.pickle", "tinytag")
+
+#-----------------------------------------------------------------  test cache hit and miss -------------------
+def test_tagCache_hit(tag_cache, song):
+    tag_cache.addItem(song, os.stat(song), 123.45, "Shadows", "Apache")
+    assert tag_cache.getItem(song, os.stat(song)) == (123.45, "Shadows", "Apache")
+    assert tag_cache.hits == 1
+
+def test_tagCache_miss(tag_cache, song):
+    assert tag_cache.getItem(song, os.stat(song)) is None
+    assert tag_cache.misses == 1
+
+def test_tagCache_changed(tag_cache, song):
+    tag_cache.addItem(song, os.stat(song), 123.45, "Shadows", "Apache")
+    song.write_bytes(b"ID3 and some more")
+    assert tag_cache.getItem(song, os.stat(song)) is None
+
+#-----------------------------------------------------------------  test prune ---------------------------------
+def test_tagCache_prune(tmp_path, tag_cache, song):
+    tag_cache.addItem(song, os.stat(song), 123.45, "Shadows", "Apache")
+    tag_cache.cache[os.fspath(tmp_path / "gone.mp3")] = (1, 1, 1, 1.0, "", "")
+    tag_cache.cache["elsewhere/other.mp3"] = (1, 1, 1, 1.0, "", "")
+    tag_cache.prune(tmp_path)
+    assert tag_cache.noOfItems == 2
+
+#-----------------------------------------------------------------  test save/load of the cache ---------------
+def test_tagCache_save_load(tmp_path, tag_cache, song):
+    tag_cache.addItem(song, os.stat(song), 123.45, "Shadows", "Apache")
+    tag_cache.save()
+
+    newCache = TagCache.TagCache(tmp_path / "tagCache.pickle", "tinytag")
+    newCache.load()
+    assert newCache.getItem(song, os.stat(song)) == (123.45, "Shadows", "Apache")
+
+def test_tagCache_module_changed(tmp_path, tag_cache, song):
+    tag_cache.addItem(song, os.stat(song), 123.45, "Shadows", "Apache")
+    tag_cache.save()
+
+    newCache = TagCache.TagCache(tmp_path / "tagCache.pickle", "mutagen")
+    newCache.load()
+    assert newCache.noOfItems == 0
@@ -0,0 +1,134 @@
+###############################################################################################################
+#    test_tagUtils.py Copyright (C) <2025>  <Kevin Scott>                                                     #
+#                                                                                                             #
+#    test for functions in tagUtils.py                                                                        #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import time
+import struct
+import logging
+import threading
+
+import pytest
+from tinytag import TinyTag
+from mutagen.id3 import ID3NoHeaderError
+
+import src.TagCache as TagCache
+import src.utils.tagUtils as tagUtils
+
+logger = logging.getLogger("test")
+
+
+def makeSong(path, artist, title, frames=400):
+    """  Writes a small mp3 - an ID3v2.3 tag with artist and title, then frames of MPEG1 layer 3 at 128kbps 44.1kHz.
+         A tag of None is left out.
+    """
+    tag = b""
+    for frameId, value in (("TPE1", artist), ("TIT2", title)):
+        if value is not None:
+            data = b"\x00" + value.encode("latin-1")
+            tag += frameId.encode() + struct.pack(">I", len(data)) + b"\x00\x00" + data
+    size = bytes((len(tag) >> shift) & 0x7f for shift in (21, 14, 7, 0))
+    path.write_bytes(b"ID3\x03\x00\x00" + size + tag + (b"\xff\xfb\x90\x64" + b"\x00" * 413) * frames)
+    return path
+
+def test_checkTags_in_memory():
+    #  The songs do not exist, so the tags must come from memory.
+    assert tagUtils.checkTags("missing1.mp3", "missing2.mp3", logger, ("Shadows", "Apache"), ("Shadows", "Apache")) is True
+    assert tagUtils.checkTags("missing1.mp3", "missing2.mp3", logger, ("Shadows", "Apache"), ("Shadows", "FBI")) is False
+
+def test_checkTags_missing_file():
+    assert tagUtils.checkTags("missing1.mp3", "missing2.mp3", logger, ("Shadows", "Apache"), None) is False
+
+@pytest.mark.parametrize("module", ["tinytag", "eyed3", "mutagen", "fast"])
+def test_scanTags(module, tmp_path):
+    song = makeSong(tmp_path / "song.mp3", "The Shadows", "Apache")
+    key, duration, artist, title = tagUtils.scanTags(module, str(song), False, logger)
+    assert (key, artist, title) == ("Shadows:Apache", "Shadows", "Apache")
+    assert duration == pytest.approx(round(TinyTag.get(str(song)).duration, 2), abs=0.05)
+
+def test_scanTags_mutagen_no_tags(tmp_path):
+    song = tmp_path / "song.mp3"
+    song.write_bytes((b"\xff\xfb\x90\x64" + b"\x00" * 413) * 100)
+    with pytest.raises(ID3NoHeaderError):
+        tagUtils.scanTags("mutagen", str(song), False, logger)
+
+def test_scanTags_fast_fallback(tmp_path):
+    song = makeSong(tmp_path / "song.mp3", "The Shadows", "Apache")
+    data = bytearray(song.read_bytes())
+    data[5] = 0x80                              #  Flag the tag has unsynchronised, fast hands it to tinytag.
+    song.write_bytes(bytes(data))
+    assert tagUtils.scanTags("fast", str(song), False, logger)[0] == "Shadows:Apache"
+
+def test_readTags_workers_order(tmp_path):
+    songs = [str(makeSong(tmp_path / f"song{n}.mp3", f"Artist {n}", f"Title {n}", frames=20)) for n in range(9)]
+    (tmp_path / "broken.mp3").write_bytes(b"not a song")
+    songs.insert(4, str(tmp_path / "broken.mp3"))                 #  Raises in the worker.
+    songs.append(str(tmp_path / "missing.mp3"))
+
+    songTags = list(tagUtils.readTags(songs, "mutagen", False, logger, workers=2, chunkSize=2))
+
+    assert [musicFile for musicFile, _, _ in songTags] == songs
+    assert songTags[4][1] is None and songTags[-1][1] is None
+    assert songTags[0][2].st_size == os.path.getsize(songs[0]) and songTags[-1][2] is None    #  The stat of each song, if found.
+    assert [tags[0] for _, tags, _ in songTags[:4] + songTags[5:-1]] == [tagUtils.makeKey(f"Artist {n}", f"Title {n}", False) for n in range(9)]
+
+def test_readTags_workers_cached(tmp_path):
+    songs    = [str(makeSong(tmp_path / f"song{n}.mp3", f"Artist {n % 3}", f"Title {n}")) for n in range(10)]
+    tagCache = TagCache.TagCache(tmp_path / "tagCache.pickle", "tinytag")
+
+    first  = list(tagUtils.readTags(songs, "tinytag", True, logger, tagCache, workers=2, chunkSize=2))
+    second = list(tagUtils.readTags(songs, "tinytag", True, logger, tagCache, workers=2, chunkSize=2))
+
+    assert tagCache.hits == len(songs)
+    assert [song[:2] for song in first] == [song[:2] for song in second]
+    assert [tags[0] for _, tags, _ in second] == [tagUtils.makeKey(f"Artist {n % 3}", f"Title {n}", True) for n in range(10)]
+
+def test_readRoots_order(tmp_path):
+    roots = [tmp_path / "one", tmp_path / "two"]
+    for root in roots:
+        root.mkdir()
+    fileLists = [[str(makeSong(root / f"song{n}.mp3", root.name, f"Title {n}")) for n in range(5)] for root in roots]
+    fileLists[1].append(str(tmp_path / "missing.mp3"))
+
+    songTags = list(tagUtils.readRoots(fileLists, "tinytag", False, logger))
+
+    assert [musicFile for musicFile, _, _ in songTags] == fileLists[0] + fileLists[1]
+    assert [tags[0] for _, tags, _ in songTags[:-1]] == [tagUtils.makeKey(root.name, f"Title {n}", False) for root in roots for n in range(5)]
+    assert songTags[-1][1] is None
+
+def test_readRoots_cached_stopped(tmp_path):
+    fileLists = []
+    for root in ["one", "two", "three"]:
+        (tmp_path / root).mkdir()
+        fileLists.append([str(makeSong(tmp_path / root / f"song{n}.mp3", root, f"Title {n}", frames=20)) for n in range(40)])
+    tagCache = TagCache.TagCache(tmp_path / "tagCache.pickle", "tinytag")
+
+    list(tagUtils.readRoots(fileLists, "tinytag", False, logger, tagCache, rootDepth=4))
+    assert (tagCache.hits, tagCache.misses, tagCache.noOfItems) == (0, 120, 120)
+
+    threads  = threading.active_count()
+    songTags = tagUtils.readRoots(fileLists, "tinytag", False, logger, tagCache, rootDepth=4)
+    next(songTags)
+    songTags.close()                                #  Stop early, the threads stop too.
+    for _ in range(50):
+        if threading.active_count() <= threads:
+            break
+        time.sleep(0.1)
+    assert threading.active_count() <= threads
@@ -0,0 +1,73 @@
+###############################################################################################################
+#    test_walker.py   Copyright (C) <2025>  <Kevin Scott>                                                     #
+#                                                                                                             #
+#    test for functions in Walker.py                                                                          #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import pytest
+import src.Walker as Walker
+
+
+@pytest.fixture
+def music(tmp_path):
+    """  Set up a small music directory.  """
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+    for name in ["one.mp3", "a/two.mp3", "a/b/three.mp3", "a/notes.txt", "c/cover.jpg"]:
+        (tmp_path / name).write_bytes(b"ID3")
+    return tmp_path
+
+def test_walker_songs(music):
+    walker = Walker.Walker(music)
+    songs  = sorted(entry.name for entry in walker.songs())
+    assert songs == ["one.mp3", "three.mp3", "two.mp3"]
+    assert walker.count == 3
+
+def test_walker_missing(tmp_path):
+    walker = Walker.Walker(tmp_path / "missing")
+    assert list(walker.songs()) == []
+    assert len(walker.errors) == 1
+
+def test_walker_nonMusic(music):
+    walker = Walker.Walker(music)
+    list(walker.songs())
+    assert sorted(walker.nonMusic) == [str(music / "a" / "notes.txt"), str(music / "c" / "cover.jpg")]
+
+def test_walker_emptyDirs(music):
+    (music / "d" / "e").mkdir(parents=True)
+    walker = Walker.Walker(music)
+    list(walker.songs())
+    assert walker.emptyDirs() == [str(music / "d")]
+    walker.fileRemoved(music / "c" / "cover.jpg")
+    assert sorted(walker.emptyDirs()) == [str(music / "c"), str(music / "d")]
+
+def test_walker_fileRemoved(music):
+    walker = Walker.Walker(music)
+    list(walker.songs())
+    walker.fileRemoved(music / "a" / "b" / "three.mp3")
+    assert walker.emptyDirs() == [str(music / "a" / "b")]
+
+def test_walkers_songs(music, tmp_path_factory):
+    other = tmp_path_factory.mktemp("other")
+    (other / "four.mp3").write_bytes(b"ID3")
+    walker = Walker.Walkers([music, other, music / "missing"])
+    songs  = [entry.name for entry in walker.songs()]
+    assert sorted(songs[:3]) == ["one.mp3", "three.mp3", "two.mp3"]  #  In the order of the source directories.
+    assert songs[3:] == ["four.mp3"]
+    assert walker.count == 4
+    assert len(walker.errors) == 1
@@ -0,0 +1,86 @@
+###############################################################################################################
+#    test_watcher.py Copyright (C) <2025>  <Kevin Scott>                                                      #
+#                                                                                                             #
+#    test for Watcher.py                                                                                      #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import pytest
+import src.Watcher as Watcher
+
+
+@pytest.fixture
+def music(tmp_path):
+    """  Set up a small music directory.  """
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "one.mp3").write_bytes(b"ID3 one")
+    return tmp_path
+
+def test_watcher_poll(music):
+    with Watcher.Watcher([music], 0.0, poll=True) as watcher:
+        assert watcher.backend == "poll"
+        assert watcher.events(0) == []
+
+        (music / "a" / "two.mp3").write_bytes(b"ID3 two")
+        (music / "a" / "notes.txt").write_bytes(b"notes")
+        assert watcher.events(0) == []                                      #  Not read until the same on two polls.
+        assert watcher.events(0) == [("changed", str(music / "a" / "two.mp3"))]
+
+        os.rename(music / "a" / "two.mp3", music / "three.mp3")
+        assert watcher.events(0) == [("moved", str(music / "a" / "two.mp3"), str(music / "three.mp3"))]
+
+        (music / "a" / "one.mp3").unlink()
+        assert watcher.events(0) == [("deleted", str(music / "a" / "one.mp3"))]
+
+def test_watcher_poll_wait(music):
+    watcher = Watcher.Watcher([music], 60.0, poll=True)
+    (music / "two.mp3").write_bytes(b"ID3 two")
+    assert watcher.events(0) == []                                          #  Not yet time to poll.
+
+def test_watcher_inotify(music):
+    with Watcher.Watcher([music]) as watcher:
+        if watcher.backend != "inotify":
+            pytest.skip("inotify not available")
+
+        (music / "two.mp3").write_bytes(b"ID3 two")
+        assert watcher.events(1) == [("changed", str(music / "two.mp3"))]
+
+        os.rename(music / "two.mp3", music / "a" / "three.mp3")
+        assert watcher.events(1) == [("moved", str(music / "two.mp3"), str(music / "a" / "three.mp3"))]
+
+        os.rename(music / "a" / "three.mp3", music / "a" / "three.bak")    #  No longer a song.
+        assert watcher.events(1) == [("deleted", str(music / "a" / "three.mp3"))]
+
+        (music / "b" / "c").mkdir(parents=True)
+        (music / "b" / "c" / "four.mp3").write_bytes(b"ID3 four")          #  Found by the walk, or on close.
+        assert ("changed", str(music / "b" / "c" / "four.mp3")) in watcher.events(1)
+
+        os.rename(music / "b", music / "d")
+        assert watcher.events(1) == [("dirMoved", str(music / "b"), str(music / "d"))]
+        (music / "d" / "c" / "five.mp3").write_bytes(b"ID3 five")         #  The watches follow the directory.
+        assert watcher.events(1) == [("changed", str(music / "d" / "c" / "five.mp3"))]
+
+        os.rename(music / "d", music.parent / f"{music.name}-out")
+        assert watcher.events(1) == [("dirDeleted", str(music / "d"))]
+
+def test_watcher_poll_roots(music, tmp_path_factory):
+    other = tmp_path_factory.mktemp("other")
+    with Watcher.Watcher([music, other], 0.0, poll=True) as watcher:
+        (other / "two.mp3").write_bytes(b"ID3 two")
+        watcher.events(0)
+        assert watcher.events(0) == [("changed", str(other / "two.mp3"))]
@@ -0,0 +1,68 @@
+###############################################################################################################
+#    test_zapUtils.py   Copyright (C) <2025>  <Kevin Scott>                                                   #
+#                                                                                                             #
+#    test for functions in zapUtils.py                                                                        #
+#                                                                                                             #
+###############################################################################################################
+#    Copyright (C) <2025>  <Kevin Scott>                                                                      #
+#                                                                                                             #
+#    This program is free software: you can redistribute it and/or modify it under the terms of the           #
+#    GNU General Public License as published by the Free Software Foundation, either Version 3 of the         #
+#    License, or (at your option) any later Version.                                                          #
+#                                                                                                             #
+#    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without        #
+#    even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+#    GNU General Public License for more details.                                                             #
+#                                                                                                             #
+#    You should have received a copy of the GNU General Public License along with this program.               #
+#    If not, see <http://www.gnu.org/licenses/>.                                                              #
+#                                                                                                             #
+###############################################################################################################
+
+import os
+import logging
+
+import pytest
+import src.Walker as Walker
+import src.utils.zapUtils as zapUtils
+
+logger = logging.getLogger("test")
+
+
+@pytest.fixture
+def music(tmp_path):
+    """  Set up a small music directory, with an empty directory and one holding only a non music file.  """
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+    (tmp_path / "one.mp3").write_bytes(b"ID3")
+    (tmp_path / "c" / "cover.jpg").write_bytes(b"jpg")
+    return tmp_path
+
+def walked(sourceDir):
+    walker = Walker.Walker(sourceDir)
+    list(walker.songs())
+    return walker
+
+def test_removeUnwanted(music):
+    zapUtils.removeUnwanted(music, None, True, True, False, logger, walked(music))
+    assert sorted(os.listdir(music)) == ["one.mp3"]
+
+def test_removeUnwanted_file_landed(music):
+    walker = walked(music)
+    (music / "a" / "b" / "two.mp3").write_bytes(b"ID3")        #  Lands after the walk, must not be deleted.
+    zapUtils.removeUnwanted(music, None, True, False, False, logger, walker)
+    assert (music / "a" / "b" / "two.mp3").exists()
+
+def test_removeUnwanted_zap_failed(music, monkeypatch):
+    def failed(path):
+        raise OSError("busy")
+    monkeypatch.setattr(os, "remove", failed)
+    zapUtils.removeUnwanted(music, None, True, True, False, logger, walked(music))
+    assert (music / "c" / "cover.jpg").exists()
+    assert not (music / "a").exists()
+
+def test_zapEmptyDir_not_empty(music):
+    assert zapUtils.zapEmptyDir(music / "c", False, logger) is False
+    assert (music / "c" / "cover.jpg").exists()
+    assert zapUtils.zapEmptyDir(music / "a", False, logger) is True
+    assert not (music / "a").exists()